@@ -0,0 +1,235 @@
+"""Headless HTTP API for resume and cover letter generation
+
+Exposes the app's generators and DOCX renderers without the Streamlit
+script loop:
+
+    GROQ_API_KEY=... python api.py --port 8000
+    
+    POST /v1/resume               fields of user_data (+ "structured")   -> {"content", "stats"}
+    POST /v1/cover-letter         fields of user_data and company_info   -> {"content", "stats"}
+                                  (+ "near_duplicates": "reuse" | "adapt")
+    POST /v1/docx/resume          {"content", ...user_data fields}       -> .docx
+    POST /v1/docx/cover-letter    {"content", ...user_data fields}       -> .docx
+    GET  /health, GET /metrics
+
+Request bodies are flat JSON objects using the same field names as the
+batch CLI. Everything runs on one event loop: model calls (blocking, I/O
+bound) go to a thread pool and DOCX builds (CPU bound) to a bounded pool
+of worker processes.
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from urllib.parse import quote
+
+from batch import COMPANY_FIELDS, REQUIRED_FIELDS, USER_FIELDS, split_record
+
+DOCX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Failures the caller should retry later rather than treat as a bad response
+RETRY_LATER_ERRORS = {'RequestRejected', 'RateLimitTimeout', 'CircuitOpenError'}
+
+
+def _import_app():
+    # The app module configures a Streamlit page on import; keep bare-mode warnings quiet
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')
+    import app
+    return app
+
+
+def _init_docx_worker():
+    _import_app()
+
+
+def build_docx(document, content, user_data, parsed=None):
+    """Build .docx bytes in a worker process"""
+    app = _import_app()
+    if document == 'resume':
+        return app.create_docx_resume(content, user_data, document=parsed).getvalue()
+    return app.create_docx_cover_letter(content, user_data).getvalue()
+
+
+def create_api(client, cache=None, llm_workers=32, docx_workers=None):
+    """Build the Starlette application around a Groq-compatible client"""
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Route
+    
+    from utils.metrics import METRICS, RollingWindowSink
+    
+    app = _import_app()
+    metrics_window = RollingWindowSink()
+    METRICS.add_sink(metrics_window)
+    llm_pool = ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix='llm')
+    docx_workers = docx_workers or os.cpu_count() or 1
+    docx_pool = ProcessPoolExecutor(
+        max_workers=docx_workers,
+        mp_context=get_context('spawn'),
+        initializer=_init_docx_worker
+    )
+
+    async def read_record(request, required=REQUIRED_FIELDS):
+        try:
+            record = await request.json()
+        except ValueError:
+            return None, JSONResponse({'error': 'body must be a JSON object'}, status_code=400)
+        if not isinstance(record, dict):
+            return None, JSONResponse({'error': 'body must be a JSON object'}, status_code=400)
+        # Everything that ends up in a prompt or a document must be text
+        not_text = [
+            field for field in dict.fromkeys((*required, *USER_FIELDS, *COMPANY_FIELDS))
+            if record.get(field) is not None and not isinstance(record[field], str)
+        ]
+        if not_text:
+            return None, JSONResponse({'error': f"fields must be strings: {', '.join(not_text)}"}, status_code=422)
+        missing = [field for field in required if not record.get(field)]
+        if missing:
+            return None, JSONResponse({'error': f"missing fields: {', '.join(missing)}"}, status_code=422)
+        return record, None
+
+    async def run_generation(generate, *args, **kwargs):
+        stats = {}
+        loop = asyncio.get_running_loop()
+        content = await loop.run_in_executor(
+            llm_pool, functools.partial(generate, *args, stats=stats, cache=cache, **kwargs)
+        )
+        if not content:
+            status = 503 if stats.get('error_type') in RETRY_LATER_ERRORS else 502
+            return JSONResponse({'error': stats.get('error', 'empty response'), 'stats': stats}, status_code=status)
+        return JSONResponse({'content': content, 'stats': stats})
+
+    async def resume(request):
+        record, error = await read_record(request)
+        if error:
+            return error
+        user_data, _ = split_record(record)
+        return await run_generation(
+            app.generate_resume_content, client, user_data,
+            force_regenerate=bool(record.get('force_regenerate')),
+            structured=bool(record.get('structured'))
+        )
+
+    async def cover_letter(request):
+        record, error = await read_record(request, REQUIRED_FIELDS + ('company_name',))
+        if error:
+            return error
+        near_duplicates = record.get('near_duplicates')
+        if near_duplicates not in app.NEAR_DUPLICATE_MODES:
+            modes = ', '.join(mode for mode in app.NEAR_DUPLICATE_MODES if mode)
+            return JSONResponse({'error': f'near_duplicates must be one of: {modes}'}, status_code=422)
+        user_data, company_info = split_record(record)
+        return await run_generation(
+            app.generate_cover_letter, client, user_data, company_info,
+            force_regenerate=bool(record.get('force_regenerate')),
+            near_duplicates=near_duplicates
+        )
+
+    def docx_endpoint(document):
+        async def render(request):
+            record, error = await read_record(request, ('content', 'name', 'email', 'phone', 'address'))
+            if error:
+                return error
+            user_data, _ = split_record(record)
+            # Looked up here so a structured resume keeps the document it was built from;
+            # any other resume is parsed in the worker, off the event loop
+            parsed = app.get_structured_documents().get(record['content']) if document == 'resume' else None
+            loop = asyncio.get_running_loop()
+            with METRICS.timer('render.seconds', stage=f'api_{document}_docx'):
+                data = await loop.run_in_executor(
+                    docx_pool, build_docx, document, record['content'], user_data, parsed
+                )
+            file_name = f"{user_data['name']}_{'Resume' if document == 'resume' else 'Cover_Letter'}.docx"
+            return Response(data, media_type=DOCX_MEDIA_TYPE, headers={
+                'Content-Disposition': f"attachment; filename*=UTF-8''{quote(file_name)}"
+            })
+        return render
+
+    async def health(request):
+        body = {'status': 'ok'}
+        if hasattr(client, 'stats'):
+            body['requests'] = client.stats()
+        body['models'] = app.get_model_router().stats()
+        return JSONResponse(body)
+
+    async def metrics(request):
+        return JSONResponse(metrics_window.summary())
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        # Start the DOCX workers now so the first requests don't pay for spawning them
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(docx_pool, _init_docx_worker) for _ in range(docx_workers)
+        ))
+        try:
+            yield
+        finally:
+            llm_pool.shutdown(wait=False, cancel_futures=True)
+            docx_pool.shutdown(wait=True, cancel_futures=True)
+            METRICS.remove_sink(metrics_window)
+    
+    return Starlette(
+        routes=[
+            Route('/v1/resume', resume, methods=['POST']),
+            Route('/v1/cover-letter', cover_letter, methods=['POST']),
+            Route('/v1/docx/resume', docx_endpoint('resume'), methods=['POST']),
+            Route('/v1/docx/cover-letter', docx_endpoint('cover_letter'), methods=['POST']),
+            Route('/health', health),
+            Route('/metrics', metrics),
+        ],
+        lifespan=lifespan
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Serve resume and cover letter generation over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--llm-workers', type=int, default=32, help='model calls in flight at once')
+    parser.add_argument('--docx-workers', type=int, default=None,
+                        help='processes building .docx files (default: one per CPU)')
+    parser.add_argument('--rpm', type=float, default=30, help='maximum model calls started per minute (0 = unlimited)')
+    parser.add_argument('--no-cache', action='store_true', help="don't read or write the generation cache")
+    parser.add_argument('--base-url', default=os.environ.get('GROQ_BASE_URL'),
+                        help='Groq API base URL, e.g. a local fake server')
+    parser.add_argument('--api-key', default=os.environ.get('GROQ_API_KEY'), help='defaults to $GROQ_API_KEY')
+    args = parser.parse_args(argv)
+    
+    if not args.api_key:
+        parser.error('set GROQ_API_KEY or pass --api-key')
+    if args.llm_workers < 1:
+        parser.error('--llm-workers must be at least 1')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    import uvicorn
+    from utils.generation_cache import GenerationCache
+    from utils.resilience import ResilientClient
+    
+    app = _import_app()
+    groq_client = app.build_groq_client(args.api_key, base_url=args.base_url, max_connections=args.llm_workers)
+    if app.GROQ_WARMUP:
+        threading.Thread(target=app.warm_up_groq_client, args=(groq_client,), name='groq-warm-up', daemon=True).start()
+    client = ResilientClient(
+        groq_client,
+        requests_per_minute=args.rpm or None,
+        timeout=app.GROQ_REQUEST_TIMEOUT
+    )
+    cache = None if args.no_cache else GenerationCache(app.GENERATION_CACHE_PATH)
+    api = create_api(client, cache=cache, llm_workers=args.llm_workers, docx_workers=args.docx_workers)
+    uvicorn.run(api, host=args.host, port=args.port, log_level='warning')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
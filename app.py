@@ -1,12 +1,42 @@
 import streamlit as st
-import groq
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.shared import OxmlElement, qn
 import io
+import os
 import base64
+import difflib
+import hashlib
+import time
+import functools
+import re
+import sys
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from utils.docx_builder import DocxBuilder, get_skeleton
+from utils.deferred_client import DeferredClient
+from utils.document import (
+    BulletList, document_from_section_lines, match_section_header, parse_blocks, parse_document, reparse_document,
+    replace_section
+)
+from utils.generation_cache import GenerationCache, make_cache_key
+from utils.job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobWorkers, make_idempotency_key
+from utils.artifact_store import ArtifactStore
+from utils.render_cache import RenderCache, make_render_key
+from utils.pdf_writer import BOLD, PdfLayout, unsupported_characters
+from utils.prompt_budget import count_tokens, estimate_max_tokens, fit_fields
+from utils.metrics import METRICS, JsonLogSink, RollingWindowSink
+from utils.model_registry import ModelRouter, load_registry
+from utils.resilience import CircuitOpenError, RequestRejected, ResilientClient, is_retryable
+from utils.structured import (
+    RESUME_SCHEMA, SECTION_TITLES, DocumentRegistry, build_document,
+    extract_json_object, schema_example, validate_sections
+)
+from utils.transport import KeepWarm, build_async_http_client, build_http_client, warm_connections
+from utils.templates import (
+    COVER_LETTER_TEMPLATES, DEFAULT_THEME, RESUME_TEMPLATES, SECTION_TEMPLATE,
+    escape_fields, escape_text, theme_labels
+)
 
 # Page configuration
 st.set_page_config(
@@ -15,19 +45,279 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize Groq client
+# Models, temperatures and latency SLOs per task (see utils/model_registry.py),
+# optionally overridden by a JSON file
+MODEL_REGISTRY_PATH = os.environ.get("MODEL_REGISTRY_PATH")
+MODELS, MODEL_TASKS = load_registry(MODEL_REGISTRY_PATH)
+
+# Context window every registered model can take, and the share of it a prompt may use (estimated
+# tokens); larger prompts are deduplicated and trimmed, which also bounds cost and latency
+CONTEXT_WINDOW = min(spec['context_window'] for spec in MODELS.values())
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", "3000"))
+
+# Fields trimmed when a prompt is over budget, lowest priority first, with the tokens each always keeps
+RESUME_TRIM_ORDER = (
+    ('additional_info', 0), ('skills', 150), ('education', 150), ('work_experience', 400)
+)
+COVER_LETTER_TRIM_ORDER = (
+    ('job_description', 300), ('education', 100), ('skills', 150), ('work_experience', 300)
+)
+
+# Expected output length per document: (base, tokens per input token, minimum, maximum)
+OUTPUT_TOKEN_ESTIMATES = {
+    'resume': (600, 1.5, 800, 1500),
+    'cover_letter': (650, 0.1, 700, 1200),
+    'resume_section': (150, 1.5, 200, 600),
+}
+
+# Minimum seconds between streamed preview refreshes
+STREAM_UPDATE_INTERVAL = 0.1
+
+# On-disk location of the generation cache
+GENERATION_CACHE_PATH = os.environ.get(
+    "GENERATION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "generations.sqlite3")
+)
+
+# Durable queue for background generations, so work survives restarts and closed tabs
+JOB_QUEUE_PATH = os.environ.get(
+    "JOB_QUEUE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "jobs.sqlite3")
+)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
+# Seconds between status checks while the page waits for queued jobs
+JOB_POLL_INTERVAL = 1.0
+
+# Zip settings for generated .docx files ("stored" skips compression entirely)
+DOCX_COMPRESSION = zipfile.ZIP_STORED if os.environ.get("DOCX_COMPRESSION") == "stored" else zipfile.ZIP_DEFLATED
+DOCX_COMPRESSLEVEL = int(os.environ["DOCX_COMPRESSLEVEL"]) if os.environ.get("DOCX_COMPRESSLEVEL") else None
+
+# Memory cap for generated text, user data and rendered files kept for sessions (shared by all of
+# them), and an optional directory to spill evicted ones to instead of dropping them
+ARTIFACT_STORE_MAX_BYTES = int(float(os.environ.get("ARTIFACT_STORE_MAX_MB", "256")) * 1024 * 1024)
+ARTIFACT_SPILL_DIR = os.environ.get("ARTIFACT_SPILL_DIR") or None
+ARTIFACT_SPILL_MAX_BYTES = int(float(os.environ.get("ARTIFACT_SPILL_MAX_MB", "1024")) * 1024 * 1024)
+
+# Optional file for the structured JSON metrics log
+METRICS_LOG_PATH = os.environ.get("METRICS_LOG_PATH")
+
+# Request layer limits, shared by every session in this process
+GROQ_REQUESTS_PER_MINUTE = float(os.environ.get("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_REQUEST_TIMEOUT = float(os.environ.get("GROQ_REQUEST_TIMEOUT", "60"))
+
+# Connection pool to the API: connections open at once, seconds an idle one is kept
+# (httpx's default of 5 drops it between clicks), and HTTP/2 ("auto" uses it if h2 is installed)
+GROQ_MAX_CONNECTIONS = int(os.environ.get("GROQ_MAX_CONNECTIONS", "32"))
+GROQ_KEEPALIVE_EXPIRY = float(os.environ.get("GROQ_KEEPALIVE_EXPIRY", "120"))
+GROQ_HTTP2 = {"auto": None, "1": True, "0": False}[os.environ.get("GROQ_HTTP2", "auto")]
+
+# Whether to open API connections in the background at startup, how many (one per call the page
+# makes at once) and how long that may take; a positive ping interval keeps them open while idle
+GROQ_WARMUP = os.environ.get("GROQ_WARMUP", "1") != "0"
+GROQ_WARMUP_TIMEOUT = float(os.environ.get("GROQ_WARMUP_TIMEOUT", "10"))
+GROQ_WARMUP_CONNECTIONS = int(os.environ.get("GROQ_WARMUP_CONNECTIONS", "2"))
+GROQ_KEEPALIVE_PING_INTERVAL = float(os.environ.get("GROQ_KEEPALIVE_PING_INTERVAL", "0"))
+
+# Cover letters generated at once when writing to several companies
+COVER_LETTER_FANOUT_WORKERS = int(os.environ.get("COVER_LETTER_FANOUT_WORKERS", "4"))
+
+# Cover letters for near-identical job descriptions (estimated Jaccard similarity of
+# word shingles, after ignoring case, punctuation and numbers) can be reused
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.85"))
+NEAR_DUPLICATE_MAX_ENTRIES = int(os.environ.get("NEAR_DUPLICATE_MAX_ENTRIES", "20000"))
+NEAR_DUPLICATE_MODES = {
+    'adapt': "Reuse the earlier letter, revised for the changes",
+    'reuse': "Reuse the earlier letter as is",
+    None: "Always write a new letter",
+}
+
+# Picks the model for each completion from rolling latency and error statistics;
+# shared by every session so they all learn from each other's calls
+@st.cache_resource
+def get_model_router():
+    return ModelRouter(MODELS, MODEL_TASKS)
+
+def should_fall_back(error):
+    """Whether another model might succeed where this one failed
+
+    Only outages do: an open circuit, a dropped connection, throttling or a
+    server error. A full rate limit queue would hold up every model alike,
+    and a 4xx means the request itself is wrong.
+    """
+    if isinstance(error, CircuitOpenError):
+        return True
+    return not isinstance(error, RequestRejected) and is_retryable(error)
+
+# Pool settings shared by the sync and async clients
+def groq_transport_settings(max_connections=GROQ_MAX_CONNECTIONS):
+    return {
+        'max_connections': max_connections,
+        'keepalive_expiry': GROQ_KEEPALIVE_EXPIRY,
+        'http2': GROQ_HTTP2,
+        'timeout': GROQ_REQUEST_TIMEOUT,
+    }
+
+def build_groq_client(api_key, base_url=None, max_connections=GROQ_MAX_CONNECTIONS):
+    # The SDK takes a few hundred milliseconds to import, so it is loaded here rather than at startup
+    import groq
+    
+    # Retries are handled by the request layer, not the SDK
+    return groq.Groq(api_key=api_key, base_url=base_url, max_retries=0,
+                     http_client=build_http_client(**groq_transport_settings(max_connections)))
+
+def build_async_groq_client(api_key, base_url=None, max_connections=GROQ_MAX_CONNECTIONS):
+    """AsyncGroq client on the same kind of pool, for asyncio code that runs many calls at once"""
+    import groq
+    
+    return groq.AsyncGroq(api_key=api_key, base_url=base_url, max_retries=0,
+                          http_client=build_async_http_client(**groq_transport_settings(max_connections)))
+
+def warm_up_groq_client(client):
+    """Open connections to the API with cheap calls, so the first generations skip the handshake"""
+    ping = functools.partial(client.models.list, timeout=GROQ_WARMUP_TIMEOUT)
+    warm_connections(ping, GROQ_WARMUP_CONNECTIONS)
+    KeepWarm(ping, GROQ_WARMUP_CONNECTIONS, GROQ_KEEPALIVE_PING_INTERVAL).start()
+
+# Initialize Groq client; it is built and warmed up in the background once the page has rendered
 @st.cache_resource
 def get_groq_client():
     try:
-        client = groq.Groq(api_key=st.secrets["GROQ_API_KEY"])
-        return client
+        api_key = st.secrets["GROQ_API_KEY"]
     except Exception as e:
         st.error(f"Error initializing Groq client: {e}")
         return None
+    client = DeferredClient(
+        functools.partial(build_groq_client, api_key),
+        warm_up=warm_up_groq_client if GROQ_WARMUP else None
+    )
+    return ResilientClient(
+        client,
+        requests_per_minute=GROQ_REQUESTS_PER_MINUTE,
+        timeout=GROQ_REQUEST_TIMEOUT
+    )
+
+def start_client_setup(client):
+    """Build (and warm up) a deferred API client in the background if that hasn't started yet"""
+    deferred = getattr(client, 'client', None)
+    if isinstance(deferred, DeferredClient):
+        deferred.start()
+
+# Shared across sessions so identical requests hit the same cache
+@st.cache_resource
+def get_generation_cache():
+    return GenerationCache(GENERATION_CACHE_PATH)
+
+# Attach metrics sinks once per process; the rolling window feeds the diagnostics panel
+@st.cache_resource
+def get_metrics_window():
+    window = RollingWindowSink(window=500)
+    METRICS.add_sink(window)
+    METRICS.add_sink(JsonLogSink(path=METRICS_LOG_PATH))
+    return window
+
+# One copy of each artifact per process, however many sessions hold it
+@st.cache_resource
+def get_artifact_store():
+    return ArtifactStore(
+        max_bytes=ARTIFACT_STORE_MAX_BYTES, spill_dir=ARTIFACT_SPILL_DIR, max_spill_bytes=ARTIFACT_SPILL_MAX_BYTES
+    )
+
+# Rendered previews and documents, reused across reruns and sessions; the bytes live in the artifact store
+@st.cache_resource
+def get_render_cache():
+    return RenderCache(store=get_artifact_store())
+
+# Rendered resume sections, HTML and DOCX, keyed by the section itself; shared by every session,
+# so sections an edit or rewrite left alone are not rendered again
+@st.cache_resource
+def get_section_cache():
+    return RenderCache(max_entries=1024)
+
+# Resume documents built directly rather than parsed (structured output, section
+# rewrites, edits), keyed by their text; kept across reruns and shared by every session
+@st.cache_resource
+def get_structured_documents():
+    return DocumentRegistry()
+
+# Resume documents parsed from their text, so each text is parsed once however
+# many reruns and renderers use it
+@st.cache_resource
+def get_parsed_documents():
+    return DocumentRegistry(max_entries=32)
+
+def keep_artifact(key, value):
+    """Put value in the artifact store and keep only its handle in the session under key"""
+    st.session_state[key] = get_artifact_store().put(value)
+
+def load_artifact(key):
+    """Return the value whose handle the session keeps under key, or None
+
+    A value the store has evicted (and not spilled to disk) is forgotten
+    with a warning, as if it had never been generated.
+    """
+    handle = st.session_state.get(key)
+    if handle is None:
+        return None
+    value = get_artifact_store().get(handle)
+    if value is None:
+        del st.session_state[key]
+        st.warning("An earlier result was cleared to free memory on the server; please generate it again")
+    return value
+
+def keep_resume(content, section_lines=None):
+    """Keep resume text in the session, with the sections it was built from when it wasn't parsed
+
+    The section structure outlives the process-wide registry this way, so
+    the headers of a structured or edited resume are never guessed from its
+    text. section_lines (from a finished job) registers a structure first.
+    """
+    if section_lines:
+        get_structured_documents().add(content, document_from_section_lines(section_lines))
+    keep_artifact('resume_content', content)
+    document = get_structured_documents().get(content)
+    if document is None:
+        st.session_state.pop('resume_sections', None)
+    else:
+        keep_artifact('resume_sections', document.as_section_lines())
+
+def load_resume():
+    """Return the session's resume text, registering its section structure again if the registry dropped it"""
+    content = load_artifact('resume_content')
+    handle = st.session_state.get('resume_sections')
+    if content and handle is not None and get_structured_documents().get(content) is None:
+        section_lines = get_artifact_store().get(handle)
+        if section_lines:
+            get_structured_documents().add(content, document_from_section_lines(section_lines))
+    return content
+
+def artifact_editor(label, key, value, **kwargs):
+    """Text area for editing the artifact the session keeps under key
+
+    It shows the user's own edits until the artifact is replaced some other
+    way (generated again, a section rewritten), then starts over from value.
+    """
+    editor_key = f'{key}_editor'
+    if st.session_state.get(f'{editor_key}_handle') != st.session_state[key]:
+        st.session_state[editor_key] = value
+        st.session_state[f'{editor_key}_handle'] = st.session_state[key]
+    return st.text_area(label, key=editor_key, height=400, label_visibility="collapsed", **kwargs)
+
+def sync_editor(key):
+    """Mark artifact_editor's text as the artifact now kept under key, so it isn't reset"""
+    st.session_state[f'{key}_editor_handle'] = st.session_state[key]
 
-def generate_resume_content(client, user_data):
-    """Generate resume content using Groq API"""
-    prompt = f"""
+# Background generation queue and its workers, one set per process; jobs left
+# over from a previous process are picked up again once their lease runs out
+@st.cache_resource
+def get_job_queue(_client, _cache):
+    queue = JobQueue(JOB_QUEUE_PATH)
+    workers = JobWorkers(queue, functools.partial(run_generation_job, _client, _cache), count=JOB_WORKERS)
+    return queue, workers.start()
+
+def build_resume_prompt(user_data):
+    """Build the resume generation prompt"""
+    return f"""
     Create a professional resume for the following person. Structure it with clear sections and bullet points:
 
     Personal Information:
@@ -66,30 +356,61 @@ def generate_resume_content(client, user_data):
 
     Use clear formatting with bullet points and ensure each section is well-organized.
     """
+
+def build_structured_resume_prompt(user_data, keys=None):
+    """Build a prompt asking for resume sections as a JSON object
+
+    With keys, only those sections are requested (used to redo invalid ones).
+    """
+    keys = keys or [key for key, _, _ in RESUME_SCHEMA]
+    return f"""
+    Create a professional resume for the following person.
+
+    Personal Information:
+    - Name: {user_data['name']}
+    - Email: {user_data['email']} 
+    - Phone: {user_data['phone']}
+    - Address: {user_data['address']}
+    - LinkedIn: {user_data.get('linkedin', 'N/A')}
+
+    Education: {user_data['education']}
     
-    try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama3-8b-8192",
-            temperature=0.7,
-            max_tokens=1500
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error generating resume: {e}")
-        return None
+    Work Experience: {user_data['work_experience']}
+    
+    Skills: {user_data['skills']}
+    
+    Target Job Role: {user_data['job_role']}
+    
+    Additional Information: {user_data.get('additional_info', 'None')}
 
-def generate_cover_letter(client, user_data, company_info):
-    """Generate cover letter using Groq API"""
-    prompt = f"""
-    Write a professional cover letter for the following person applying to {company_info.get('company_name', 'the company')} for the position of {user_data['job_role']}.
+    Please create a professional, ATS-friendly resume. Return ONLY a JSON object with exactly these keys:
+
+    {schema_example(keys)}
 
-    Applicant Information:
+    Each value is a list of lines. Start bullet points with "• ". Do not repeat the section name inside a section.
+    Sections: {', '.join(f'{key} = {SECTION_TITLES[key]}' for key in keys)}.
+    """
+
+def build_applicant_block(user_data):
+    """Build the applicant part of the cover letter prompt, shared by every company"""
+    return f"""Applicant Information:
     - Name: {user_data['name']}
     - Target Role: {user_data['job_role']}
     - Work Experience: {user_data['work_experience']}
     - Skills: {user_data['skills']}
-    - Education: {user_data['education']}
+    - Education: {user_data['education']}"""
+
+def build_cover_letter_prompt(user_data, company_info, applicant_block=None):
+    """Build the cover letter generation prompt
+
+    Pass applicant_block when writing to many companies so it is built once.
+    """
+    if applicant_block is None:
+        applicant_block = build_applicant_block(user_data)
+    return f"""
+    Write a professional cover letter for the following person applying to {company_info.get('company_name', 'the company')} for the position of {user_data['job_role']}.
+
+    {applicant_block}
 
     Company Information:
     - Company Name: {company_info.get('company_name', 'Company')}
@@ -105,393 +426,1127 @@ def generate_cover_letter(client, user_data, company_info):
     
     Format it as a proper business letter.
     """
+
+def budget_prompt(document, build, values, trim_order, input_tokens=None):
+    """Fit values into the prompt budget and size max_tokens for the expected output
+
+    build(values) returns the prompt. max_tokens follows OUTPUT_TOKEN_ESTIMATES
+    from input_tokens, by default the tokens left in the trim_order fields.
+    Returns (prompt, values, budget); budget holds the estimated
+    prompt_tokens, max_tokens and the deduplicated and trimmed fields.
+    """
+    base, per_input_token, minimum, maximum = OUTPUT_TOKEN_ESTIMATES[document]
+    # Leave room in the context window for the longest answer we might ask for
+    limit = min(PROMPT_TOKEN_BUDGET, CONTEXT_WINDOW - maximum)
+    prompt, values, budget = fit_fields(values, trim_order, build, limit)
+    if input_tokens is None:
+        input_tokens = sum(count_tokens(values.get(field) or '') for field, _ in trim_order)
+    budget['max_tokens'] = estimate_max_tokens(input_tokens, base, per_input_token, minimum, maximum)
+    return prompt, values, budget
+
+def prepare_resume_prompt(user_data, build=build_resume_prompt):
+    """Return the budgeted resume prompt and its budget"""
+    prompt, _, budget = budget_prompt('resume', build, user_data, RESUME_TRIM_ORDER)
+    return prompt, budget
+
+def prepare_cover_letter_prompt(user_data, company_info, applicant_block=None):
+    """Return the budgeted cover letter prompt and its budget"""
+    def build(values):
+        applicant = {field: values[field] for field in user_data}
+        company = {field: values[field] for field in company_info}
+        # A prebuilt applicant block only holds while trimming left those fields alone
+        unchanged = all(applicant[field] is user_data[field] for field in user_data)
+        return build_cover_letter_prompt(applicant, company, applicant_block if unchanged else None)
+    
+    prompt, _, budget = budget_prompt('cover_letter', build, {**user_data, **company_info},
+                                      COVER_LETTER_TRIM_ORDER)
+    return prompt, budget
+
+def record_prompt_budget(stats, budget):
+    """Keep a prompt's token estimate, output cap and trimmed fields with its stats"""
+    stats['prompt_tokens_estimate'] = budget['prompt_tokens']
+    stats['max_tokens'] = budget['max_tokens']
+    stats['trimmed_fields'] = budget['trimmed']
+
+def completion_cache_key(task, prompt, max_tokens):
+    """Cache key of a completion, whichever model ends up serving it
+
+    Keyed by the task's first model, so entries written before routing still hit.
+    """
+    policy = MODEL_TASKS[task]
+    return make_cache_key(prompt, policy['models'][0], policy['temperature'], max_tokens)
+
+def run_completion(client, prompt, max_tokens, task, on_update=None, stats=None,
+                   cache=None, force_regenerate=False, json_mode=False):
+    """Run a chat completion, streaming partial text to on_update when given
+
+    task picks the models to try (see MODEL_TASKS); the router sends the call
+    to the fastest healthy one and falls back to the next if it fails.
+    json_mode asks the API to return a single JSON object.
+    """
+    if stats is None:
+        stats = {}
+    started = time.perf_counter()
+    
+    cache_key = None
+    if cache is not None:
+        cache_key = completion_cache_key(task, prompt, max_tokens)
+        content = None if force_regenerate else cache.get(cache_key)
+        if content is not None:
+            if on_update is not None:
+                on_update(content)
+            elapsed = time.perf_counter() - started
+            stats['time_to_first_token'] = elapsed
+            stats['total_latency'] = elapsed
+            stats['cached'] = True
+            return content
+    
+    options = {'response_format': {"type": "json_object"}} if json_mode else {}
+    
+    def attempt(model, temperature):
+        attempt_started = time.perf_counter()
+        first_token_at = None
+        usage = None
+        finish_reason = None
+        if on_update is None:
+            response = client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **options
+            )
+            content = response.choices[0].message.content
+            finish_reason = getattr(response.choices[0], 'finish_reason', None)
+            usage = getattr(response, 'usage', None)
+        else:
+            stream = client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **options
+            )
+            parts = []
+            last_update = 0.0
+            for chunk in stream:
+                # Groq reports usage on the final chunk
+                x_groq = getattr(chunk, 'x_groq', None)
+                if x_groq is not None and getattr(x_groq, 'usage', None) is not None:
+                    usage = x_groq.usage
+                elif getattr(chunk, 'usage', None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                finish_reason = getattr(chunk.choices[0], 'finish_reason', None) or finish_reason
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                now = time.perf_counter()
+                if first_token_at is None:
+                    first_token_at = now
+                parts.append(delta)
+                # Throttle UI updates; each one re-renders the preview
+                if now - last_update >= STREAM_UPDATE_INTERVAL:
+                    on_update(''.join(parts))
+                    last_update = now
+            content = ''.join(parts)
+            on_update(content)
+        return content, usage, finish_reason, attempt_started, first_token_at
+    
+    model, result, fallbacks = get_model_router().call(task, attempt, should_fall_back=should_fall_back)
+    # Latencies include any failed models before it, as the user waited for them too
+    content, usage, finish_reason, attempt_started, first_token_at = result
+    stats['model'] = model
+    stats['fallbacks'] = fallbacks
+    METRICS.record('llm.routed', 1, task=task, model=model)
+    for failed in fallbacks:
+        METRICS.record('llm.fallbacks', 1, task=task, model=failed)
+    
+    finished = time.perf_counter()
+    if cache_key is not None and content:
+        cache.set(cache_key, content)
+    stats['time_to_first_token'] = (first_token_at or finished) - started
+    stats['total_latency'] = finished - started
+    stats['cached'] = False
+    # The answer hit max_tokens, so the output estimate was too tight
+    stats['truncated'] = finish_reason == 'length'
+    if usage is not None:
+        stats['prompt_tokens'] = usage.prompt_tokens
+        stats['completion_tokens'] = usage.completion_tokens
+        stats['queue_time'] = getattr(usage, 'queue_time', None)
+        # Generation speed after the first token when streaming, end to end otherwise
+        generation_time = finished - (first_token_at or attempt_started)
+        if usage.completion_tokens and generation_time > 0:
+            stats['tokens_per_second'] = usage.completion_tokens / generation_time
+    return content
+
+def record_generation_metrics(document, stats):
+    """Send the timings and token usage of one generation to the metrics sinks"""
+    tags = {'document': document}
+    METRICS.record('llm.cache_hit', 1 if stats.get('cached') else 0, **tags)
+    if stats.get('cached'):
+        return
+    METRICS.record('llm.latency_seconds', stats['total_latency'], **tags)
+    METRICS.record('llm.time_to_first_token_seconds', stats['time_to_first_token'], **tags)
+    METRICS.record('llm.truncated', 1 if stats.get('truncated') else 0, **tags)
+    for key in ('prompt_tokens', 'completion_tokens', 'tokens_per_second'):
+        if stats.get(key) is not None:
+            METRICS.record(f'llm.{key}', stats[key], **tags)
+    if stats.get('queue_time') is not None:
+        METRICS.record('llm.queue_seconds', stats['queue_time'], **tags)
+
+def add_request_stats(stats, extra):
+    """Fold the timings and token usage of a follow-up request into stats"""
+    stats['total_latency'] = stats.get('total_latency', 0) + extra.get('total_latency', 0)
+    stats['cached'] = stats.get('cached', True) and extra.get('cached', False)
+    for key in ('prompt_tokens', 'completion_tokens'):
+        if extra.get(key) is not None:
+            stats[key] = (stats.get(key) or 0) + extra[key]
+
+def generate_structured_resume(client, user_data, stats, cache=None, force_regenerate=False):
+    """Generate a resume as JSON sections, redoing only the sections that fail validation
+
+    Falls back to the text parser when the model ignores the JSON format,
+    and to a plain text generation when nothing usable comes back.
+    Returns the resume as text; the validated document is registered so
+    renderers use it instead of re-parsing.
+    """
+    with METRICS.timer('prompt.build_seconds', document='resume'):
+        prompt, budget = prepare_resume_prompt(user_data, build_structured_resume_prompt)
+    record_prompt_budget(stats, budget)
+    raw = run_completion(client, prompt, budget['max_tokens'], 'resume', stats=stats, cache=cache,
+                         force_regenerate=force_regenerate, json_mode=True)
+    
+    data = extract_json_object(raw)
+    if data is None:
+        valid, invalid = {}, [key for key, _, required in RESUME_SCHEMA if required]
+    else:
+        valid, invalid = validate_sections(data)
+    if not stats.get('cached'):
+        METRICS.record('structured.first_pass_ok', 0 if invalid else 1, document='resume')
+    
+    outcome = 'first_pass'
+    if data is None and parse_document(raw).sections:
+        # The model ignored the JSON format but kept the text layout
+        outcome = 'text_fallback'
+        content = raw
+    else:
+        if invalid:
+            # One more request, for the failed sections only
+            repair_stats = {}
+            repair_prompt, repair_budget = prepare_resume_prompt(
+                user_data, lambda values: build_structured_resume_prompt(values, invalid)
+            )
+            repair_raw = run_completion(
+                client, repair_prompt, repair_budget['max_tokens'], 'resume',
+                stats=repair_stats, cache=cache, force_regenerate=force_regenerate, json_mode=True
+            )
+            add_request_stats(stats, repair_stats)
+            METRICS.record('structured.repaired_sections', len(invalid), document='resume')
+            repaired = extract_json_object(repair_raw)
+            if repaired is not None:
+                fixed, invalid = validate_sections(repaired, keys=invalid)
+                valid.update(fixed)
+            outcome = 'partial' if invalid else 'repaired'
+        
+        if valid:
+            document = build_document(valid)
+            content = document.as_text()
+            get_structured_documents().add(content, document)
+        else:
+            outcome = 'text_fallback'
+            fallback_stats = {}
+            fallback_prompt, fallback_budget = prepare_resume_prompt(user_data)
+            content = run_completion(client, fallback_prompt, fallback_budget['max_tokens'], 'resume',
+                                     stats=fallback_stats, cache=cache, force_regenerate=force_regenerate)
+            add_request_stats(stats, fallback_stats)
+    
+    stats['structured'] = outcome
+    METRICS.record('structured.outcomes', 1, document='resume', outcome=outcome)
+    return content
+
+def generate_resume_content(client, user_data, on_update=None, stats=None,
+                            cache=None, force_regenerate=False, structured=False):
+    """Generate resume content using Groq API
+
+    structured requests JSON sections instead of streamed text; on_update
+    then only receives the finished resume.
+    """
+    if stats is None:
+        stats = {}
     
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama3-8b-8192",
-            temperature=0.7,
-            max_tokens=1200
-        )
-        return response.choices[0].message.content
+        if structured:
+            content = generate_structured_resume(client, user_data, stats, cache=cache,
+                                                 force_regenerate=force_regenerate)
+            if on_update is not None and content:
+                on_update(content)
+        else:
+            with METRICS.timer('prompt.build_seconds', document='resume'):
+                prompt, budget = prepare_resume_prompt(user_data)
+            record_prompt_budget(stats, budget)
+            content = run_completion(client, prompt, budget['max_tokens'], 'resume', on_update=on_update,
+                                     stats=stats, cache=cache, force_regenerate=force_regenerate)
+    except Exception as e:
+        stats['error'] = str(e)
+        stats['error_type'] = type(e).__name__
+        METRICS.record('llm.errors', 1, document='resume')
+        st.error(f"Error generating resume: {e}")
+        return None
+    record_generation_metrics('resume', stats)
+    return content
+
+# Similarity index over job descriptions, shared by every session; built on first use
+# since it needs numpy
+@st.cache_resource
+def get_near_duplicate_index():
+    from utils.near_duplicates import NearDuplicateIndex
+    
+    return NearDuplicateIndex(threshold=NEAR_DUPLICATE_THRESHOLD, max_entries=NEAR_DUPLICATE_MAX_ENTRIES)
+
+def near_duplicate_scope(user_data, company_info):
+    """Hash the cover letter prompt without its job description
+    
+    Only letters whose prompts agree on everything else are compared.
+    """
+    prompt = build_cover_letter_prompt(user_data, dict(company_info, job_description=''))
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def split_sentences(text):
+    return [sentence for sentence in re.split(r'\n+|(?<=[.!?])\s+', text) if sentence.strip()]
+
+def build_adapt_cover_letter_prompt(cover_letter, old_description, new_description):
+    """Ask for an earlier cover letter revised only for what changed in the job description"""
+    old, new = split_sentences(old_description), split_sentences(new_description)
+    removed, added = [], []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag != 'equal':
+            removed.extend(old[i1:i2])
+            added.extend(new[j1:j2])
+    
+    return f"""The cover letter below was written for a job posting that has since been updated.
+Revise the letter only where the changes call for it and keep everything else exactly as it is.
+Return only the complete cover letter, with no commentary.
+
+Removed from the posting:
+{chr(10).join(removed) or '(nothing)'}
+
+Added to the posting:
+{chr(10).join(added) or '(nothing)'}
+
+Cover letter:
+{cover_letter}"""
+
+def reuse_near_duplicate(client, user_data, company_info, cache_key, max_tokens, mode,
+                         on_update=None, stats=None, cache=None):
+    """Serve a letter written for a near-identical job description, or None if there is none
+
+    In 'adapt' mode the earlier letter is revised for the changed sentences
+    with a short edit prompt; descriptions that differ only in spacing are
+    reused as is. The similarity estimate only finds the candidate: it
+    ignores numbers and can round a small change up to 1.0.
+    """
+    # The exact letter is served by the normal path; the index may have been
+    # reset since (e.g. a restart) and would only find another posting's letter
+    if cache_key in cache:
+        return None
+    index = get_near_duplicate_index()
+    description = company_info.get('job_description') or ''
+    scope = near_duplicate_scope(user_data, company_info)
+    match = index.query(scope, description, exclude=cache_key)
+    if match is None:
+        return None
+    content = cache.get(match.value)
+    if content is None:
+        index.discard(match.value)
+        return None
+    
+    adapt = mode == 'adapt' and match.text.split() != description.split()
+    if adapt:
+        prompt = build_adapt_cover_letter_prompt(content, match.text, description)
+        content = run_completion(client, prompt, max_tokens, 'cover_letter', on_update=on_update,
+                                 stats=stats, cache=cache)
+        if not content:
+            return None
+    else:
+        if on_update is not None:
+            on_update(content)
+        stats['time_to_first_token'] = 0.0
+        stats['total_latency'] = 0.0
+        stats['cached'] = True
+    
+    # Next time this exact prompt is a plain cache hit
+    cache.set(cache_key, content)
+    index.add(scope, description, cache_key)
+    stats['near_duplicate_similarity'] = match.similarity
+    stats['near_duplicate_adapted'] = adapt
+    METRICS.record('llm.near_duplicate', 1, outcome='adapted' if adapt else 'reused')
+    return content
+
+def generate_cover_letter(client, user_data, company_info, on_update=None, stats=None,
+                          cache=None, force_regenerate=False, applicant_block=None, near_duplicates=None):
+    """Generate cover letter using Groq API
+
+    near_duplicates ('reuse' or 'adapt', see NEAR_DUPLICATE_MODES) serves the
+    letter written for a near-identical job description instead of a new one.
+    """
+    if stats is None:
+        stats = {}
+    with METRICS.timer('prompt.build_seconds', document='cover_letter'):
+        prompt, budget = prepare_cover_letter_prompt(user_data, company_info, applicant_block)
+    record_prompt_budget(stats, budget)
+    
+    try:
+        content = None
+        cache_key = None
+        if cache is not None and company_info.get('job_description'):
+            cache_key = completion_cache_key('cover_letter', prompt, budget['max_tokens'])
+            if near_duplicates and not force_regenerate:
+                content = reuse_near_duplicate(client, user_data, company_info, cache_key, budget['max_tokens'],
+                                               near_duplicates, on_update=on_update, stats=stats, cache=cache)
+        if content is None:
+            content = run_completion(client, prompt, budget['max_tokens'], 'cover_letter', on_update=on_update,
+                                     stats=stats, cache=cache, force_regenerate=force_regenerate)
+            if content and cache_key is not None:
+                get_near_duplicate_index().add(near_duplicate_scope(user_data, company_info),
+                                               company_info['job_description'], cache_key)
     except Exception as e:
+        stats['error'] = str(e)
+        stats['error_type'] = type(e).__name__
+        METRICS.record('llm.errors', 1, document='cover_letter')
         st.error(f"Error generating cover letter: {e}")
         return None
+    record_generation_metrics('cover_letter', stats)
+    return content
 
-def create_resume_html(resume_content, user_data):
-    """Convert resume content to HTML with styling"""
+def generate_both_concurrently(client, user_data, company_info, cache=None, force_regenerate=False,
+                               structured=False, near_duplicates=None):
+    """Generate the resume and cover letter in parallel
+
+    Yields (kind, content, stats) for 'resume' and 'cover_letter' in the
+    order they finish, so callers can show each one as soon as it is ready.
+    """
+    ctx = get_script_run_ctx()
     
-    # Parse the resume content into sections
-    sections = parse_resume_sections(resume_content)
-    
-    html_sections = ""
-    for section_title, section_content in sections.items():
-        formatted_content = format_section_content(section_content)
-        html_sections += f"""
-            <div class="section">
-                <div class="section-title">{section_title}</div>
-                <div class="section-content">{formatted_content}</div>
-            </div>
-        """
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: 'Arial', sans-serif;
-                line-height: 1.6;
-                color: #333;
-                max-width: 800px;
-                margin: 0 auto;
-                padding: 20px;
-                background-color: #f9f9f9;
-            }}
-            .resume-container {{
-                background: white;
-                padding: 40px;
-                border-radius: 8px;
-                box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            }}
-            .header {{
-                text-align: center;
-                border-bottom: 3px solid #2c3e50;
-                padding-bottom: 20px;
-                margin-bottom: 30px;
-            }}
-            .name {{
-                font-size: 32px;
-                font-weight: bold;
-                color: #2c3e50;
-                margin-bottom: 10px;
-                letter-spacing: 1px;
-            }}
-            .contact-info {{
-                font-size: 14px;
-                color: #666;
-                line-height: 1.4;
-            }}
-            .section {{
-                margin-bottom: 25px;
-            }}
-            .section-title {{
-                font-size: 16px;
-                font-weight: bold;
-                color: #2c3e50;
-                border-bottom: 2px solid #3498db;
-                padding-bottom: 5px;
-                margin-bottom: 15px;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }}
-            .section-content {{
-                font-size: 14px;
-                line-height: 1.6;
-            }}
-            .section-content ul {{
-                margin: 10px 0;
-                padding-left: 20px;
-            }}
-            .section-content li {{
-                margin-bottom: 8px;
-                text-align: justify;
-            }}
-            .section-content p {{
-                margin-bottom: 12px;
-                text-align: justify;
-            }}
-            .work-item {{
-                margin-bottom: 20px;
-            }}
-            .job-title {{
-                font-weight: bold;
-                color: #2c3e50;
-                font-size: 15px;
-            }}
-            .company {{
-                color: #3498db;
-                font-weight: 600;
-            }}
-            .date {{
-                color: #666;
-                font-style: italic;
-                float: right;
-            }}
-            @media print {{
-                body {{ background-color: white; }}
-                .resume-container {{ box-shadow: none; }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="resume-container">
-            <div class="header">
-                <div class="name">{user_data['name']}</div>
-                <div class="contact-info">
-                    {user_data['email']} | {user_data['phone']}<br>
-                    {user_data['address']}
-                    {f"<br>LinkedIn: {user_data['linkedin']}" if user_data.get('linkedin') and user_data['linkedin'].strip() else ""}
-                </div>
-            </div>
-            {html_sections}
-        </div>
-    </body>
-    </html>
+    def run(kind):
+        # Let st.error calls from the worker reach this session
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        stats = {}
+        if kind == 'resume':
+            content = generate_resume_content(client, user_data, stats=stats, cache=cache,
+                                              force_regenerate=force_regenerate, structured=structured)
+        else:
+            content = generate_cover_letter(client, user_data, company_info, stats=stats, cache=cache,
+                                            force_regenerate=force_regenerate, near_duplicates=near_duplicates)
+        return kind, content, stats
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(run, 'resume'), pool.submit(run, 'cover_letter')]
+        for future in as_completed(futures):
+            yield future.result()
+
+def run_generation_job(client, cache, kind, payload):
+    """Run one queued generation; raising makes the queue retry it"""
+    stats = {}
+    options = {'stats': stats, 'cache': cache, 'force_regenerate': payload.get('force_regenerate', False)}
+    if kind == 'resume':
+        content = generate_resume_content(client, payload['user_data'],
+                                          structured=payload.get('structured', False), **options)
+    else:
+        content = generate_cover_letter(client, payload['user_data'], payload['company_info'],
+                                        near_duplicates=payload.get('near_duplicates'), **options)
+    if not content:
+        raise RuntimeError(stats.get('error', 'empty response'))
+    result = {'content': content, 'stats': stats}
+    # The session that picks the result up may not share this process's registry
+    document = get_structured_documents().get(content) if kind == 'resume' else None
+    if document is not None:
+        result['section_lines'] = document.as_section_lines()
+    return result
+
+def enqueue_generation(queue, workers, kind, user_data, company_info=None, structured=False,
+                       force_regenerate=False, near_duplicates=None):
+    """Queue a generation and remember its job id in the session and the URL
+
+    Identical requests share one job, so repeated clicks or a reloaded page
+    never generate twice; a forced regeneration always gets a new job.
     """
-    return html_content
+    payload = {'user_data': user_data, 'structured': structured, 'force_regenerate': force_regenerate}
+    if kind == 'cover_letter':
+        payload['company_info'] = company_info
+        payload['near_duplicates'] = near_duplicates
+    key = None if force_regenerate else make_idempotency_key(kind, payload)
+    job_id = queue.enqueue(kind, payload, idempotency_key=key)
+    workers.notify()
+    st.session_state.setdefault('pending_jobs', {})[kind] = job_id
+    st.query_params[f'{kind}_job'] = job_id
+    return job_id
 
-def parse_resume_sections(resume_content):
-    """Parse resume content into sections"""
-    sections = {}
-    current_section = None
-    current_content = []
-    
-    lines = resume_content.split('\n')
-    
-    section_keywords = [
-        'PROFESSIONAL SUMMARY', 'SUMMARY', 'PROFILE',
-        'EDUCATION', 'ACADEMIC BACKGROUND',
-        'WORK EXPERIENCE', 'EXPERIENCE', 'EMPLOYMENT', 'PROFESSIONAL EXPERIENCE',
-        'SKILLS', 'TECHNICAL SKILLS', 'CORE COMPETENCIES',
-        'ADDITIONAL INFORMATION', 'CERTIFICATIONS', 'PROJECTS', 'ACHIEVEMENTS'
-    ]
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
+JOB_STATUS_LABELS = {QUEUED: "⏳ Queued", RUNNING: "⚙️ Generating"}
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def show_pending_jobs(queue):
+    """Poll queued generations, moving finished ones into the session"""
+    pending = st.session_state.get('pending_jobs', {})
+    finished = False
+    for kind, job_id in list(pending.items()):
+        job = queue.get(job_id)
+        label = kind.replace('_', ' ')
+        if job is not None and job['status'] in (QUEUED, RUNNING):
+            attempt = job['attempts'] + (1 if job['status'] == QUEUED else 0)
+            st.caption(
+                f"{JOB_STATUS_LABELS[job['status']]} {label} · job `{job_id}`"
+                + (f" · attempt {attempt} after: {job['error']}" if job['error'] else "")
+            )
             continue
-            
-        # Check if this line is a section header
-        is_section_header = False
-        for keyword in section_keywords:
-            if keyword in line.upper() and len(line) <= 50:  # Likely a header
-                is_section_header = True
-                if current_section:
-                    sections[current_section] = '\n'.join(current_content)
-                current_section = keyword
-                current_content = []
-                break
         
-        if not is_section_header and current_section:
-            current_content.append(line)
+        if job is None or job['status'] == FAILED:
+            st.session_state.setdefault('job_errors', []).append(
+                f"The {label} job {job_id} failed: {job['error'] if job else 'no such job'}"
+            )
+        else:
+            if kind == 'resume':
+                keep_resume(job['result']['content'], job['result'].get('section_lines'))
+            else:
+                keep_artifact(f'{kind}_content', job['result']['content'])
+            keep_artifact('user_data', job['payload']['user_data'])
+            st.session_state[f'{kind}_timing'] = job['result']['stats']
+        del pending[kind]
+        st.query_params.pop(f'{kind}_job', None)
+        finished = True
+    if finished:
+        st.rerun()
+
+def show_job_queue(queue):
+    """Show queue depth and let a job be picked up again by id"""
+    with st.sidebar.expander("🧾 Background jobs"):
+        stats = queue.stats()
+        st.caption(
+            f"Queued: {stats[QUEUED]} · Running: {stats[RUNNING]} · "
+            f"Done: {stats[DONE]} · Failed: {stats[FAILED]}"
+        )
+        job_id = st.text_input("Load a job by id", placeholder="job id from an earlier run").strip()
+        if job_id and st.button("Load job", use_container_width=True):
+            job = queue.get(job_id)
+            if job is None:
+                st.error("No job with that id")
+            else:
+                st.session_state.setdefault('pending_jobs', {})[job['kind']] = job_id
+
+def dedupe_targets(targets):
+    """Clean a list of job targets, dropping rows without a company and repeats
+
+    Targets match when company and hiring manager agree case-insensitively
+    and the job descriptions agree ignoring whitespace; the first one wins.
+    """
+    unique = []
+    seen = set()
+    for target in targets:
+        company_name = ' '.join(str(target.get('company_name') or '').split())
+        hiring_manager = ' '.join(str(target.get('hiring_manager') or '').split())
+        job_description = str(target.get('job_description') or '').strip()
+        if not company_name:
+            continue
+        key = (company_name.casefold(), hiring_manager.casefold(), ' '.join(job_description.split()))
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append({
+            'company_name': company_name,
+            'hiring_manager': hiring_manager,
+            'job_description': job_description,
+        })
+    return unique
+
+def generate_cover_letters_for_targets(client, user_data, targets, max_workers=COVER_LETTER_FANOUT_WORKERS,
+                                       cache=None, force_regenerate=False, near_duplicates=None):
+    """Generate one cover letter per target with at most max_workers calls in flight
+
+    Yields (index, content, stats) in the order letters finish; content is
+    None when a letter failed.
+    """
+    ctx = get_script_run_ctx()
+    applicant_block = build_applicant_block(user_data)
     
-    # Add the last section
-    if current_section and current_content:
-        sections[current_section] = '\n'.join(current_content)
+    def run(index):
+        # Let st.error calls from the worker reach this session
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        stats = {}
+        content = generate_cover_letter(client, user_data, targets[index], stats=stats, cache=cache,
+                                        force_regenerate=force_regenerate, applicant_block=applicant_block,
+                                        near_duplicates=near_duplicates)
+        return index, content, stats
     
-    return sections
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets)))) as pool:
+        futures = [pool.submit(run, index) for index in range(len(targets))]
+        for future in as_completed(futures):
+            yield future.result()
 
-def format_section_content(content):
-    """Format section content with proper HTML"""
-    if not content.strip():
-        return "<p>Information not provided</p>"
+# Form fields each section is written from; other section titles get all of them
+SECTION_FIELDS = {
+    'PROFESSIONAL SUMMARY': ('job_role', 'work_experience', 'skills', 'education'),
+    'EDUCATION': ('education',),
+    'WORK EXPERIENCE': ('job_role', 'work_experience'),
+    'SKILLS': ('job_role', 'skills'),
+    'ADDITIONAL INFORMATION': ('job_role', 'additional_info'),
+}
+
+def build_section_prompt(user_data, title, current_content, instructions=''):
+    """Build a prompt that rewrites a single resume section"""
+    fields = SECTION_FIELDS.get(title, (
+        'job_role', 'education', 'work_experience', 'skills', 'additional_info'
+    ))
+    details = '\n'.join(
+        f"    - {field.replace('_', ' ').title()}: {user_data.get(field) or 'None'}"
+        for field in fields
+    )
+    request = f"\n    Additional request: {instructions}\n" if instructions.strip() else ""
+    return f"""
+    Rewrite the {title} section of a professional, ATS-friendly resume for {user_data['name']}.
+
+    Relevant details:
+{details}
+
+    Current {title} section:
+    {current_content}
+    {request}
+    Return ONLY the new content of this section, without the section title and without any other
+    sections. Use bullet points starting with "• " where they help.
+    """
+
+def section_lines_from_reply(reply, title):
+    """Return the lines of a regenerated section, dropping an echoed title"""
+    lines = [line.strip() for line in reply.split('\n') if line.strip()]
+    if lines and match_section_header(lines[0].strip('*#: ')) == title:
+        lines = lines[1:]
+    return lines
+
+def regenerate_section(client, user_data, resume_content, title, instructions='', stats=None):
+    """Rewrite one resume section and splice it back into the resume
+
+    Returns the updated resume text, or None if the request failed.
+    """
+    if stats is None:
+        stats = {}
+    document = get_resume_document(resume_content)
+    current = document.as_dict()[title]
+    with METRICS.timer('prompt.build_seconds', document='resume_section'):
+        # The output cap follows the length of the section being rewritten
+        prompt, _, budget = budget_prompt(
+            'resume_section', lambda values: build_section_prompt(values, title, current, instructions),
+            user_data, RESUME_TRIM_ORDER, input_tokens=count_tokens(current)
+        )
+    record_prompt_budget(stats, budget)
     
-    lines = content.split('\n')
-    formatted_lines = []
-    current_paragraph = []
+    try:
+        # A regeneration should always produce a fresh take, so the cache is skipped
+        reply = run_completion(client, prompt, budget['max_tokens'], 'resume_section', stats=stats)
+    except Exception as e:
+        stats['error'] = str(e)
+        stats['error_type'] = type(e).__name__
+        METRICS.record('llm.errors', 1, document='resume_section')
+        st.error(f"Error regenerating {title.title()}: {e}")
+        return None
+    record_generation_metrics('resume_section', stats)
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            if current_paragraph:
-                formatted_lines.append('<p>' + ' '.join(current_paragraph) + '</p>')
-                current_paragraph = []
-            continue
-            
-        # Check if line starts with bullet point indicators
-        if line.startswith(('•', '-', '*', '▪', '◦')) or line.startswith(tuple(f'{i}.' for i in range(1, 10))):
-            if current_paragraph:
-                formatted_lines.append('<p>' + ' '.join(current_paragraph) + '</p>')
-                current_paragraph = []
-            # Start or continue a list
-            if not formatted_lines or not formatted_lines[-1].endswith('</ul>'):
-                formatted_lines.append('<ul>')
-            # Clean the bullet point
-            clean_line = line[1:].strip() if line[0] in '•-*▪◦' else line[2:].strip()
-            formatted_lines.append(f'<li>{clean_line}</li>')
-        else:
-            # Close any open list
-            if formatted_lines and formatted_lines[-1].startswith('<li>'):
-                formatted_lines.append('</ul>')
-            current_paragraph.append(line)
+    lines = section_lines_from_reply(reply or '', title)
+    if not lines:
+        stats['error'] = 'empty response'
+        st.error(f"The model returned an empty {title.title()} section; the resume was left unchanged")
+        return None
+    updated = replace_section(document, title, lines)
+    content = updated.as_text()
+    get_structured_documents().add(content, updated)
+    return content
+
+def apply_resume_edit(resume_content, edited_content):
+    """Parse hand-edited resume text against the parse of the text it was edited from
+
+    Unchanged sections keep their parsed objects, so their HTML and DOCX
+    renders are reused and only changed sections are rendered again.
+    Returns the titles of the new or changed sections, or None when the
+    edited text has no section headers left.
+    """
+    with METRICS.timer('edit.parse_seconds', document='resume'):
+        document, changed = reparse_document(get_resume_document(resume_content), edited_content)
+    if not document.sections:
+        return None
+    get_structured_documents().add(edited_content, document)
+    METRICS.record('edit.sections_changed', len(changed), document='resume')
+    return changed
+
+def render_resume_stream(placeholder, partial_content):
+    """Render a partially generated resume as a live section preview"""
+    # Partial text is thrown away on the next update, so it bypasses the document cache
+    sections = parse_document(partial_content).as_dict()
+    with placeholder.container():
+        if not sections:
+            st.text(partial_content)
+            return
+        for section_title, section_content in sections.items():
+            st.markdown(f"**{section_title}**")
+            st.text(section_content)
+
+def render_cover_letter_stream(placeholder, partial_content):
+    """Render a partially generated cover letter"""
+    placeholder.text(partial_content)
+
+# How a structured generation ended up, as shown under the preview
+STRUCTURED_OUTCOMES = {
+    'first_pass': "valid on first pass",
+    'repaired': "invalid sections re-requested",
+    'partial': "some sections missing",
+    'text_fallback': "fell back to text parsing",
+}
+
+def show_timing(stats):
+    """Show time-to-first-token next to total latency"""
+    if stats:
+        st.caption(
+            f"⏱️ First token: {stats['time_to_first_token']:.2f}s · "
+            f"Total: {stats['total_latency']:.2f}s"
+            + (f" · {stats['tokens_per_second']:.0f} tokens/s" if stats.get('tokens_per_second') else "")
+            + (" · served from cache" if stats.get('cached') else f" · {stats['model']}" if stats.get('model') else "")
+            + (f" (after {', '.join(stats['fallbacks'])} failed)" if stats.get('fallbacks') else "")
+            + (f" · structured: {STRUCTURED_OUTCOMES[stats['structured']]}" if stats.get('structured') else "")
+            + (f" · {'adapted' if stats['near_duplicate_adapted'] else 'reused'} from a "
+               f"{stats['near_duplicate_similarity']:.0%} similar job posting"
+               if stats.get('near_duplicate_similarity') else "")
+        )
+        if stats.get('max_tokens'):
+            # Usage from the API when it was reported, the local estimate otherwise
+            prompt_tokens = stats.get('prompt_tokens') or stats.get('prompt_tokens_estimate')
+            st.caption(
+                f"📝 Prompt: {prompt_tokens:,} tokens · Output cap: {stats['max_tokens']:,} tokens"
+                + (f" · Trimmed: {', '.join(field.replace('_', ' ') for field in stats['trimmed_fields'])}"
+                   if stats.get('trimmed_fields') else "")
+                + (" · ⚠️ cut off at the cap" if stats.get('truncated') else "")
+            )
+
+# Keyword scoring needs numpy, so it is imported on first use; scores are kept
+# across reruns, so widget changes don't score the same resume again
+@st.cache_data(max_entries=64, show_spinner=False)
+def score_ats_match(resume_text, job_description):
+    from utils.ats import score_pair
     
-    # Handle remaining content
-    if current_paragraph:
-        formatted_lines.append('<p>' + ' '.join(current_paragraph) + '</p>')
+    return score_pair(resume_text, job_description)
+
+def show_ats_match(resume_content, user_data, job_description):
+    """Show how much of the job description's keyword weight the resume covers"""
+    if not job_description.strip():
+        st.caption("🎯 Paste a job description to see how well the resume matches its keywords")
+        return
+    from utils.ats import resume_text
     
-    # Close any unclosed list
-    if formatted_lines and formatted_lines[-1].startswith('<li>'):
-        formatted_lines.append('</ul>')
+    text = resume_text(user_data, document=get_resume_document(resume_content))
+    score, matched, missing = score_ats_match(text, job_description)
+    with st.expander(f"🎯 ATS keyword match: {score:.0%}"):
+        st.progress(score)
+        if matched:
+            st.caption("✅ Found: " + ", ".join(matched))
+        if missing:
+            st.caption("❌ Missing: " + ", ".join(missing))
+
+def show_cache_stats(cache, render_cache):
+    """Show generation and render cache counters in the sidebar"""
+    stats = cache.stats()
+    st.sidebar.caption(
+        f"🗄️ Cache: {stats['memory_hits'] + stats['disk_hits']} hits · "
+        f"{stats['misses']} misses · {stats['disk_entries']} stored"
+    )
+    render_stats = render_cache.stats()
+    section_stats = get_section_cache().stats()
+    st.sidebar.caption(
+        f"♻️ Renders avoided: {render_stats['renders_avoided']} "
+        f"(of {render_stats['renders'] + render_stats['renders_avoided']}) · "
+        f"Sections reused: {section_stats['renders_avoided']} "
+        f"(of {section_stats['renders'] + section_stats['renders_avoided']})"
+    )
+    # Only once numpy is loaded; building the index just for this caption would load it
+    if 'utils.near_duplicates' in sys.modules:
+        index_stats = get_near_duplicate_index().stats()
+        st.sidebar.caption(
+            f"🔍 Near-duplicate postings: {index_stats['hits']} reused "
+            f"(of {index_stats['lookups']} lookups) · {index_stats['entries']} indexed"
+        )
+
+def format_size(size):
+    """Human-readable byte count, e.g. '12.3 KB'"""
+    for unit in ('bytes', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'bytes' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def show_artifact_stats(store):
+    """Show how much memory the shared artifact store holds, in the sidebar"""
+    stats = store.stats()
+    st.sidebar.caption(
+        f"🧠 Artifacts: {stats['entries']} in memory · {format_size(stats['memory_bytes'])} "
+        f"of {format_size(stats['max_bytes'])} ({format_size(stats['raw_bytes'])} uncompressed) · "
+        f"{stats['deduplicated']} shared"
+        + (f" · {stats['spilled_entries']} on disk" if stats['spilled_entries'] else "")
+    )
+
+def show_request_stats(client):
+    """Show request layer health in the sidebar"""
+    if not hasattr(client, 'stats'):
+        return
+    stats = client.stats()
+    with st.sidebar.expander("🩺 API status"):
+        st.caption(
+            f"Circuit: {stats['circuit_state']} · In flight: {stats['in_flight']} · "
+            f"Queued: {stats['queue_depth']}"
+        )
+        st.caption(
+            f"Calls: {stats['calls']} · Retries: {stats['retries']} · Failed: {stats['failed']} · "
+            f"Rejected: {stats['rejected_rate_limited'] + stats['rejected_circuit_open']}"
+        )
+        st.caption("Model routing (latency in seconds over recent calls)")
+        st.dataframe(
+            [
+                {
+                    'task': task,
+                    'model': model,
+                    'samples': values['samples'],
+                    'p95': round(values['p95'], 2) if values['p95'] is not None else None,
+                    'SLO': values['slo'],
+                    'errors': f"{values['error_rate']:.0%}",
+                    'state': values['state'],
+                    'circuit': stats.get('circuits', {}).get(model, 'closed'),
+                }
+                for task, models in get_model_router().stats().items()
+                for model, values in models.items()
+            ],
+            hide_index=True
+        )
+
+def show_diagnostics(metrics_window):
+    """Show rolling per-stage latency and size percentiles in the sidebar"""
+    summary = metrics_window.summary()
+    with st.sidebar.expander("📈 Diagnostics"):
+        if not summary:
+            st.caption("No measurements yet")
+            return
+        st.dataframe(
+            [
+                {
+                    'metric': key,
+                    'count': values['count'],
+                    'p50': round(values['p50'], 4),
+                    'p95': round(values['p95'], 4),
+                    'p99': round(values['p99'], 4),
+                    'last': round(values['last'], 4),
+                }
+                for key, values in summary.items()
+            ],
+            hide_index=True
+        )
+        st.caption("Seconds for *_seconds metrics, bytes for render.bytes, over the last 500 samples")
+        first_pass = summary.get('structured.first_pass_ok[document=resume]')
+        if first_pass:
+            st.caption(
+                f"Structured output valid on first pass: {first_pass['mean']:.0%} "
+                f"of {first_pass['count']} generations"
+            )
+
+def timed_render(stage, render):
+    """Wrap a render call so its duration and output size are recorded"""
+    def run():
+        with METRICS.timer('render.seconds', stage=stage):
+            result = render()
+        size = len(result) if isinstance(result, bytes) else len(result.encode('utf-8'))
+        METRICS.record('render.bytes', size, stage=stage)
+        return result
+    return run
+
+def render_resume_preview(render_cache, resume_content, user_data, theme=DEFAULT_THEME):
+    """Return the resume HTML preview, rendering only when inputs changed"""
+    key = make_render_key('resume_html', resume_content, user_data, theme)
+    return render_cache.get_or_render(
+        key, timed_render('resume_html', lambda: create_resume_html(resume_content, user_data, theme=theme))
+    )
+
+def render_resume_docx(render_cache, resume_content, user_data):
+    """Return the resume .docx bytes, building only when inputs changed"""
+    key = make_render_key('resume_docx', resume_content, user_data)
+    return render_cache.get_or_render(
+        key, timed_render('resume_docx', lambda: create_docx_resume(resume_content, user_data).getvalue())
+    )
+
+def render_resume_pdf(render_cache, resume_content, user_data):
+    """Return the resume PDF bytes, building only when inputs changed"""
+    key = make_render_key('resume_pdf', resume_content, user_data)
+    return render_cache.get_or_render(
+        key, timed_render('resume_pdf', lambda: create_pdf_resume(resume_content, user_data).getvalue())
+    )
+
+def show_pdf_character_warning(content, user_data):
+    """Name the characters the PDF export can't show, so the DOCX can be used instead"""
+    fields = ' '.join(str(user_data.get(key) or '') for key in ('name', 'email', 'phone', 'address', 'linkedin'))
+    missing = unsupported_characters(f"{fields} {content}")
+    if missing:
+        st.caption(
+            f"⚠️ The PDF's fonts can't show {' '.join(missing[:10])}{' …' if len(missing) > 10 else ''}; "
+            "they appear as '?' in the PDF, so download the .docx to keep them"
+        )
+
+def render_cover_letter_preview(render_cache, cover_letter_content, user_data, theme=DEFAULT_THEME):
+    """Return the cover letter HTML preview, rendering only when inputs changed"""
+    # The letter is dated, so the date is part of the key
+    key = make_render_key('cover_letter_html', cover_letter_content, user_data,
+                          datetime.now().strftime('%B %d, %Y'), theme)
+    return render_cache.get_or_render(
+        key, timed_render(
+            'cover_letter_html',
+            lambda: create_cover_letter_html(cover_letter_content, user_data, theme=theme)
+        )
+    )
+
+def render_cover_letter_docx(render_cache, cover_letter_content, user_data):
+    """Return the cover letter .docx bytes, building only when inputs changed"""
+    key = make_render_key('cover_letter_docx', cover_letter_content, user_data,
+                          datetime.now().strftime('%B %d, %Y'))
+    return render_cache.get_or_render(
+        key, timed_render('cover_letter_docx', lambda: create_docx_cover_letter(cover_letter_content, user_data).getvalue())
+    )
+
+def render_cover_letter_pdf(render_cache, cover_letter_content, user_data):
+    """Return the cover letter PDF bytes, building only when inputs changed"""
+    key = make_render_key('cover_letter_pdf', cover_letter_content, user_data,
+                          datetime.now().strftime('%B %d, %Y'))
+    return render_cache.get_or_render(
+        key, timed_render('cover_letter_pdf', lambda: create_pdf_cover_letter(cover_letter_content, user_data).getvalue())
+    )
+
+def render_cover_letter_zip(render_cache, letters, user_data):
+    """Return a zip of cover letter .docx files for (company name, content) pairs"""
+    key = make_render_key('cover_letter_zip', letters, user_data, datetime.now().strftime('%B %d, %Y'))
+    return render_cache.get_or_render(
+        key, timed_render('cover_letter_zip', lambda: create_cover_letter_zip(letters, user_data).getvalue())
+    )
+
+def create_resume_html(resume_content, user_data, document=None, theme=DEFAULT_THEME):
+    """Convert resume content to HTML with styling"""
+    
+    # Parse the resume content into sections
+    if document is None:
+        document = get_resume_document(resume_content)
     
-    return ''.join(formatted_lines)
+    fields = escape_fields(user_data)
+    linkedin = fields.get('linkedin') or ''
+    fields['linkedin_line'] = f"<br>LinkedIn: {linkedin}" if linkedin.strip() else ""
+    fields['sections'] = ''.join(render_section_html(section) for section in document.sections)
+    return RESUME_TEMPLATES[theme].render(fields)
 
-def create_cover_letter_html(cover_letter_content, user_data):
+def render_section_html(section):
+    """Render one resume section; unchanged sections are reused across edits, themes and reruns"""
+    return get_section_cache().get_or_render(('html', section), lambda: SECTION_TEMPLATE.render({
+        'title': escape_text(section.title),
+        'content': format_section_blocks(section.blocks),
+    }))
+
+def get_resume_document(resume_content):
+    """Parse resume content once and share the tree between renderers"""
+    document = get_structured_documents().get(resume_content)
+    if document is not None:
+        return document
+    document = get_parsed_documents().get(resume_content)
+    if document is None:
+        document = parse_document(resume_content)
+        get_parsed_documents().add(resume_content, document)
+    return document
+
+def parse_resume_sections(resume_content):
+    """Parse resume content into sections"""
+    return get_resume_document(resume_content).as_dict()
+
+def format_section_blocks(blocks):
+    """Format parsed section blocks with proper HTML"""
+    if not blocks:
+        return "<p>Information not provided</p>"
+    
+    parts = []
+    for block in blocks:
+        if isinstance(block, BulletList):
+            parts.append('<ul>')
+            parts.extend(f'<li>{escape_text(item)}</li>' for item in block.items)
+            parts.append('</ul>')
+        else:
+            parts.append(f'<p>{escape_text(block.text)}</p>')
+    
+    return ''.join(parts)
+
+def format_section_content(content):
+    """Format section content with proper HTML"""
+    return format_section_blocks(parse_blocks(content.split('\n')))
+
+def create_cover_letter_html(cover_letter_content, user_data, theme=DEFAULT_THEME):
     """Convert cover letter to HTML with styling"""
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: 'Arial', sans-serif;
-                line-height: 1.6;
-                color: #333;
-                max-width: 800px;
-                margin: 0 auto;
-                padding: 20px;
-                background-color: #f9f9f9;
-            }}
-            .letter-container {{
-                background: white;
-                padding: 40px;
-                border-radius: 8px;
-                box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            }}
-            .header {{
-                text-align: right;
-                margin-bottom: 30px;
-            }}
-            .sender-info {{
-                font-size: 14px;
-                color: #666;
-                line-height: 1.4;
-            }}
-            .date {{
-                margin: 20px 0;
-                font-size: 14px;
-            }}
-            .content {{
-                white-space: pre-line;
-                text-align: justify;
-                font-size: 14px;
-                line-height: 1.6;
-            }}
-            @media print {{
-                body {{ background-color: white; }}
-                .letter-container {{ box-shadow: none; }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="letter-container">
-            <div class="header">
-                <div class="sender-info">
-                    {user_data['name']}<br>
-                    {user_data['email']}<br>
-                    {user_data['phone']}<br>
-                    {user_data['address']}
-                </div>
-            </div>
-            <div class="date">{datetime.now().strftime('%B %d, %Y')}</div>
-            <div class="content">{cover_letter_content}</div>
-        </div>
-    </body>
-    </html>
-    """
-    return html_content
+    fields = escape_fields(user_data)
+    fields['date'] = datetime.now().strftime('%B %d, %Y')
+    fields['content'] = escape_text(cover_letter_content)
+    return COVER_LETTER_TEMPLATES[theme].render(fields)
 
-def create_docx_resume(resume_content, user_data):
+def create_docx_resume(resume_content, user_data, document=None):
     """Create a Word document for the resume"""
-    doc = Document()
-    
-    # Set document margins
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Inches(1)
-        section.bottom_margin = Inches(1)
-        section.left_margin = Inches(1)
-        section.right_margin = Inches(1)
+    doc = DocxBuilder(get_skeleton(margin_inches=1))
     
     # Title - Name
-    title = doc.add_heading(user_data['name'], 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    doc.heading(user_data['name'], 0, align='center')
     
     # Contact info
-    contact_para = doc.add_paragraph()
-    contact_run = contact_para.add_run(f"{user_data['email']} | {user_data['phone']}")
-    contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    address_para = doc.add_paragraph()
-    address_run = address_para.add_run(user_data['address'])
-    address_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    doc.paragraph(f"{user_data['email']} | {user_data['phone']}", align='center')
+    doc.paragraph(user_data['address'], align='center')
     
     if user_data.get('linkedin') and user_data['linkedin'].strip():
-        linkedin_para = doc.add_paragraph()
-        linkedin_run = linkedin_para.add_run(f"LinkedIn: {user_data['linkedin']}")
-        linkedin_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        doc.paragraph(f"LinkedIn: {user_data['linkedin']}", align='center')
     
     # Add line break
-    doc.add_paragraph()
+    doc.paragraph()
     
-    # Parse and add resume sections
-    sections_dict = parse_resume_sections(resume_content)
+    # Add resume sections from the parsed document
+    if document is None:
+        document = get_resume_document(resume_content)
     
-    for section_title, section_content in sections_dict.items():
-        # Add section heading
-        heading = doc.add_heading(section_title, level=1)
-        
-        # Add section content
-        lines = section_content.split('\n')
-        current_paragraph = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if current_paragraph:
-                    para = doc.add_paragraph(' '.join(current_paragraph))
-                    current_paragraph = []
-                continue
-                
-            # Check if line is a bullet point
-            if line.startswith(('•', '-', '*', '▪', '◦')) or line.startswith(tuple(f'{i}.' for i in range(1, 10))):
-                if current_paragraph:
-                    para = doc.add_paragraph(' '.join(current_paragraph))
-                    current_paragraph = []
-                # Add bullet point
-                clean_line = line[1:].strip() if line[0] in '•-*▪◦' else line[2:].strip()
-                bullet_para = doc.add_paragraph(clean_line, style='List Bullet')
-            else:
-                current_paragraph.append(line)
-        
-        # Add any remaining paragraph content
-        if current_paragraph:
-            para = doc.add_paragraph(' '.join(current_paragraph))
-        
-        # Add space after each section
-        doc.add_paragraph()
+    for section in document.sections:
+        doc.extend_xml(render_section_docx(section))
+    
+    return doc.save(DOCX_COMPRESSION, DOCX_COMPRESSLEVEL)
+
+def render_section_docx(section):
+    """Serialize one resume section for the DOCX; unchanged sections are reused across edits and reruns"""
+    return get_section_cache().get_or_render(('docx', section), lambda: build_section_docx(section))
+
+def build_section_docx(section):
+    """Serialize one resume section as DOCX body XML"""
+    doc = DocxBuilder(get_skeleton(margin_inches=1))
+    
+    # Add section heading
+    doc.heading(section.title, level=1)
     
-    # Save to bytes
-    docx_buffer = io.BytesIO()
-    doc.save(docx_buffer)
-    docx_buffer.seek(0)
-    return docx_buffer
+    # Add section content
+    for block in section.blocks:
+        if isinstance(block, BulletList):
+            for item in block.items:
+                doc.bullet(item)
+        else:
+            doc.paragraph(block.text)
+    
+    # Add space after each section
+    doc.paragraph()
+    return doc.body_xml()
 
 def create_docx_cover_letter(cover_letter_content, user_data):
     """Create a Word document for the cover letter"""
-    doc = Document()
+    doc = DocxBuilder(get_skeleton())
     
     # Header with contact info
-    header_para = doc.add_paragraph()
-    header_para.add_run(f"{user_data['name']}\n{user_data['email']}\n{user_data['phone']}\n{user_data['address']}")
-    header_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    doc.paragraph(
+        f"{user_data['name']}\n{user_data['email']}\n{user_data['phone']}\n{user_data['address']}",
+        align='right'
+    )
     
     # Add date
-    date_para = doc.add_paragraph()
-    date_para.add_run(datetime.now().strftime('%B %d, %Y'))
-    date_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    doc.paragraph(datetime.now().strftime('%B %d, %Y'), align='left')
     
     # Add a line break
-    doc.add_paragraph()
+    doc.paragraph()
     
     # Cover letter content
-    doc.add_paragraph(cover_letter_content)
+    doc.paragraph(cover_letter_content)
+    
+    return doc.save(DOCX_COMPRESSION, DOCX_COMPRESSLEVEL)
+
+def create_cover_letter_zip(letters, user_data):
+    """Zip one cover letter .docx per (company name, content) pair
+
+    Each document is built and written into the archive before the next one
+    is built, so no list of finished documents is kept besides the archive.
+    The archive itself is built in memory: st.download_button holds the whole
+    payload in memory anyway. The .docx files are already compressed, so they
+    are stored as-is.
+    """
+    buffer = io.BytesIO()
+    used_names = set()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for company_name, content in letters:
+            base = re.sub(r'[^\w-]+', '_', f"{user_data['name']}_Cover_Letter_{company_name}").strip('_')
+            name = base
+            suffix = 2
+            while name in used_names:
+                name = f"{base}_{suffix}"
+                suffix += 1
+            used_names.add(name)
+            with archive.open(f"{name}.docx", 'w') as entry:
+                entry.write(create_docx_cover_letter(content, user_data).getbuffer())
+    buffer.seek(0)
+    return buffer
+
+# PDF colours, matching the classic preview design
+PDF_HEADING_COLOR = (0.17, 0.24, 0.31)
+PDF_ACCENT_COLOR = (0.20, 0.60, 0.86)
+PDF_MUTED_COLOR = (0.4, 0.4, 0.4)
+
+def create_pdf_resume(resume_content, user_data, document=None):
+    """Create a PDF for the resume"""
+    pdf = PdfLayout()
+    
+    # Header - name and contact info
+    pdf.paragraph(user_data['name'], font=BOLD, size=22, align='center', color=PDF_HEADING_COLOR)
+    pdf.space(4)
+    pdf.paragraph(f"{user_data['email']} | {user_data['phone']}", align='center', color=PDF_MUTED_COLOR)
+    pdf.paragraph(user_data['address'], align='center', color=PDF_MUTED_COLOR)
+    if user_data.get('linkedin') and user_data['linkedin'].strip():
+        pdf.paragraph(f"LinkedIn: {user_data['linkedin']}", align='center', color=PDF_MUTED_COLOR)
+    pdf.rule(thickness=2, color=PDF_HEADING_COLOR, gap=8)
+    
+    # Resume sections from the parsed document
+    if document is None:
+        document = get_resume_document(resume_content)
+    
+    for section in document.sections:
+        pdf.space(8)
+        # Keep a heading on the same page as the start of its section
+        pdf.paragraph(section.title, font=BOLD, size=12, color=PDF_HEADING_COLOR, keep_with_next=40)
+        pdf.rule(thickness=1, color=PDF_ACCENT_COLOR, gap=3)
+        if not section.blocks:
+            pdf.paragraph("Information not provided")
+        for block in section.blocks:
+            if isinstance(block, BulletList):
+                for item in block.items:
+                    pdf.bullet(item)
+            else:
+                pdf.paragraph(block.text)
+            pdf.space(3)
     
-    # Save to bytes
-    docx_buffer = io.BytesIO()
-    doc.save(docx_buffer)
-    docx_buffer.seek(0)
-    return docx_buffer
+    return pdf.to_buffer()
+
+def create_pdf_cover_letter(cover_letter_content, user_data):
+    """Create a PDF for the cover letter"""
+    pdf = PdfLayout()
+    
+    # Header with contact info
+    for line in (user_data['name'], user_data['email'], user_data['phone'], *user_data['address'].split('\n')):
+        pdf.paragraph(line, align='right', color=PDF_MUTED_COLOR)
+    
+    # Date
+    pdf.space(20)
+    pdf.paragraph(datetime.now().strftime('%B %d, %Y'), size=11)
+    pdf.space(14)
+    
+    # Cover letter content; blank lines separate paragraphs
+    for line in cover_letter_content.split('\n'):
+        if line.strip():
+            pdf.paragraph(line, size=11, leading=16)
+        else:
+            pdf.space(10)
+    
+    return pdf.to_buffer()
 
 def main():
     st.title("🎯 AI Resume & Cover Letter Writer")
@@ -527,100 +1582,354 @@ def main():
     hiring_manager = st.sidebar.text_input("Hiring Manager Name (optional)", placeholder="Ms. Jane Smith")
     job_description = st.sidebar.text_area("Job Description/Requirements (optional)", placeholder="Paste job posting details here...")
     
+    # Generation settings
+    st.sidebar.subheader("Generation Settings")
+    stream_output = st.sidebar.checkbox("Stream output while generating", value=True)
+    structured_output = st.sidebar.checkbox(
+        "Structured résumé output (JSON)", value=False,
+        help="Ask for JSON sections so headers never need guessing; only invalid sections are "
+             "re-requested. The résumé is shown once complete instead of streamed."
+    )
+    themes = theme_labels()
+    theme = st.sidebar.selectbox("Résumé design", options=list(themes), format_func=themes.get)
+    near_duplicates = st.sidebar.selectbox(
+        "Near-identical job postings", options=list(NEAR_DUPLICATE_MODES), format_func=NEAR_DUPLICATE_MODES.get,
+        help="When a cover letter was already written for this profile and company with an almost identical "
+             "job description (e.g. a reposted listing), reuse it instead of writing a new one"
+    )
+    force_regenerate = st.sidebar.checkbox(
+        "Force regenerate (bypass cache)", value=False,
+        help="Always call the model, even for inputs that were generated before"
+    )
+    background = st.sidebar.checkbox(
+        "Run in the background queue", value=False,
+        help="Queue generations and return at once; they finish even if this tab is closed or the "
+             "app restarts, and reopening the page URL picks them up"
+    )
+    cache = get_generation_cache()
+    render_cache = get_render_cache()
+    metrics_window = get_metrics_window()
+    queue, workers = get_job_queue(client, cache)
+    
+    # Jobs queued by this session, or named in the URL of a reopened page
+    pending_jobs = st.session_state.setdefault('pending_jobs', {})
+    for kind in ('resume', 'cover_letter'):
+        job_id = st.query_params.get(f'{kind}_job')
+        if job_id and kind not in pending_jobs:
+            pending_jobs[kind] = job_id
+    
+    user_data = {
+        'name': name,
+        'email': email,
+        'phone': phone,
+        'address': address,
+        'linkedin': linkedin,
+        'job_role': job_role,
+        'education': education,
+        'work_experience': work_experience,
+        'skills': skills,
+        'additional_info': additional_info
+    }
+    company_info = {
+        'company_name': company_name,
+        'hiring_manager': hiring_manager,
+        'job_description': job_description
+    }
+    required_filled = all([name, email, phone, address, job_role, education, work_experience, skills])
+    
+    # Estimated prompt sizes, so oversized pastes show up before anything is generated
+    if required_filled:
+        _, resume_budget = prepare_resume_prompt(user_data)
+        _, letter_budget = prepare_cover_letter_prompt(user_data, company_info)
+        st.sidebar.caption(
+            f"📝 Prompt size: résumé ≈ {resume_budget['prompt_tokens']:,} tokens · "
+            f"cover letter ≈ {letter_budget['prompt_tokens']:,} tokens"
+        )
+        trimmed = sorted(set(resume_budget['trimmed'] + letter_budget['trimmed']))
+        if trimmed:
+            st.sidebar.caption(
+                f"✂️ Over the {PROMPT_TOKEN_BUDGET:,}-token prompt budget; trimming "
+                + ", ".join(field.replace('_', ' ') for field in trimmed)
+            )
+    
+    # Status of background jobs; filled in at the end of the run, once this run's clicks are queued
+    jobs_area = st.container()
+    for message in st.session_state.pop('job_errors', []):
+        st.error(message)
+    
+    # Both documents at once: the two model calls overlap instead of running back to back
+    if st.button("⚡ Generate Resume & Cover Letter", use_container_width=True):
+        if not required_filled:
+            st.error("Please fill in all required fields marked with *")
+        elif not company_name:
+            st.error("Please enter the company name for the cover letter")
+        elif background:
+            enqueue_generation(queue, workers, 'resume', user_data, structured=structured_output,
+                               force_regenerate=force_regenerate)
+            enqueue_generation(queue, workers, 'cover_letter', user_data, company_info,
+                               force_regenerate=force_regenerate, near_duplicates=near_duplicates)
+        else:
+            progress = st.empty()
+            finished = []
+            started = time.perf_counter()
+            with st.spinner("Generating your resume and cover letter..."):
+                for kind, content, stats in generate_both_concurrently(
+                    client, user_data, company_info, cache=cache, force_regenerate=force_regenerate,
+                    structured=structured_output, near_duplicates=near_duplicates
+                ):
+                    if content:
+                        if kind == 'resume':
+                            keep_resume(content)
+                        else:
+                            keep_artifact(f'{kind}_content', content)
+                        keep_artifact('user_data', user_data)
+                        st.session_state[f'{kind}_timing'] = stats
+                        finished.append(f"{kind.replace('_', ' ')} ready in {stats['total_latency']:.2f}s")
+                    else:
+                        finished.append(f"{kind.replace('_', ' ')} failed")
+                    progress.info(" · ".join(finished))
+            progress.success(
+                f"Done in {time.perf_counter() - started:.2f}s: " + " · ".join(finished)
+            )
+    
     # Main content area
     col1, col2 = st.columns([1, 1])
     
     with col1:
         st.header("📄 Resume")
         if st.button("Generate Resume", type="primary", use_container_width=True):
-            if not all([name, email, phone, address, job_role, education, work_experience, skills]):
+            if not required_filled:
                 st.error("Please fill in all required fields marked with *")
+            elif background:
+                enqueue_generation(queue, workers, 'resume', user_data, structured=structured_output,
+                                   force_regenerate=force_regenerate)
             else:
                 with st.spinner("Generating your professional resume..."):
-                    user_data = {
-                        'name': name,
-                        'email': email,
-                        'phone': phone,
-                        'address': address,
-                        'linkedin': linkedin,
-                        'job_role': job_role,
-                        'education': education,
-                        'work_experience': work_experience,
-                        'skills': skills,
-                        'additional_info': additional_info
-                    }
+                    stats = {}
+                    on_update = None
+                    if stream_output:
+                        stream_placeholder = st.empty()
+                        on_update = lambda partial: render_resume_stream(stream_placeholder, partial)
                     
-                    resume_content = generate_resume_content(client, user_data)
+                    resume_content = generate_resume_content(
+                        client, user_data, on_update=on_update, stats=stats, cache=cache,
+                        force_regenerate=force_regenerate, structured=structured_output
+                    )
+                    if stream_output:
+                        stream_placeholder.empty()
                     if resume_content:
-                        st.session_state['resume_content'] = resume_content
-                        st.session_state['user_data'] = user_data
+                        keep_resume(resume_content)
+                        keep_artifact('user_data', user_data)
+                        st.session_state['resume_timing'] = stats
                         st.success("Resume generated successfully!")
         
         # Display resume if generated
-        if 'resume_content' in st.session_state:
+        resume_content = load_resume()
+        resume_user_data = load_artifact('user_data')
+        if resume_content and resume_user_data:
             st.subheader("📋 Resume Preview")
-            resume_html = create_resume_html(st.session_state['resume_content'], st.session_state['user_data'])
+            show_timing(st.session_state.get('resume_timing'))
+            
+            # Rewrite one weak section without regenerating the whole resume
+            section_titles = list(parse_resume_sections(resume_content))
+            if section_titles:
+                with st.expander("🔁 Regenerate a section"):
+                    section_title = st.selectbox("Section", section_titles, format_func=str.title)
+                    instructions = st.text_input(
+                        "What should change? (optional)", placeholder="e.g. more quantified achievements"
+                    )
+                    if st.button("Regenerate section", use_container_width=True):
+                        with st.spinner(f"Rewriting {section_title.title()}..."):
+                            stats = {}
+                            updated = regenerate_section(
+                                client, resume_user_data, resume_content, section_title,
+                                instructions, stats=stats
+                            )
+                        if updated:
+                            resume_content = updated
+                            keep_resume(updated)
+                            st.success(f"{section_title.title()} rewritten in {stats['total_latency']:.2f}s")
+            
+            # Hand edits replace the generated text; only the sections that changed are rendered again
+            with st.expander("✏️ Edit resume"):
+                # Canonical text, so every heading is exactly a section title the edit is parsed against
+                resume_text = get_resume_document(resume_content).as_text()
+                edited = artifact_editor(
+                    "Resume text", 'resume_content', resume_text,
+                    help="Keep the section headings (e.g. WORK EXPERIENCE) on their own lines"
+                )
+                if edited not in (resume_text, resume_content):
+                    changed = apply_resume_edit(resume_content, edited)
+                    if changed is None:
+                        st.warning("No section headings were found in the edited text; the resume was left unchanged")
+                    else:
+                        resume_content = edited
+                        keep_resume(edited)
+                        sync_editor('resume_content')
+                        section_count = len(get_resume_document(edited).sections)
+                        st.caption(f"✏️ Updated {len(changed)} of {section_count} sections")
+            
+            show_ats_match(resume_content, resume_user_data, job_description)
+            
+            resume_html = render_resume_preview(render_cache, resume_content, resume_user_data, theme)
             st.components.v1.html(resume_html, height=800, scrolling=True)
             
-            # Download button for resume
-            resume_docx = create_docx_resume(st.session_state['resume_content'], st.session_state['user_data'])
+            # Download buttons for resume; files are only built when requested
             st.download_button(
                 label="📥 Download Resume (.docx)",
-                data=resume_docx.getvalue(),
-                file_name=f"{st.session_state['user_data']['name']}_Resume.docx",
+                data=lambda: render_resume_docx(render_cache, resume_content, resume_user_data),
+                file_name=f"{resume_user_data['name']}_Resume.docx",
                 mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                 use_container_width=True
             )
+            show_pdf_character_warning(resume_content, resume_user_data)
+            st.download_button(
+                label="📥 Download Resume (.pdf)",
+                data=lambda: render_resume_pdf(render_cache, resume_content, resume_user_data),
+                file_name=f"{resume_user_data['name']}_Resume.pdf",
+                mime="application/pdf",
+                use_container_width=True
+            )
     
     with col2:
         st.header("✉️ Cover Letter")
         if st.button("Generate Cover Letter", type="primary", use_container_width=True):
-            if not all([name, email, phone, address, job_role, education, work_experience, skills]):
+            if not required_filled:
                 st.error("Please fill in all required fields marked with *")
             elif not company_name:
                 st.error("Please enter the company name for the cover letter")
+            elif background:
+                enqueue_generation(queue, workers, 'cover_letter', user_data, company_info,
+                                   force_regenerate=force_regenerate, near_duplicates=near_duplicates)
             else:
                 with st.spinner("Crafting your personalized cover letter..."):
-                    user_data = {
-                        'name': name,
-                        'email': email,
-                        'phone': phone,
-                        'address': address,
-                        'linkedin': linkedin,
-                        'job_role': job_role,
-                        'education': education,
-                        'work_experience': work_experience,
-                        'skills': skills,
-                        'additional_info': additional_info
-                    }
-                    
-                    company_info = {
-                        'company_name': company_name,
-                        'hiring_manager': hiring_manager,
-                        'job_description': job_description
-                    }
+                    stats = {}
+                    on_update = None
+                    if stream_output:
+                        stream_placeholder = st.empty()
+                        on_update = lambda partial: render_cover_letter_stream(stream_placeholder, partial)
                     
-                    cover_letter_content = generate_cover_letter(client, user_data, company_info)
+                    cover_letter_content = generate_cover_letter(
+                        client, user_data, company_info, on_update=on_update, stats=stats,
+                        cache=cache, force_regenerate=force_regenerate, near_duplicates=near_duplicates
+                    )
+                    if stream_output:
+                        stream_placeholder.empty()
                     if cover_letter_content:
-                        st.session_state['cover_letter_content'] = cover_letter_content
-                        st.session_state['user_data'] = user_data
+                        keep_artifact('cover_letter_content', cover_letter_content)
+                        keep_artifact('user_data', user_data)
+                        st.session_state['cover_letter_timing'] = stats
                         st.success("Cover letter generated successfully!")
         
         # Display cover letter if generated
-        if 'cover_letter_content' in st.session_state:
+        cover_letter_content = load_artifact('cover_letter_content')
+        letter_user_data = load_artifact('user_data')
+        if cover_letter_content and letter_user_data:
             st.subheader("📝 Cover Letter Preview")
-            cover_letter_html = create_cover_letter_html(st.session_state['cover_letter_content'], st.session_state['user_data'])
+            show_timing(st.session_state.get('cover_letter_timing'))
+            
+            with st.expander("✏️ Edit cover letter"):
+                edited = artifact_editor("Cover letter text", 'cover_letter_content', cover_letter_content)
+                if edited.strip() and edited != cover_letter_content:
+                    cover_letter_content = edited
+                    keep_artifact('cover_letter_content', edited)
+                    sync_editor('cover_letter_content')
+            
+            cover_letter_html = render_cover_letter_preview(render_cache, cover_letter_content, letter_user_data, theme)
             st.components.v1.html(cover_letter_html, height=800, scrolling=True)
             
-            # Download button for cover letter
-            cover_letter_docx = create_docx_cover_letter(st.session_state['cover_letter_content'], st.session_state['user_data'])
+            # Download buttons for cover letter; files are only built when requested
             st.download_button(
                 label="📥 Download Cover Letter (.docx)",
-                data=cover_letter_docx.getvalue(),
-                file_name=f"{st.session_state['user_data']['name']}_Cover_Letter.docx",
+                data=lambda: render_cover_letter_docx(render_cache, cover_letter_content, letter_user_data),
+                file_name=f"{letter_user_data['name']}_Cover_Letter.docx",
                 mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                 use_container_width=True
             )
+            show_pdf_character_warning(cover_letter_content, letter_user_data)
+            st.download_button(
+                label="📥 Download Cover Letter (.pdf)",
+                data=lambda: render_cover_letter_pdf(render_cache, cover_letter_content, letter_user_data),
+                file_name=f"{letter_user_data['name']}_Cover_Letter.pdf",
+                mime="application/pdf",
+                use_container_width=True
+            )
+    
+    if st.session_state['pending_jobs']:
+        with jobs_area:
+            show_pending_jobs(queue)
+    
+    # Same profile, many postings: one cover letter per company, written concurrently
+    st.markdown("---")
+    st.header("📬 Apply to Several Companies")
+    st.caption("One row per job posting; repeated postings are only written once.")
+    target_rows = st.data_editor(
+        [{'company_name': '', 'hiring_manager': '', 'job_description': ''}],
+        num_rows="dynamic",
+        column_config={
+            'company_name': st.column_config.TextColumn("Company Name*"),
+            'hiring_manager': st.column_config.TextColumn("Hiring Manager"),
+            'job_description': st.column_config.TextColumn("Job Description/Requirements", width="large"),
+        },
+        hide_index=True,
+        use_container_width=True,
+        key='cover_letter_targets'
+    )
+    if st.button("✉️ Generate All Cover Letters", use_container_width=True):
+        targets = dedupe_targets(target_rows)
+        if not required_filled:
+            st.error("Please fill in all required fields marked with *")
+        elif not targets:
+            st.error("Please add at least one company")
+        else:
+            duplicates = sum(1 for row in target_rows if str(row.get('company_name') or '').strip()) - len(targets)
+            if duplicates:
+                st.info(f"Skipping {duplicates} repeated posting{'s' if duplicates > 1 else ''}")
+            progress = st.progress(0.0)
+            rows = [st.empty() for _ in targets]
+            for row, target in zip(rows, targets):
+                row.caption(f"⏳ {target['company_name']}: queued")
+            
+            letters = [None] * len(targets)
+            for finished, (index, content, stats) in enumerate(generate_cover_letters_for_targets(
+                client, user_data, targets, cache=cache, force_regenerate=force_regenerate,
+                near_duplicates=near_duplicates
+            ), start=1):
+                company = targets[index]['company_name']
+                if content:
+                    letters[index] = content
+                    rows[index].caption(
+                        f"✅ {company}: ready in {stats['total_latency']:.2f}s"
+                        + (" (cached)" if stats.get('cached') else "")
+                    )
+                else:
+                    rows[index].caption(f"❌ {company}: failed")
+                progress.progress(finished / len(targets), text=f"{finished}/{len(targets)} cover letters")
+            
+            keep_artifact('cover_letter_batch', [
+                (target['company_name'], content)
+                for target, content in zip(targets, letters)
+                if content
+            ])
+            keep_artifact('cover_letter_batch_user_data', user_data)
+    
+    batch_letters = load_artifact('cover_letter_batch')
+    batch_user_data = load_artifact('cover_letter_batch_user_data')
+    if batch_letters and batch_user_data:
+        st.download_button(
+            label=f"📦 Download {len(batch_letters)} Cover Letters (.zip)",
+            data=lambda: render_cover_letter_zip(render_cache, batch_letters, batch_user_data),
+            file_name=f"{batch_user_data['name']}_Cover_Letters.zip",
+            mime="application/zip",
+            use_container_width=True
+        )
+    
+    # Rendered last so the counters include this run's generations
+    show_cache_stats(cache, render_cache)
+    show_artifact_stats(get_artifact_store())
+    show_request_stats(client)
+    show_job_queue(queue)
+    show_diagnostics(metrics_window)
     
     # Footer
     st.markdown("---")
@@ -629,6 +1938,9 @@ def main():
     st.markdown("- Include relevant skills for your target job role")
     st.markdown("- Add company-specific information for personalized cover letters")
     st.markdown("- Review and customize the generated content before using")
+    
+    # The page is on screen now, so setting up the client no longer delays it
+    start_client_setup(client)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,95 @@
+"""Score every applicant's resume against every job posting, without any model calls
+
+Reads applicants in the batch input format and postings from a CSV or
+JSONL file with a ``job_description`` column (plus optional ``id`` and
+``company_name``), and writes each applicant's best-matching postings
+with their keyword coverage and missing keywords:
+
+    python ats.py applicants.csv --jobs postings.csv --out batch_output/ --top 5
+
+Resumes generated by batch.py into the same ``--out`` directory are
+scored with their full text; otherwise only the applicant's skills and
+work experience are used.
+"""
+import argparse
+import csv
+import os
+import sys
+
+import numpy as np
+
+from batch import load_records, record_id, split_record
+from utils.ats import AtsScorer, resume_text
+
+
+def read_resume(out_dir, rid):
+    path = os.path.join(out_dir, rid, 'resume.txt')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Score resumes against job postings by keyword coverage.')
+    parser.add_argument('input', help='CSV or JSONL file of applicants')
+    parser.add_argument('--jobs', required=True, help='CSV or JSONL file of job postings')
+    parser.add_argument('--out', default='batch_output', help='directory with generated resumes and for the report')
+    parser.add_argument('--top', type=int, default=5, help='postings listed per applicant (0 = all)')
+    parser.add_argument('--keywords', type=int, default=10, help='matched and missing keywords listed per pair')
+    parser.add_argument('--matrix', help='also save the full applicants × postings score matrix (.npy)')
+    args = parser.parse_args(argv)
+
+    if args.top < 0:
+        parser.error('--top must not be negative')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    applicants = load_records(args.input)
+    postings = [record for record in load_records(args.jobs) if record.get('job_description')]
+    if not applicants or not postings:
+        print('nothing to score: no applicants or no postings with a job_description', file=sys.stderr)
+        return 1
+
+    rids = [record_id(record) for record in applicants]
+    texts = []
+    generated = 0
+    for rid, record in zip(rids, applicants):
+        user_data, _ = split_record(record)
+        content = read_resume(args.out, rid)
+        generated += content is not None
+        texts.append(resume_text(user_data, content))
+
+    scorer = AtsScorer([record['job_description'] for record in postings])
+    encoded = scorer.encode(texts)
+    scores = scorer.score(encoded)
+    print(f"scored {len(applicants)} applicants ({generated} with generated resumes) "
+          f"against {len(postings)} postings", file=sys.stderr)
+
+    os.makedirs(args.out, exist_ok=True)
+    if args.matrix:
+        np.save(args.matrix, scores)
+
+    top = args.top or len(postings)
+    indptr, indices = encoded
+    report_path = os.path.join(args.out, 'ats_scores.csv')
+    with open(report_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['applicant_id', 'name', 'job_id', 'company_name', 'score', 'matched', 'missing'])
+        for row, (rid, record) in enumerate(zip(rids, applicants)):
+            terms = set(indices[indptr[row]:indptr[row + 1]].tolist())
+            for job in np.argsort(-scores[row], kind='stable')[:top]:
+                matched, missing = scorer.keyword_report(terms, job, args.keywords)
+                writer.writerow([
+                    rid, record.get('name', ''), record_id(postings[job]), postings[job].get('company_name', ''),
+                    f'{scores[row, job]:.3f}', ', '.join(matched), ', '.join(missing)
+                ])
+    print(f"wrote {report_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
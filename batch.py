@@ -0,0 +1,253 @@
+"""Headless batch generation of resumes and cover letters
+
+Reads applicants from a CSV or JSONL file whose fields match the
+``user_data`` and ``company_info`` dicts used by the app, generates the
+documents concurrently and writes them to an output directory:
+
+    GROQ_API_KEY=... python batch.py applicants.csv --out output/ --concurrency 8 --rpm 120
+
+Each finished document is recorded in ``<out>/progress.jsonl``; rerunning
+the same command after a crash skips everything already recorded there.
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+USER_FIELDS = (
+    'name', 'email', 'phone', 'address', 'linkedin', 'job_role',
+    'education', 'work_experience', 'skills', 'additional_info'
+)
+COMPANY_FIELDS = ('company_name', 'hiring_manager', 'job_description')
+REQUIRED_FIELDS = (
+    'name', 'email', 'phone', 'address', 'job_role', 'education', 'work_experience', 'skills'
+)
+
+JOURNAL_NAME = 'progress.jsonl'
+
+
+def load_records(path):
+    """Read applicant rows from a .csv or .jsonl file"""
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def record_id(record):
+    """Stable id for a row: its 'id' field, or a hash of its contents
+
+    The id names the row's output directory, so ids that would be hidden or
+    point outside it ('.', '..', '.name') are replaced by the hash too.
+    """
+    rid = re.sub(r'[^A-Za-z0-9_.-]+', '_', str(record.get('id') or ''))
+    if rid and not rid.startswith('.'):
+        return rid
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def split_record(record):
+    """Split a flat row into user_data and company_info dicts"""
+    user_data = {field: (record.get(field) or '') for field in USER_FIELDS}
+    company_info = {field: (record.get(field) or '') for field in COMPANY_FIELDS}
+    return user_data, company_info
+
+
+def load_journal(out_dir):
+    """Return the set of (record id, document) pairs already completed"""
+    done = set()
+    path = os.path.join(out_dir, JOURNAL_NAME)
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash; that job simply runs again
+                continue
+            if entry.get('status') == 'done':
+                done.add((entry['id'], entry['document']))
+    return done
+
+
+class Journal:
+    """Append-only progress log, flushed and fsynced per entry"""
+
+    def __init__(self, out_dir):
+        self._file = open(os.path.join(out_dir, JOURNAL_NAME), 'a', encoding='utf-8')
+
+    def write(self, **entry):
+        entry['ts'] = time.time()
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class RateLimiter:
+    """Spaces call starts so no more than `rpm` begin per minute"""
+
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        await asyncio.sleep(slot - now)
+
+
+def write_atomic(path, data):
+    """Write bytes so a crash never leaves a half-written output file"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+async def run_job(app, client, job, out_dir, semaphore, limiter, journal, structured=False):
+    """Generate one document and record the outcome"""
+    rid, document, user_data, company_info = job
+    async with semaphore:
+        await limiter.wait()
+        stats = {}
+        started = time.perf_counter()
+        if document == 'resume':
+            content = await asyncio.to_thread(app.generate_resume_content, client, user_data, stats=stats,
+                                              structured=structured)
+        else:
+            content = await asyncio.to_thread(app.generate_cover_letter, client, user_data, company_info, stats=stats)
+        
+        if not content:
+            journal.write(id=rid, document=document, status='failed',
+                          error=stats.get('error', 'empty response'))
+            return False
+        
+        # DOCX building is CPU-bound; keep it off the event loop
+        if document == 'resume':
+            docx_buffer = await asyncio.to_thread(app.create_docx_resume, content, user_data)
+        else:
+            docx_buffer = await asyncio.to_thread(app.create_docx_cover_letter, content, user_data)
+        
+        record_dir = os.path.join(out_dir, rid)
+        if os.path.dirname(os.path.realpath(record_dir)) != os.path.realpath(out_dir):
+            journal.write(id=rid, document=document, status='failed', error='id does not name a directory in --out')
+            return False
+        os.makedirs(record_dir, exist_ok=True)
+        write_atomic(os.path.join(record_dir, f'{document}.txt'), content.encode('utf-8'))
+        write_atomic(os.path.join(record_dir, f'{document}.docx'), docx_buffer.getvalue())
+        journal.write(id=rid, document=document, status='done',
+                      seconds=round(time.perf_counter() - started, 3))
+        return True
+
+
+def plan_jobs(records, documents, done):
+    """List the (id, document, user_data, company_info) jobs still to run"""
+    jobs = []
+    skipped = 0
+    for record in records:
+        rid = record_id(record)
+        user_data, company_info = split_record(record)
+        missing = [field for field in REQUIRED_FIELDS if not user_data[field]]
+        if missing:
+            print(f"[{rid}] skipped: missing {', '.join(missing)}", file=sys.stderr)
+            continue
+        for document in documents:
+            if document == 'cover_letter' and not company_info['company_name']:
+                continue
+            if (rid, document) in done:
+                skipped += 1
+                continue
+            jobs.append((rid, document, user_data, company_info))
+    return jobs, skipped
+
+
+async def run_batch(app, client, jobs, out_dir, concurrency, rpm, structured=False):
+    """Run all jobs under the concurrency and rate limits"""
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rpm)
+    journal = Journal(out_dir)
+    try:
+        tasks = [
+            asyncio.create_task(run_job(app, client, job, out_dir, semaphore, limiter, journal, structured))
+            for job in jobs
+        ]
+        succeeded = 0
+        for finished, task in enumerate(asyncio.as_completed(tasks), 1):
+            if await task:
+                succeeded += 1
+            print(f"\r{finished}/{len(tasks)} done, {finished - succeeded} failed", end='', file=sys.stderr)
+        if tasks:
+            print(file=sys.stderr)
+        return succeeded
+    finally:
+        journal.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate resumes and cover letters in bulk.')
+    parser.add_argument('input', help='CSV or JSONL file of applicants')
+    parser.add_argument('--out', default='batch_output', help='output directory (default: batch_output)')
+    parser.add_argument('--documents', default='resume,cover_letter',
+                        help='comma-separated documents to generate: resume, cover_letter')
+    parser.add_argument('--concurrency', type=int, default=4, help='maximum requests in flight')
+    parser.add_argument('--rpm', type=float, default=30, help='maximum requests started per minute (0 = unlimited)')
+    parser.add_argument('--structured', action='store_true',
+                        help='request resumes as JSON sections (validated, invalid sections re-requested)')
+    parser.add_argument('--base-url', default=os.environ.get('GROQ_BASE_URL'),
+                        help='Groq API base URL, e.g. a local fake server')
+    parser.add_argument('--api-key', default=os.environ.get('GROQ_API_KEY'), help='defaults to $GROQ_API_KEY')
+    args = parser.parse_args(argv)
+    
+    args.documents = [d.strip() for d in args.documents.split(',') if d.strip()]
+    unknown = set(args.documents) - {'resume', 'cover_letter'}
+    if unknown:
+        parser.error(f"unknown documents: {', '.join(sorted(unknown))}")
+    if not args.api_key:
+        parser.error('set GROQ_API_KEY or pass --api-key')
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    # The app module configures a Streamlit page on import; keep bare-mode warnings quiet
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')
+    import app
+    from utils.resilience import ResilientClient
+    
+    # Pacing is done by the batch RateLimiter; the request layer adds retries and breaking.
+    # One pooled connection per concurrent job, kept open for the whole run
+    client = ResilientClient(app.build_groq_client(args.api_key, base_url=args.base_url,
+                                                   max_connections=args.concurrency))
+    os.makedirs(args.out, exist_ok=True)
+    
+    records = load_records(args.input)
+    jobs, skipped = plan_jobs(records, args.documents, load_journal(args.out))
+    print(f"{len(jobs)} documents to generate ({skipped} already done)", file=sys.stderr)
+    
+    succeeded = asyncio.run(run_batch(app, client, jobs, args.out, args.concurrency, args.rpm,
+                                      args.structured))
+    return 0 if succeeded == len(jobs) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Benchmarks for the resume generation and rendering paths"""
@@ -0,0 +1,118 @@
+"""Artifact store: session memory with and without the shared store
+
+Run from the repository root:
+
+    python -m benchmarks.bench_artifacts [--sessions 500] [--distinct 100] [--output artifacts.json]
+
+Simulates many sessions, each holding a résumé, a cover letter, its
+user_data and the résumé's DOCX file, drawn from a smaller number of
+distinct profiles (sessions that asked for the same thing, and got the
+same cached generation). "Per session" is what keeping a copy of every
+artifact in each session's state costs; "store" is what the shared
+store holds, by the accounting its memory cap uses. Also times
+put() and get() and, with --max-mb, shows eviction and spilling under a
+cap smaller than the working set.
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+import app  # noqa: E402
+from benchmarks.corpus import USER_DATA, synthetic_cover_letter, synthetic_resume  # noqa: E402
+from utils.artifact_store import ArtifactStore  # noqa: E402
+
+
+def profiles(count):
+    result = []
+    for index in range(count):
+        user_data = dict(USER_DATA, name=f'Applicant {index}')
+        resume = synthetic_resume(60, seed=index)
+        result.append({
+            'user_data': user_data,
+            'resume': resume,
+            'cover_letter': synthetic_cover_letter(4, seed=index),
+            'docx': app.create_docx_resume(resume, user_data).getvalue(),
+        })
+    return result
+
+
+def session_copy_bytes(profile):
+    # Each session would hold its own copies of these objects
+    return (
+        sys.getsizeof(profile['resume']) + sys.getsizeof(profile['cover_letter'])
+        + sys.getsizeof(json.dumps(profile['user_data'])) + sys.getsizeof(profile['docx'])
+    )
+
+
+def fill(store, sessions, pool):
+    handles = []
+    put_times = []
+    for index in range(sessions):
+        profile = pool[index % len(pool)]
+        started = time.perf_counter()
+        handles.append({key: store.put(value) for key, value in profile.items()})
+        put_times.append((time.perf_counter() - started) / len(profile))
+    return handles, put_times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the shared artifact store.')
+    parser.add_argument('--sessions', type=int, default=500)
+    parser.add_argument('--distinct', type=int, default=100, help='distinct profiles the sessions are drawn from')
+    parser.add_argument('--max-mb', type=float, default=2.0, help='cap for the eviction and spill run')
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+
+    pool = profiles(args.distinct)
+    per_session = sum(session_copy_bytes(pool[index % len(pool)]) for index in range(args.sessions))
+
+    store = ArtifactStore()
+    handles, put_times = fill(store, args.sessions, pool)
+
+    get_times = []
+    for session in handles:
+        for handle in session.values():
+            started = time.perf_counter()
+            store.get(handle)
+            get_times.append(time.perf_counter() - started)
+    stats = store.stats()
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        capped = ArtifactStore(max_bytes=int(args.max_mb * 1024 * 1024), spill_dir=spill_dir)
+        capped_handles, _ = fill(capped, args.sessions, pool)
+        lost = sum(capped.get(handle) is None for session in capped_handles for handle in session.values())
+        capped_stats = capped.stats()
+
+    result = {
+        'sessions': args.sessions,
+        'distinct_profiles': args.distinct,
+        'per_session_mb': per_session / 2 ** 20,
+        'store_mb': stats['memory_bytes'] / 2 ** 20,
+        'uncompressed_mb': stats['raw_bytes'] / 2 ** 20,
+        'put_us_median': statistics.median(put_times) * 1e6,
+        'get_us_median': statistics.median(get_times) * 1e6,
+        'capped': {key: capped_stats[key] for key in ('memory_bytes', 'evictions', 'spills', 'disk_hits', 'spilled_entries')},
+        'capped_lost': lost,
+    }
+    print(f"{args.sessions} sessions over {args.distinct} distinct profiles")
+    print(f"  per-session copies   {result['per_session_mb']:8.1f} MB")
+    print(f"  shared store         {result['store_mb']:8.1f} MB  ({result['uncompressed_mb']:.1f} MB uncompressed)")
+    print(f"  put / get median     {result['put_us_median']:8.1f} / {result['get_us_median']:.1f} µs per artifact")
+    print(f"  capped at {args.max_mb:g} MB       {capped_stats['evictions']} evictions, {capped_stats['spills']} spills, "
+          f"{capped_stats['disk_hits']} read back from disk, {lost} lost")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
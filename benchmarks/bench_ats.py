@@ -0,0 +1,88 @@
+"""ATS keyword scoring: resumes × job descriptions match matrices
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ats [--resumes 1000] [--jobs 1000] [--output ats.json]
+
+Each synthetic resume borrows a slice of one posting's wording, so every
+resume has a clear best match. Reports the time to index the postings,
+encode the resumes, compute the full score matrix and list matched and
+missing keywords for each resume's best match, plus how often that best
+match is the posting the resume was built from.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.corpus import USER_DATA, synthetic_job_description, synthetic_resume
+from utils.ats import AtsScorer, resume_text
+
+
+def synthetic_resumes(jobs, count, seed=0):
+    """Return (resume texts, index of the posting each one borrows from)"""
+    rng = random.Random(seed)
+    texts, sources = [], []
+    for index in range(count):
+        source = rng.randrange(len(jobs))
+        words = jobs[source].split()
+        start = rng.randrange(max(1, len(words) - 60))
+        user_data = dict(USER_DATA, skills=' '.join(words[start:start + 60]))
+        texts.append(resume_text(user_data, synthetic_resume(40, seed=index)))
+        sources.append(source)
+    return texts, np.array(sources)
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark resume × job keyword scoring.')
+    parser.add_argument('--resumes', type=int, default=1000)
+    parser.add_argument('--jobs', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=512)
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+    
+    jobs = [synthetic_job_description(seed=index) for index in range(args.jobs)]
+    resumes, sources = synthetic_resumes(jobs, args.resumes)
+    
+    scorer, index_seconds = timed(AtsScorer, jobs)
+    encoded, encode_seconds = timed(scorer.encode, resumes)
+    scores, score_seconds = timed(scorer.score, encoded, batch_size=args.batch_size)
+    best = scores.argmax(axis=1)
+    
+    def reports():
+        indptr, indices = encoded
+        return [scorer.keyword_report(set(indices[indptr[r]:indptr[r + 1]].tolist()), best[r])
+                for r in range(len(resumes))]
+    
+    _, report_seconds = timed(reports)
+    result = {
+        'resumes': args.resumes,
+        'jobs': args.jobs,
+        'vocabulary': len(scorer.terms),
+        'index_seconds': round(index_seconds, 3),
+        'encode_seconds': round(encode_seconds, 3),
+        'score_seconds': round(score_seconds, 3),
+        'keyword_report_seconds': round(report_seconds, 3),
+        'total_seconds': round(index_seconds + encode_seconds + score_seconds + report_seconds, 3),
+        'best_match_accuracy': round(float((best == sources).mean()), 4),
+    }
+    for key, value in result.items():
+        print(f'{key:<24}{value}')
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""DOCX build time and memory: python-docx per request vs the cached skeleton
+
+Run from the repository root:
+
+    python -m benchmarks.bench_docx [--output docx.json]
+
+"before" is the original python-docx code kept in benchmarks/legacy.py;
+"after" is the skeleton builder at each zip compression setting. Peak
+memory is the tracemalloc high-water mark of one build.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+import zipfile
+
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+import app  # noqa: E402
+from benchmarks.corpus import SIZES, USER_DATA, synthetic_cover_letter, synthetic_resume  # noqa: E402
+from benchmarks.legacy import legacy_create_docx_cover_letter, legacy_create_docx_resume  # noqa: E402
+
+COMPRESSION_SETTINGS = {
+    'deflate': (zipfile.ZIP_DEFLATED, None),
+    'deflate-1': (zipfile.ZIP_DEFLATED, 1),
+    'stored': (zipfile.ZIP_STORED, None),
+}
+
+
+def with_compression(build, compression, compresslevel):
+    def run(*args):
+        saved = app.DOCX_COMPRESSION, app.DOCX_COMPRESSLEVEL
+        app.DOCX_COMPRESSION, app.DOCX_COMPRESSLEVEL = compression, compresslevel
+        try:
+            return build(*args)
+        finally:
+            app.DOCX_COMPRESSION, app.DOCX_COMPRESSLEVEL = saved
+    return run
+
+
+def profile(build, args, repeats):
+    build(*args)  # warm-up, and the one-off skeleton load for the new builder
+    durations = []
+    for _ in range(repeats):
+        app.get_parsed_documents.clear()
+        started = time.perf_counter()
+        output = build(*args)
+        durations.append(time.perf_counter() - started)
+    
+    app.get_parsed_documents.clear()
+    tracemalloc.start()
+    build(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'median_ms': round(statistics.median(durations) * 1000, 3),
+        'peak_kib': round(peak / 1024, 1),
+        'output_bytes': len(output.getvalue()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare DOCX build time and memory before and after.')
+    parser.add_argument('--sizes', default=','.join(SIZES))
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+    
+    results = []
+    print(f"{'document':<14}{'size':<14}{'variant':<12}{'median ms':>11}{'peak KiB':>11}{'bytes':>10}")
+    for size in [s.strip() for s in args.sizes.split(',') if s.strip()]:
+        lines = SIZES[size]
+        repeats = max(2, args.repeats * 40 // max(lines, 40))
+        cases = [
+            ('resume', (synthetic_resume(lines), USER_DATA), legacy_create_docx_resume, app.create_docx_resume),
+            ('cover_letter', (synthetic_cover_letter(max(1, lines // 10)), USER_DATA),
+             legacy_create_docx_cover_letter, app.create_docx_cover_letter),
+        ]
+        for document, build_args, before, after in cases:
+            variants = [('before', before)] + [
+                (f'after/{name}', with_compression(after, *setting))
+                for name, setting in COMPRESSION_SETTINGS.items()
+            ]
+            for variant, build in variants:
+                result = profile(build, build_args, repeats)
+                result.update(document=document, size=size, lines=lines, variant=variant)
+                results.append(result)
+                print(f"{document:<14}{size:<14}{variant:<12}{result['median_ms']:>11.3f}"
+                      f"{result['peak_kib']:>11.1f}{result['output_bytes']:>10}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Hand edits: updating the preview and DOCX after a one-line change
+
+Run from the repository root:
+
+    python -m benchmarks.bench_edit [--lines 2000] [--edits 20] [--output edit.json]
+
+Each edit changes one line of a large synthetic résumé. "Full rebuild"
+parses the edited text and renders the HTML preview and the DOCX from
+scratch, with the per-section caches cleared, as every edit would cost
+without them. "Incremental" is what the editor does: apply_resume_edit
+diffs the text against the previous parse, and the renderers reuse every
+unchanged section, so only the edited one is parsed and rendered again.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+import app  # noqa: E402
+from benchmarks.corpus import USER_DATA, synthetic_resume  # noqa: E402
+from utils.document import match_section_header, parse_document  # noqa: E402
+
+
+def clear_caches():
+    app.get_parsed_documents.clear()
+    app.get_section_cache.clear()
+
+
+def render(content):
+    app.create_resume_html(content, USER_DATA)
+    app.create_docx_resume(content, USER_DATA)
+
+
+def edits(content, count, seed=0):
+    """Yield (previous, edited) texts, each changing one body line of the last"""
+    rng = random.Random(seed)
+    lines = content.split('\n')
+    body = [index for index, line in enumerate(lines) if line.strip() and match_section_header(line.strip()) is None]
+    for number in range(count):
+        index = rng.choice(body)
+        previous = '\n'.join(lines)
+        lines[index] = f'{lines[index]} (edit {number})'
+        yield previous, '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark re-rendering a résumé after a hand edit.')
+    parser.add_argument('--lines', type=int, default=2000)
+    parser.add_argument('--edits', type=int, default=20)
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+
+    content = parse_document(synthetic_resume(args.lines)).as_text()
+
+    full = []
+    for _, edited in edits(content, args.edits):
+        clear_caches()
+        started = time.perf_counter()
+        render(edited)
+        full.append(time.perf_counter() - started)
+
+    clear_caches()
+    render(content)
+    incremental = []
+    changed_sections = []
+    for previous, edited in edits(content, args.edits):
+        started = time.perf_counter()
+        changed_sections.append(len(app.apply_resume_edit(previous, edited)))
+        render(edited)
+        incremental.append(time.perf_counter() - started)
+
+    result = {
+        'lines': args.lines,
+        'bytes': len(content.encode('utf-8')),
+        'sections': len(app.get_resume_document(content).sections),
+        'edits': args.edits,
+        'sections_changed_median': statistics.median(changed_sections),
+        'full_ms_median': statistics.median(full) * 1000,
+        'incremental_ms_median': statistics.median(incremental) * 1000,
+    }
+    print(f"{args.edits} one-line edits to a {args.lines}-line résumé ({result['bytes'] / 1024:.0f} KB, "
+          f"{result['sections']} sections)")
+    print(f"  full rebuild   {result['full_ms_median']:8.1f} ms median")
+    print(f"  incremental    {result['incremental_ms_median']:8.1f} ms median "
+          f"({result['sections_changed_median']:g} section re-rendered)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Near-duplicate index: lookup latency, memory and accuracy as it grows
+
+Run from the repository root:
+
+    python -m benchmarks.bench_near_duplicates [--sizes 1000,10000,100000] [--output nd.json]
+
+The index is filled with unrelated synthetic job postings. At each size
+it is queried with edited copies of indexed postings (reformatted, new
+date, a few words changed), which should match, and with fresh postings,
+which should not. Lookup time covers normalizing, shingling and hashing
+the query as well as the probe itself. Memory is the index's own
+estimate, which its byte cap is enforced against; --trace-memory also
+measures it with tracemalloc, at the cost of slower timings.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import synthetic_job_description
+from utils.metrics import percentile
+from utils.near_duplicates import NearDuplicateIndex
+
+SCOPE = 'benchmark'
+
+
+def reformat(text, rng):
+    return '  ' + text.upper().replace('. ', '.\n\n  ')
+
+
+def repost(text, rng):
+    return text.replace('Posted on 2024-', 'Posted on 2025-', 1)
+
+
+def edit_words(text, rng):
+    words = text.split()
+    for _ in range(max(1, len(words) // 50)):
+        words[rng.randrange(len(words))] = 'changed'
+    return ' '.join(words)
+
+
+VARIANTS = {'reformatted': reformat, 'reposted': repost, 'edited_2pct': edit_words}
+
+
+def time_queries(index, texts):
+    durations = []
+    matches = 0
+    for text in texts:
+        started = time.perf_counter()
+        match = index.query(SCOPE, text)
+        durations.append(time.perf_counter() - started)
+        matches += match is not None
+    return sorted(durations), matches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the near-duplicate index.')
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--threshold', type=float, default=0.85)
+    parser.add_argument('--trace-memory', action='store_true', help='measure memory with tracemalloc')
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    
+    rng = random.Random(0)
+    if args.trace_memory:
+        tracemalloc.start()
+    index = NearDuplicateIndex(threshold=args.threshold, max_entries=sizes[-1], max_bytes=float('inf'))
+    add_durations = []
+    results = []
+    print(f"{'entries':>8}{'add us':>9}{'lookup p50 us':>15}{'p99 us':>9}{'MiB':>8}"
+          + ''.join(f'{name:>13}' for name in VARIANTS) + f"{'false pos':>11}")
+    for size in sizes:
+        while len(index) < size:
+            text = synthetic_job_description(seed=len(index))
+            started = time.perf_counter()
+            index.add(SCOPE, text, len(index))
+            add_durations.append(time.perf_counter() - started)
+        
+        seeds = [rng.randrange(size) for _ in range(args.queries)]
+        recall = {}
+        lookups = []
+        for name, variant in VARIANTS.items():
+            durations, matches = time_queries(index, [variant(synthetic_job_description(seed=seed), rng) for seed in seeds])
+            recall[name] = matches / len(seeds)
+            lookups.extend(durations)
+        durations, false_positives = time_queries(
+            index, [synthetic_job_description(seed=10 ** 7 + i) for i in range(args.queries)]
+        )
+        lookups = sorted(lookups + durations)
+        result = {
+            'entries': size,
+            'add_us': round(statistics.median(add_durations) * 1e6, 1),
+            'lookup_p50_us': round(percentile(lookups, 0.50) * 1e6, 1),
+            'lookup_p99_us': round(percentile(lookups, 0.99) * 1e6, 1),
+            'estimated_mib': round(index.stats()['estimated_bytes'] / 2 ** 20, 1),
+            'recall': recall,
+            'false_positive_rate': false_positives / args.queries,
+        }
+        if args.trace_memory:
+            result['traced_mib'] = round(tracemalloc.get_traced_memory()[0] / 2 ** 20, 1)
+        results.append(result)
+        print(f"{size:>8}{result['add_us']:>9.1f}{result['lookup_p50_us']:>15.1f}{result['lookup_p99_us']:>9.1f}"
+              f"{result.get('traced_mib', result['estimated_mib']):>8.1f}" + ''.join(f'{recall[name]:>13.2f}' for name in VARIANTS)
+              + f"{result['false_positive_rate']:>11.3f}")
+    tracemalloc.stop()
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'threshold': args.threshold, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Micro-benchmark: legacy line-by-keyword parser vs the document tree parser
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parser
+"""
+import timeit
+
+from benchmarks.corpus import SIZES, synthetic_resume
+from benchmarks.legacy import legacy_format_section_content, legacy_parse_resume_sections
+from utils.document import parse_document
+
+
+def legacy_pipeline(text):
+    # Parse, then re-split every section for HTML (the DOCX path did it again)
+    sections = legacy_parse_resume_sections(text)
+    return [legacy_format_section_content(content) for content in sections.values()]
+
+
+def tree_pipeline(text):
+    return parse_document(text)
+
+
+def check_parity(text):
+    legacy_sections = legacy_parse_resume_sections(text)
+    document = parse_document(text)
+    assert document.as_dict() == legacy_sections, 'section parity broken'
+
+
+def main():
+    print(f"{'size':<14}{'lines':>7}{'legacy ms':>12}{'tree ms':>12}{'speedup':>10}")
+    for name, lines in SIZES.items():
+        text = synthetic_resume(lines)
+        check_parity(text)
+        number = max(1, 20000 // lines)
+        legacy = min(timeit.repeat(lambda: legacy_pipeline(text), number=number, repeat=5)) / number
+        tree = min(timeit.repeat(lambda: tree_pipeline(text), number=number, repeat=5)) / number
+        print(f"{name:<14}{lines:>7}{legacy * 1000:>12.3f}{tree * 1000:>12.3f}{legacy / tree:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
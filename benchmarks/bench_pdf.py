@@ -0,0 +1,80 @@
+"""PDF vs DOCX build time and size for the same documents
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pdf [--output pdf.json]
+
+Both formats are built from the parsed résumé, so the numbers compare the
+writers themselves. Peak memory is the tracemalloc high-water mark of one
+build.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+import app  # noqa: E402
+from benchmarks.corpus import SIZES, USER_DATA, synthetic_cover_letter, synthetic_resume  # noqa: E402
+
+
+def profile(build, args, repeats):
+    build(*args)  # warm-up
+    durations = []
+    for _ in range(repeats):
+        app.get_parsed_documents.clear()
+        started = time.perf_counter()
+        output = build(*args)
+        durations.append(time.perf_counter() - started)
+    
+    app.get_parsed_documents.clear()
+    tracemalloc.start()
+    build(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'median_ms': round(statistics.median(durations) * 1000, 3),
+        'peak_kib': round(peak / 1024, 1),
+        'output_bytes': len(output.getvalue()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare PDF and DOCX build time and size.')
+    parser.add_argument('--sizes', default=','.join(SIZES))
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+    
+    results = []
+    print(f"{'document':<14}{'size':<14}{'format':<8}{'median ms':>11}{'peak KiB':>11}{'bytes':>10}")
+    for size in [s.strip() for s in args.sizes.split(',') if s.strip()]:
+        lines = SIZES[size]
+        repeats = max(2, args.repeats * 40 // max(lines, 40))
+        cases = [
+            ('resume', (synthetic_resume(lines), USER_DATA),
+             app.create_docx_resume, app.create_pdf_resume),
+            ('cover_letter', (synthetic_cover_letter(max(1, lines // 10)), USER_DATA),
+             app.create_docx_cover_letter, app.create_pdf_cover_letter),
+        ]
+        for document, build_args, docx_build, pdf_build in cases:
+            for fmt, build in (('docx', docx_build), ('pdf', pdf_build)):
+                result = profile(build, build_args, repeats)
+                result.update(document=document, size=size, lines=lines, format=fmt)
+                results.append(result)
+                print(f"{document:<14}{size:<14}{fmt:<8}{result['median_ms']:>11.3f}"
+                      f"{result['peak_kib']:>11.1f}{result['output_bytes']:>10}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Model routing harness: stub models with scripted latencies and failures
+
+Run from the repository root:
+
+    python -m benchmarks.bench_routing [--verbose] [--output routing.json]
+
+Each scenario sends a stream of requests through the app's run_completion
+with a fresh router, against stub models whose latency (or failure) is
+scripted per phase. Time is simulated: a stub call advances the router's
+clock by its scripted latency instead of sleeping, so the run takes well
+under a second. Every phase states which model should be serving by its
+end; the exit status is 1 if any does not, or if a request failed while
+a healthy model was available. --verbose prints the router's log.
+"""
+import argparse
+import json
+import logging
+import sys
+from types import SimpleNamespace
+
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+import app  # noqa: E402
+from utils.metrics import percentile  # noqa: E402
+from utils.model_registry import DEFAULT_MODELS, ModelRouter  # noqa: E402
+
+PRIMARY, INSTANT, LARGE = 'llama3-8b-8192', 'llama-3.1-8b-instant', 'llama-3.3-70b-versatile'
+
+# Seconds between requests
+GAP = 10.0
+
+# (name, task, phases); a phase is (requests, {model: latency or 'fail'}, model expected last)
+SCENARIOS = [
+    ('steady', 'resume', [
+        (30, {PRIMARY: 4.0, INSTANT: 6.0, LARGE: 12.0}, PRIMARY),
+    ]),
+    ('primary slows past the SLO', 'resume', [
+        (20, {PRIMARY: 4.0, INSTANT: 6.0, LARGE: 12.0}, PRIMARY),
+        (20, {PRIMARY: 35.0, INSTANT: 6.0, LARGE: 12.0}, INSTANT),
+    ]),
+    ('primary fails, then recovers', 'cover_letter', [
+        (20, {PRIMARY: 3.0, INSTANT: 5.0, LARGE: 10.0}, PRIMARY),
+        (30, {PRIMARY: 'fail', INSTANT: 5.0, LARGE: 10.0}, INSTANT),
+        # Long enough for the primary's failures and cooldown to expire
+        (0, {}, None),
+        (20, {PRIMARY: 3.0, INSTANT: 5.0, LARGE: 10.0}, PRIMARY),
+    ]),
+    ('primary retired, fallback overloaded', 'resume', [
+        (30, {PRIMARY: 'fail', INSTANT: 'fail', LARGE: 14.0}, LARGE),
+    ]),
+    ('every model over the SLO', 'resume_section', [
+        (20, {PRIMARY: 15.0, INSTANT: 11.0}, INSTANT),
+    ]),
+]
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ModelUnavailable(Exception):
+    status_code = 503
+
+
+class ScriptedCompletions:
+    """chat.completions.create stand-in: each model follows the current phase's script"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.script = {}
+
+    def create(self, messages, model, temperature=None, max_tokens=None, **kwargs):
+        behaviour = self.script[model]
+        if behaviour == 'fail':
+            self.clock.now += 0.5
+            raise ModelUnavailable(f'{model} is unavailable')
+        self.clock.now += behaviour
+        message = SimpleNamespace(role='assistant', content=f'answer from {model}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason='stop')], usage=None)
+
+
+def run_scenario(name, task, phases):
+    clock = SimulatedClock()
+    completions = ScriptedCompletions(clock)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    router = ModelRouter(DEFAULT_MODELS, app.MODEL_TASKS, clock=clock)
+    app.get_model_router = lambda: router
+
+    results = []
+    for number, (requests, script, expected) in enumerate(phases, 1):
+        if not requests:
+            clock.now += router.max_age
+            continue
+        completions.script = script
+        served, latencies, fallbacks, errors = {}, [], 0, 0
+        last = None
+        for _ in range(requests):
+            clock.now += GAP
+            started = clock.now
+            stats = {}
+            try:
+                app.run_completion(client, 'Write a resume.', 100, task, stats=stats)
+            except ModelUnavailable:
+                errors += 1
+                last = None
+                continue
+            latencies.append(clock.now - started)
+            served[stats['model']] = served.get(stats['model'], 0) + 1
+            fallbacks += len(stats['fallbacks'])
+            last = stats['model']
+        healthy = any(behaviour != 'fail' for behaviour in script.values())
+        latencies.sort()
+        results.append({
+            'scenario': name,
+            'phase': number,
+            'task': task,
+            'served': served,
+            'fallbacks': fallbacks,
+            'errors': errors,
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'last_model': last,
+            'expected': expected,
+            'ok': last == expected and not (healthy and errors),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check model routing against stub models with scripted latencies.')
+    parser.add_argument('--verbose', action='store_true', help="print the router's decisions")
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+        logging.getLogger('resume_app.routing').setLevel(logging.INFO)
+    else:
+        logging.getLogger('resume_app.routing').setLevel(logging.ERROR)
+
+    results = []
+    for name, task, phases in SCENARIOS:
+        results.extend(run_scenario(name, task, phases))
+
+    print(f"{'scenario':<38}{'phase':>6}{'p50 s':>8}{'p95 s':>8}{'fallbacks':>11}{'errors':>8}  "
+          f"{'served by':<66}{'ends on':<26}")
+    for result in results:
+        served = ', '.join(f'{model} {count}' for model, count in result['served'].items())
+        print(f"{result['scenario']:<38}{result['phase']:>6}{result['p50'] or 0:>8.1f}{result['p95'] or 0:>8.1f}"
+              f"{result['fallbacks']:>11}{result['errors']:>8}  {served:<66}{result['last_model'] or '-':<26}"
+              f"{'ok' if result['ok'] else 'FAIL (expected ' + result['expected'] + ')'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results}, f, indent=2)
+    return 0 if all(result['ok'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Cold start: import time and time to first render of the app
+
+Each sample runs in a fresh interpreter, so nothing is warm. Run from
+the repository root:
+
+    python -m benchmarks.bench_startup [--repeats 5] [--output startup.json]
+
+"lazy" is the app as shipped; "eager" imports the Groq SDK and
+python-docx and builds the client up front, as the app did before, for
+comparison. Time to first render runs the whole script once through
+Streamlit's AppTest and is measured from process launch. Client setup is the construction of
+the Groq client, which now starts in the background after the first
+render.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+import streamlit.logger
+streamlit.logger.set_log_level('error')
+streamlit_done = time.perf_counter()
+if {eager}:
+    import docx  # noqa: F401
+    import groq
+    groq.Groq(api_key='bench', max_retries=0)
+result = {{'streamlit_ms': (streamlit_done - started) * 1000}}
+if {mode!r} == 'import':
+    import app
+    result['import_ms'] = (time.perf_counter() - streamlit_done) * 1000
+    result['loaded'] = [name for name in ('groq', 'docx', 'pydantic', 'httpx') if name in sys.modules]
+    import functools
+    from utils.deferred_client import DeferredClient
+    client = DeferredClient(functools.partial(app.build_groq_client, 'bench'))
+    client.get()
+    result['client_setup_ms'] = client.setup_seconds * 1000
+else:
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file('app.py', default_timeout=60)
+    at.secrets['GROQ_API_KEY'] = 'bench'
+    at.run()
+    result['rendered_at'] = time.time()
+    result['exceptions'] = len(at.exception)
+print(json.dumps(result))
+'''
+
+
+def run_child(mode, eager):
+    env = dict(os.environ, GROQ_WARMUP='0')
+    launched = time.time()
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD.format(mode=mode, eager=eager)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    if 'rendered_at' in result:
+        result['first_render_ms'] = (result.pop('rendered_at') - launched) * 1000
+    return result
+
+
+def median(samples, key):
+    return round(statistics.median(sample[key] for sample in samples), 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure app import time and time to first render.')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'startup':<8}{'streamlit ms':>14}{'app import ms':>15}{'client setup ms':>17}"
+          f"{'first render ms':>17}  loaded by import")
+    for label, eager in (('eager', True), ('lazy', False)):
+        imports = [run_child('import', eager) for _ in range(args.repeats)]
+        renders = [run_child('render', eager) for _ in range(args.repeats)]
+        result = {
+            'startup': label,
+            'streamlit_ms': median(imports, 'streamlit_ms'),
+            'import_ms': median(imports, 'import_ms'),
+            'client_setup_ms': median(imports, 'client_setup_ms'),
+            'first_render_ms': median(renders, 'first_render_ms'),
+            'loaded_by_import': imports[-1]['loaded'],
+            'exceptions': sum(sample['exceptions'] for sample in renders),
+        }
+        results.append(result)
+        print(f"{label:<8}{result['streamlit_ms']:>14.1f}{result['import_ms']:>15.1f}"
+              f"{result['client_setup_ms']:>17.1f}{result['first_render_ms']:>17.1f}  "
+              f"{', '.join(result['loaded_by_import']) or '-'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results}, f, indent=2)
+    return 1 if any(result['exceptions'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Transport: request latency under parallel load, with and without the pooled client
+
+Run from the repository root:
+
+    python -m benchmarks.bench_transport [--parallel 8] [--waves 4] [--gap 6] [--output transport.json]
+
+Starts the fake Groq server over HTTPS with a self-signed certificate
+(made with the openssl command line tool) and a pause before each new
+connection, standing in for the TCP and TLS round trips to the real API.
+Requests arrive in waves of --parallel at once, with --gap seconds of
+idle time between waves, like users reading a preview before clicking
+again. Clients compared:
+
+- "sdk default": the Groq SDK's own pool, which closes idle connections
+  after five seconds and keeps at most 20
+- "pooled": the app's client (transport settings from app.py), warmed up
+  with --parallel pings before the first wave, called from threads
+- "pooled async": the matching AsyncGroq client, warmed up the same way,
+  with each wave sent through asyncio.gather
+
+Reports p50 and p99 request latency and the connections each client
+opened.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+import app  # noqa: E402
+from tools.fake_groq_server import start_server  # noqa: E402
+from utils.metrics import percentile  # noqa: E402
+from utils.transport import build_async_http_client, build_http_client, warm_connections  # noqa: E402
+
+MESSAGES = [{'role': 'user', 'content': 'Write a cover letter.'}]
+
+
+def make_certificate(directory):
+    """Write a self-signed certificate for 127.0.0.1; return (certfile, keyfile)"""
+    openssl = shutil.which('openssl')
+    if openssl is None:
+        raise SystemExit('bench_transport needs the openssl command line tool to make a test certificate')
+    certfile, keyfile = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(
+        [openssl, 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', keyfile, '-out', certfile,
+         '-days', '1', '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1'],
+        check=True, capture_output=True
+    )
+    return certfile, keyfile
+
+
+def timed(call):
+    started = time.perf_counter()
+    call()
+    return time.perf_counter() - started
+
+
+def run_sync(client, args):
+    latencies = []
+    create = lambda: client.chat.completions.create(model='llama3-8b-8192', messages=MESSAGES, max_tokens=200)  # noqa: E731
+    with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+        for wave in range(args.waves):
+            if wave:
+                time.sleep(args.gap)
+            latencies.extend(pool.map(lambda _: timed(create), range(args.parallel)))
+    return latencies
+
+
+async def run_async(client, args):
+    async def timed_create():
+        started = time.perf_counter()
+        await client.chat.completions.create(model='llama3-8b-8192', messages=MESSAGES, max_tokens=200)
+        return time.perf_counter() - started
+
+    latencies = []
+    for wave in range(args.waves):
+        if wave:
+            await asyncio.sleep(args.gap)
+        latencies.extend(await asyncio.gather(*(timed_create() for _ in range(args.parallel))))
+    return latencies
+
+
+def measure(name, args, certfile, keyfile, run):
+    server = start_server(latency=args.latency, certfile=certfile, keyfile=keyfile, connect_delay=args.connect_delay)
+    base_url = f'https://127.0.0.1:{server.server_address[1]}'
+    try:
+        latencies = sorted(run(base_url))
+    finally:
+        server.shutdown()
+    return {
+        'client': name,
+        'requests': len(latencies),
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000,
+        'connections': server.connections_opened,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark API request latency with and without the pooled client.')
+    parser.add_argument('--parallel', type=int, default=8, help='requests sent at once in each wave')
+    parser.add_argument('--waves', type=int, default=4)
+    parser.add_argument('--gap', type=float, default=6.0, help='idle seconds between waves')
+    parser.add_argument('--latency', type=float, default=0.05, help="the server's time to answer")
+    parser.add_argument('--connect-delay', type=float, default=0.1,
+                        help='pause before each new connection is served (handshake round trips)')
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+
+    import groq
+
+    settings = app.groq_transport_settings(args.parallel)
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = make_certificate(directory)
+
+        def sdk_default(base_url):
+            client = groq.Groq(api_key='bench', base_url=base_url, max_retries=0,
+                               http_client=groq.DefaultHttpxClient(verify=certfile))
+            return run_sync(client, args)
+
+        def pooled(base_url):
+            client = groq.Groq(api_key='bench', base_url=base_url, max_retries=0,
+                               http_client=build_http_client(verify=certfile, **settings))
+            warm_connections(client.models.list, args.parallel)
+            return run_sync(client, args)
+
+        def pooled_async(base_url):
+            async def run():
+                client = groq.AsyncGroq(api_key='bench', base_url=base_url, max_retries=0,
+                                        http_client=build_async_http_client(verify=certfile, **settings))
+                await asyncio.gather(*(client.models.list() for _ in range(args.parallel)))
+                return await run_async(client, args)
+            return asyncio.run(run())
+
+        results = [
+            measure('sdk default', args, certfile, keyfile, sdk_default),
+            measure('pooled', args, certfile, keyfile, pooled),
+            measure('pooled async', args, certfile, keyfile, pooled_async),
+        ]
+
+    print(f"{args.waves} waves of {args.parallel} parallel requests, {args.gap:g}s apart; "
+          f"server answers in {args.latency * 1000:.0f} ms, new connections wait {args.connect_delay * 1000:.0f} ms")
+    print(f"{'client':<16}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'connections':>13}")
+    for result in results:
+        print(f"{result['client']:<16}{result['p50_ms']:>9.1f}{result['p99_ms']:>9.1f}{result['max_ms']:>9.1f}"
+              f"{result['connections']:>13}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
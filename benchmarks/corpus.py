@@ -0,0 +1,107 @@
+"""Synthetic LLM outputs for benchmarks"""
+import json
+import random
+
+from utils.document import parse_document
+from utils.structured import RESUME_SCHEMA
+
+_SECTIONS = (
+    'PROFESSIONAL SUMMARY', 'EDUCATION', 'WORK EXPERIENCE', 'SKILLS', 'ADDITIONAL INFORMATION'
+)
+
+_SENTENCES = (
+    'Designed and shipped customer-facing features used by thousands of users.',
+    'Reduced infrastructure cost by 30% through capacity planning and caching.',
+    'Mentored junior engineers and led weekly design reviews.',
+    'Built data pipelines in Python and SQL feeding executive dashboards.',
+    'Collaborated with product and design to define quarterly roadmaps.',
+    'Migrated legacy services to containers with zero downtime.',
+)
+
+_BULLETS = ('- ', '• ', '* ', '1. ', '2. ')
+
+
+def synthetic_resume(lines, seed=0):
+    """Return resume-shaped text with roughly the given number of lines"""
+    rng = random.Random(seed)
+    out = []
+    per_section = max(1, lines // len(_SECTIONS))
+    while len(out) < lines:
+        for title in _SECTIONS:
+            out.append(title)
+            for i in range(per_section - 1):
+                roll = rng.random()
+                if roll < 0.1:
+                    out.append('')
+                elif roll < 0.6:
+                    out.append(rng.choice(_BULLETS) + rng.choice(_SENTENCES))
+                else:
+                    out.append(rng.choice(_SENTENCES))
+            out.append('')
+    return '\n'.join(out[:lines])
+
+
+def synthetic_resume_json(lines, seed=0):
+    """Return synthetic_resume as the JSON object structured mode asks for"""
+    keys = {title: key for key, title, _ in RESUME_SCHEMA}
+    document = parse_document(synthetic_resume(lines, seed))
+    return json.dumps({keys[section.title]: list(section.lines) for section in document.sections})
+
+
+# Named sizes used across benchmarks, from one page up to pathological output
+SIZES = {
+    'one_page': 40,
+    'two_page': 120,
+    'long': 1000,
+    'pathological': 10000,
+}
+
+
+def synthetic_cover_letter(paragraphs, seed=0):
+    """Return a business letter with the given number of body paragraphs"""
+    rng = random.Random(seed)
+    body = [' '.join(rng.choice(_SENTENCES) for _ in range(4)) for _ in range(paragraphs)]
+    return '\n\n'.join(['Dear Hiring Manager,'] + body + ['Sincerely,\nJohn Doe'])
+
+
+_JOB_WORDS = (
+    'python', 'sql', 'aws', 'docker', 'kubernetes', 'react', 'java', 'golang', 'terraform', 'spark',
+    'engineer', 'senior', 'team', 'build', 'design', 'maintain', 'scale', 'services', 'data', 'platform',
+    'customers', 'product', 'remote', 'hybrid', 'benefits', 'years', 'experience', 'ownership', 'ship',
+    'testing', 'reliability', 'security', 'mentoring', 'roadmap', 'analytics', 'pipelines', 'cloud',
+)
+
+
+def synthetic_job_description(seed=0, words=200):
+    """Return a job posting of random sentences; different seeds give unrelated postings"""
+    rng = random.Random(seed)
+    # Mix in rarer made-up terms so unrelated postings share few shingles
+    vocabulary = _JOB_WORDS + tuple(f'term{rng.randrange(100000)}' for _ in range(60))
+    sentences = []
+    count = 0
+    while count < words:
+        length = rng.randint(8, 16)
+        sentences.append(' '.join(rng.choice(vocabulary) for _ in range(length)).capitalize() + '.')
+        count += length
+    return f"Posted on 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}. " + ' '.join(sentences)
+
+
+# Representative form input for renderer and end-to-end benchmarks
+USER_DATA = {
+    'name': 'John Doe',
+    'email': 'john.doe@email.com',
+    'phone': '+1 (555) 123-4567',
+    'address': '123 Main St, City, State 12345',
+    'linkedin': 'https://linkedin.com/in/johndoe',
+    'job_role': 'Software Developer',
+    'education': "Bachelor's in Computer Science, XYZ University (2020)",
+    'work_experience': 'Software Engineer at ABC Corp (2020-2023)\n- Developed web applications',
+    'skills': 'Python, JavaScript, React, SQL, Git',
+    'additional_info': 'AWS Certified Developer',
+}
+
+COMPANY_INFO = {
+    'company_name': 'Tech Corp Inc.',
+    'hiring_manager': 'Ms. Jane Smith',
+    'job_description': 'Build and maintain web services in Python.',
+}
@@ -0,0 +1,202 @@
+"""Reference copies of the original parsing, section and DOCX renderers
+
+Kept verbatim so benchmarks can check output parity against the current
+code and measure the speedup.
+"""
+import io
+from datetime import datetime
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Inches
+
+
+def legacy_parse_resume_sections(resume_content):
+    """Parse resume content into sections"""
+    sections = {}
+    current_section = None
+    current_content = []
+    
+    lines = resume_content.split('\n')
+    
+    section_keywords = [
+        'PROFESSIONAL SUMMARY', 'SUMMARY', 'PROFILE',
+        'EDUCATION', 'ACADEMIC BACKGROUND',
+        'WORK EXPERIENCE', 'EXPERIENCE', 'EMPLOYMENT', 'PROFESSIONAL EXPERIENCE',
+        'SKILLS', 'TECHNICAL SKILLS', 'CORE COMPETENCIES',
+        'ADDITIONAL INFORMATION', 'CERTIFICATIONS', 'PROJECTS', 'ACHIEVEMENTS'
+    ]
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+            
+        # Check if this line is a section header
+        is_section_header = False
+        for keyword in section_keywords:
+            if keyword in line.upper() and len(line) <= 50:  # Likely a header
+                is_section_header = True
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = keyword
+                current_content = []
+                break
+        
+        if not is_section_header and current_section:
+            current_content.append(line)
+    
+    # Add the last section
+    if current_section and current_content:
+        sections[current_section] = '\n'.join(current_content)
+    
+    return sections
+
+
+def legacy_format_section_content(content):
+    """Format section content with proper HTML"""
+    if not content.strip():
+        return "<p>Information not provided</p>"
+    
+    lines = content.split('\n')
+    formatted_lines = []
+    current_paragraph = []
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if current_paragraph:
+                formatted_lines.append('<p>' + ' '.join(current_paragraph) + '</p>')
+                current_paragraph = []
+            continue
+            
+        # Check if line starts with bullet point indicators
+        if line.startswith(('•', '-', '*', '▪', '◦')) or line.startswith(tuple(f'{i}.' for i in range(1, 10))):
+            if current_paragraph:
+                formatted_lines.append('<p>' + ' '.join(current_paragraph) + '</p>')
+                current_paragraph = []
+            # Start or continue a list
+            if not formatted_lines or not formatted_lines[-1].endswith('</ul>'):
+                formatted_lines.append('<ul>')
+            # Clean the bullet point
+            clean_line = line[1:].strip() if line[0] in '•-*▪◦' else line[2:].strip()
+            formatted_lines.append(f'<li>{clean_line}</li>')
+        else:
+            # Close any open list
+            if formatted_lines and formatted_lines[-1].startswith('<li>'):
+                formatted_lines.append('</ul>')
+            current_paragraph.append(line)
+    
+    # Handle remaining content
+    if current_paragraph:
+        formatted_lines.append('<p>' + ' '.join(current_paragraph) + '</p>')
+    
+    # Close any unclosed list
+    if formatted_lines and formatted_lines[-1].startswith('<li>'):
+        formatted_lines.append('</ul>')
+    
+    return ''.join(formatted_lines)
+
+
+def legacy_create_docx_resume(resume_content, user_data):
+    """Create a Word document for the resume"""
+    doc = Document()
+    
+    # Set document margins
+    sections = doc.sections
+    for section in sections:
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+        section.left_margin = Inches(1)
+        section.right_margin = Inches(1)
+    
+    # Title - Name
+    title = doc.add_heading(user_data['name'], 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Contact info
+    contact_para = doc.add_paragraph()
+    contact_run = contact_para.add_run(f"{user_data['email']} | {user_data['phone']}")
+    contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    address_para = doc.add_paragraph()
+    address_run = address_para.add_run(user_data['address'])
+    address_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    if user_data.get('linkedin') and user_data['linkedin'].strip():
+        linkedin_para = doc.add_paragraph()
+        linkedin_run = linkedin_para.add_run(f"LinkedIn: {user_data['linkedin']}")
+        linkedin_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Add line break
+    doc.add_paragraph()
+    
+    # Parse and add resume sections
+    sections_dict = legacy_parse_resume_sections(resume_content)
+    
+    for section_title, section_content in sections_dict.items():
+        # Add section heading
+        heading = doc.add_heading(section_title, level=1)
+        
+        # Add section content
+        lines = section_content.split('\n')
+        current_paragraph = []
+        
+        for line in lines:
+            line = line.strip()
+            if not line:
+                if current_paragraph:
+                    para = doc.add_paragraph(' '.join(current_paragraph))
+                    current_paragraph = []
+                continue
+                
+            # Check if line is a bullet point
+            if line.startswith(('•', '-', '*', '▪', '◦')) or line.startswith(tuple(f'{i}.' for i in range(1, 10))):
+                if current_paragraph:
+                    para = doc.add_paragraph(' '.join(current_paragraph))
+                    current_paragraph = []
+                # Add bullet point
+                clean_line = line[1:].strip() if line[0] in '•-*▪◦' else line[2:].strip()
+                bullet_para = doc.add_paragraph(clean_line, style='List Bullet')
+            else:
+                current_paragraph.append(line)
+        
+        # Add any remaining paragraph content
+        if current_paragraph:
+            para = doc.add_paragraph(' '.join(current_paragraph))
+        
+        # Add space after each section
+        doc.add_paragraph()
+    
+    # Save to bytes
+    docx_buffer = io.BytesIO()
+    doc.save(docx_buffer)
+    docx_buffer.seek(0)
+    return docx_buffer
+
+
+def legacy_create_docx_cover_letter(cover_letter_content, user_data):
+    """Create a Word document for the cover letter"""
+    doc = Document()
+    
+    # Header with contact info
+    header_para = doc.add_paragraph()
+    header_para.add_run(f"{user_data['name']}\n{user_data['email']}\n{user_data['phone']}\n{user_data['address']}")
+    header_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    
+    # Add date
+    date_para = doc.add_paragraph()
+    date_para.add_run(datetime.now().strftime('%B %d, %Y'))
+    date_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    
+    # Add a line break
+    doc.add_paragraph()
+    
+    # Cover letter content
+    doc.add_paragraph(cover_letter_content)
+    
+    # Save to bytes
+    docx_buffer = io.BytesIO()
+    doc.save(docx_buffer)
+    docx_buffer.seek(0)
+    return docx_buffer
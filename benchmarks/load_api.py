@@ -0,0 +1,149 @@
+"""Load test for the HTTP API against a local stub LLM
+
+Starts the fake Groq server and api.py on free local ports, then sends
+concurrent requests to each endpoint and reports throughput and latency
+percentiles. Run from the repository root:
+
+    python -m benchmarks.load_api --requests 200 --concurrency 32 --latency 0.5
+
+With a stub latency L and C requests in flight, an API that never blocks
+its event loop approaches C / L generations per second.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.corpus import COMPANY_INFO, USER_DATA, synthetic_resume
+from tools.fake_groq_server import start_server
+from utils.metrics import percentile
+
+ENDPOINTS = ('resume', 'cover-letter', 'docx')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_api(port, llm_base_url, args):
+    """Run api.py in a subprocess and wait until it answers /health"""
+    process = subprocess.Popen(
+        [
+            sys.executable, 'api.py', '--port', str(port), '--base-url', llm_base_url,
+            '--api-key', 'load-test', '--rpm', '0', '--no-cache',
+            '--llm-workers', str(args.llm_workers), '--docx-workers', str(args.docx_workers),
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'api.py exited with status {process.returncode}')
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/health', timeout=1).status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('api.py did not start within 60 seconds')
+
+
+def request_for(endpoint, index):
+    # Vary the input so nothing can be answered from a cache
+    user_data = dict(USER_DATA, name=f"{USER_DATA['name']} {index}")
+    if endpoint == 'resume':
+        return '/v1/resume', user_data
+    if endpoint == 'cover-letter':
+        return '/v1/cover-letter', dict(user_data, **COMPANY_INFO)
+    return '/v1/docx/resume', dict(user_data, content=synthetic_resume(120, seed=index))
+
+
+async def run_endpoint(client, endpoint, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(index):
+        nonlocal errors
+        path, body = request_for(endpoint, index)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        'endpoint': endpoint,
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(requests / elapsed, 2),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 1),
+    }
+
+
+async def run_load(base_url, args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        results = []
+        for endpoint in args.endpoints:
+            results.append(await run_endpoint(client, endpoint, args.requests, args.concurrency))
+        return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the HTTP API against a stub LLM.')
+    parser.add_argument('--requests', type=int, default=100, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=16, help='requests in flight')
+    parser.add_argument('--latency', type=float, default=0.5, help='stub LLM seconds per call')
+    parser.add_argument('--llm-workers', type=int, default=32)
+    parser.add_argument('--docx-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--output', help='also write JSON results here')
+    args = parser.parse_args(argv)
+    args.endpoints = [e.strip() for e in args.endpoints.split(',') if e.strip()]
+
+    llm = start_server(latency=args.latency)
+    port = free_port()
+    api = start_api(port, f'http://127.0.0.1:{llm.server_address[1]}', args)
+    try:
+        results = asyncio.run(run_load(f'http://127.0.0.1:{port}', args))
+    finally:
+        api.terminate()
+        api.wait(timeout=30)
+        llm.shutdown()
+
+    print(f"{'endpoint':<14}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for result in results:
+        print(f"{result['endpoint']:<14}{result['requests']:>9}{result['errors']:>8}"
+              f"{result['requests_per_second']:>9.2f}{result['p50_ms']:>9.1f}"
+              f"{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'latency': args.latency, 'results': results}, f, indent=2)
+    return 1 if any(result['errors'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""Benchmark suite for the parsing and rendering hot paths
+
+Times parse_resume_sections, format_section_content, create_resume_html,
+create_docx_resume and create_docx_cover_letter over synthetic LLM output
+from one page up to 10k lines, plus an end-to-end run of main() through
+Streamlit's AppTest with a stub Groq client. Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --compare bench.json
+
+With --compare, any benchmark whose median is slower than the baseline by
+more than --threshold exits non-zero.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+import app  # noqa: E402
+from benchmarks.corpus import COMPANY_INFO, SIZES, USER_DATA, synthetic_cover_letter, synthetic_resume  # noqa: E402
+
+
+def measure(fn, repeats):
+    """Run fn repeatedly and return the individual durations in seconds"""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(name, size, samples, **extra):
+    ordered = sorted(samples)
+    result = {
+        'name': name,
+        'size': size,
+        'repeats': len(samples),
+        'min_ms': round(ordered[0] * 1000, 4),
+        'median_ms': round(statistics.median(ordered) * 1000, 4),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+    }
+    result.update(extra)
+    return result
+
+
+def repeats_for(lines, base):
+    # Keep the pathological sizes from dominating the run time
+    return max(3, base * 40 // max(lines, 40))
+
+
+def cold(fn):
+    """Wrap fn so every call re-parses instead of hitting the parse cache"""
+    def run():
+        app.get_parsed_documents.clear()
+        return fn()
+    return run
+
+
+def bench_hot_paths(size_names, base_repeats):
+    results = []
+    for size in size_names:
+        lines = SIZES[size]
+        resume = synthetic_resume(lines)
+        cover_letter = synthetic_cover_letter(max(1, lines // 10))
+        sections = list(app.parse_resume_sections(resume).values())
+        repeats = repeats_for(lines, base_repeats)
+        extra = {'lines': lines, 'input_bytes': len(resume.encode('utf-8'))}
+        
+        cases = [
+            ('parse_resume_sections', cold(lambda: app.parse_resume_sections(resume))),
+            ('format_section_content', lambda: [app.format_section_content(s) for s in sections]),
+            ('create_resume_html', cold(lambda: app.create_resume_html(resume, USER_DATA))),
+            ('create_docx_resume', cold(lambda: app.create_docx_resume(resume, USER_DATA))),
+            ('create_docx_cover_letter', lambda: app.create_docx_cover_letter(cover_letter, USER_DATA)),
+        ]
+        for name, fn in cases:
+            fn()  # warm-up
+            results.append(summarize(name, size, measure(fn, repeats), **extra))
+            print(f"  {name:<26}{size:<14}{results[-1]['median_ms']:>10.3f} ms", file=sys.stderr)
+    return results
+
+
+def _app_script(latency):
+    """Page script for AppTest: the real main() with a stub Groq client"""
+    import app
+    from benchmarks.stub_llm import StubGroqClient
+    
+    client = StubGroqClient(latency=latency)
+    app.get_groq_client = lambda: client
+    app.main()
+
+
+def _fill_form(at):
+    text_inputs = {
+        'Full Name*': USER_DATA['name'],
+        'Email*': USER_DATA['email'],
+        'Phone*': USER_DATA['phone'],
+        'Target Job Role*': USER_DATA['job_role'],
+        'Company Name': COMPANY_INFO['company_name'],
+    }
+    text_areas = {
+        'Address*': USER_DATA['address'],
+        'Education*': USER_DATA['education'],
+        'Work Experience*': USER_DATA['work_experience'],
+        'Skills*': USER_DATA['skills'],
+    }
+    for widget in at.sidebar.text_input:
+        if widget.label in text_inputs:
+            widget.input(text_inputs[widget.label])
+    for widget in at.sidebar.text_area:
+        if widget.label in text_areas:
+            widget.input(text_areas[widget.label])
+
+
+def _click(at, label):
+    next(button for button in at.button if button.label == label).click()
+
+
+def bench_end_to_end(latency, repeats):
+    from streamlit.testing.v1 import AppTest
+    
+    results = []
+    for stream in (False, True):
+        generate, rerun, both = [], [], []
+        for _ in range(repeats):
+            at = AppTest.from_function(_app_script, args=(latency,), default_timeout=60)
+            at.run()
+            _fill_form(at)
+            for checkbox in at.sidebar.checkbox:
+                if checkbox.label.startswith('Force regenerate'):
+                    checkbox.check()
+                elif checkbox.label.startswith('Stream output'):
+                    checkbox.set_value(stream)
+            at.run()
+            
+            _click(at, 'Generate Resume')
+            started = time.perf_counter()
+            at.run()
+            generate.append(time.perf_counter() - started)
+            assert not at.exception, at.exception
+            
+            # A plain rerun with the preview on screen, as on every sidebar keystroke
+            started = time.perf_counter()
+            at.run()
+            rerun.append(time.perf_counter() - started)
+            
+            _click(at, '⚡ Generate Resume & Cover Letter')
+            started = time.perf_counter()
+            at.run()
+            both.append(time.perf_counter() - started)
+        
+        extra = {'stub_latency_s': latency, 'stream': stream}
+        mode = 'stream' if stream else 'blocking'
+        results.append(summarize('e2e_generate_resume', mode, generate, **extra))
+        results.append(summarize('e2e_rerun_with_preview', mode, rerun, **extra))
+        results.append(summarize('e2e_generate_both', mode, both, **extra))
+        for result in results[-3:]:
+            print(f"  {result['name']:<26}{mode:<14}{result['median_ms']:>10.3f} ms", file=sys.stderr)
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Print ratios against a baseline file; return the regressed benchmarks"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['name'], r['size']): r for r in json.load(f)['results']}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['name'], result['size']))
+        if not previous or not previous['median_ms']:
+            continue
+        ratio = result['median_ms'] / previous['median_ms']
+        flag = ' REGRESSION' if ratio > threshold else ''
+        print(f"  {result['name']:<26}{result['size']:<14}{ratio:>8.2f}x{flag}", file=sys.stderr)
+        if flag:
+            regressions.append(result)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark parsing, rendering and an end-to-end app run.')
+    parser.add_argument('--sizes', default=','.join(SIZES), help=f"comma-separated subset of {', '.join(SIZES)}")
+    parser.add_argument('--repeats', type=int, default=20, help='repetitions for one-page inputs (scaled down for larger ones)')
+    parser.add_argument('--latency', type=float, default=0.2, help='stub LLM latency in seconds for the end-to-end scenario')
+    parser.add_argument('--e2e-repeats', type=int, default=3)
+    parser.add_argument('--skip-e2e', action='store_true')
+    parser.add_argument('--output', help='write JSON results here instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON results from an earlier run')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio counted as a regression')
+    args = parser.parse_args(argv)
+    
+    size_names = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = set(size_names) - set(SIZES)
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(sorted(unknown))}")
+    
+    print('Hot paths', file=sys.stderr)
+    results = bench_hot_paths(size_names, args.repeats)
+    if not args.skip_e2e:
+        print('End to end', file=sys.stderr)
+        results += bench_end_to_end(args.latency, args.e2e_repeats)
+    
+    report = json.dumps({'environment': environment(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    
+    if args.compare:
+        print(f'Compared with {args.compare}', file=sys.stderr)
+        if compare(results, args.compare, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
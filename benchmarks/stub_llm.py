@@ -0,0 +1,64 @@
+"""In-process stand-in for the Groq client with configurable latency"""
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.corpus import synthetic_cover_letter, synthetic_resume, synthetic_resume_json
+
+
+class StubCompletions:
+    """Answers chat.completions.create with canned text after a delay
+
+    ``latency`` is the time to the first token; streamed responses then
+    emit ``chunk_size`` characters every ``chunk_interval`` seconds.
+    """
+
+    def __init__(self, latency=0.0, resume_lines=40, chunk_size=16, chunk_interval=0.0):
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_interval = chunk_interval
+        self.resume_text = synthetic_resume(resume_lines)
+        self.resume_json = synthetic_resume_json(resume_lines)
+        self.cover_letter_text = synthetic_cover_letter(4)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, messages, model, temperature=None, max_tokens=None, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+        prompt = messages[-1]['content']
+        if 'cover letter' in prompt.lower():
+            text = self.cover_letter_text
+        elif kwargs.get('response_format'):
+            text = self.resume_json
+        else:
+            text = self.resume_text
+        usage = SimpleNamespace(
+            prompt_tokens=len(prompt) // 4,
+            completion_tokens=len(text) // 4,
+            total_tokens=(len(prompt) + len(text)) // 4,
+        )
+        time.sleep(self.latency)
+        if stream:
+            return self._stream(text, usage)
+        message = SimpleNamespace(role='assistant', content=text)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason='stop')],
+            usage=usage,
+        )
+
+    def _stream(self, text, usage):
+        for i in range(0, len(text), self.chunk_size):
+            if self.chunk_interval:
+                time.sleep(self.chunk_interval)
+            delta = SimpleNamespace(content=text[i:i + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)], x_groq=None)
+        yield SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=usage))
+
+
+class StubGroqClient:
+    """Drop-in replacement for groq.Groq in benchmarks"""
+
+    def __init__(self, **options):
+        self.chat = SimpleNamespace(completions=StubCompletions(**options))
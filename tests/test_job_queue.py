@@ -0,0 +1,151 @@
+"""Leases, retries and idempotency of the SQLite job queue"""
+from types import SimpleNamespace
+
+import pytest
+
+from utils import job_queue
+from utils.job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, make_idempotency_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(job_queue, 'time', SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / 'jobs.sqlite3'), lease_seconds=60, max_attempts=3, retry_delay=5.0)
+
+
+def test_claim_leases_the_oldest_job_once(queue, clock):
+    first = queue.enqueue('resume', {'n': 1})
+    clock.now += 1
+    queue.enqueue('resume', {'n': 2})
+
+    job = queue.claim()
+    assert job['id'] == first
+    assert job['status'] == RUNNING
+    assert job['attempts'] == 1
+    assert job['payload'] == {'n': 1}
+    assert queue.claim()['payload'] == {'n': 2}
+    assert queue.claim() is None
+
+
+def test_known_idempotency_key_returns_the_existing_job(queue):
+    key = make_idempotency_key('resume', {'name': 'Ada'})
+    job_id = queue.enqueue('resume', {'name': 'Ada'}, idempotency_key=key)
+
+    assert queue.enqueue('resume', {'name': 'Ada'}, idempotency_key=key) == job_id
+    assert queue.stats()[QUEUED] == 1
+
+
+def test_complete_stores_the_result(queue):
+    job_id = queue.enqueue('resume', {})
+    job = queue.claim()
+
+    queue.complete(job_id, job['lease_token'], {'content': 'text'})
+
+    job = queue.get(job_id)
+    assert job['status'] == DONE
+    assert job['result'] == {'content': 'text'}
+
+
+def test_extend_lease_needs_the_current_token(queue, clock):
+    job_id = queue.enqueue('resume', {})
+    job = queue.claim()
+
+    assert not queue.extend_lease(job_id, 'someone else')
+    clock.now += 50
+    assert queue.extend_lease(job_id, job['lease_token'])
+    # The lease now runs until 50 + 60 seconds from the claim
+    clock.now += 50
+    assert queue.claim() is None
+
+
+def test_failed_job_is_retried_with_backoff_then_given_up(queue, clock):
+    job_id = queue.enqueue('resume', {})
+
+    for delay in (5.0, 10.0):
+        job = queue.claim()
+        queue.fail(job_id, job['lease_token'], 'boom')
+        assert queue.get(job_id)['status'] == QUEUED
+        clock.now += delay - 1
+        assert queue.claim() is None
+        clock.now += 1
+
+    job = queue.claim()
+    assert job['attempts'] == 3
+    queue.fail(job_id, job['lease_token'], 'boom')
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['error'] == 'boom'
+
+
+def test_fail_with_a_stale_token_is_ignored(queue):
+    job_id = queue.enqueue('resume', {})
+    queue.claim()
+
+    queue.fail(job_id, 'stale', 'boom')
+
+    assert queue.get(job_id)['status'] == RUNNING
+
+
+def test_expired_lease_hands_the_job_out_again(queue, clock):
+    job_id = queue.enqueue('resume', {})
+    first = queue.claim()
+
+    clock.now += 61
+    second = queue.claim()
+
+    assert second['id'] == job_id
+    assert second['attempts'] == 2
+    assert second['lease_token'] != first['lease_token']
+    assert not queue.extend_lease(job_id, first['lease_token'])
+
+
+def test_lease_expiring_on_the_last_attempt_fails_the_job(queue, clock):
+    job_id = queue.enqueue('resume', {})
+    for _ in range(3):
+        assert queue.claim()['id'] == job_id
+        clock.now += 61
+
+    assert queue.claim() is None
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['attempts'] == 3
+    assert job['error']
+
+
+def test_stale_complete_writes_only_while_nobody_finished(queue, clock):
+    job_id = queue.enqueue('resume', {})
+    first = queue.claim()
+    clock.now += 61
+    second = queue.claim()
+
+    queue.complete(job_id, second['lease_token'], {'content': 'second'})
+    queue.complete(job_id, first['lease_token'], {'content': 'first'})
+    assert queue.get(job_id)['result'] == {'content': 'second'}
+
+    other_id = queue.enqueue('resume', {'n': 2})
+    first = queue.claim()
+    clock.now += 61
+    queue.claim()
+    queue.complete(other_id, first['lease_token'], {'content': 'first'})
+    assert queue.get(other_id)['status'] == DONE
+    assert queue.get(other_id)['result'] == {'content': 'first'}
+
+
+def test_failed_job_is_queued_again_under_its_idempotency_key(queue, clock):
+    key = make_idempotency_key('resume', {})
+    job_id = queue.enqueue('resume', {}, idempotency_key=key)
+    for _ in range(3):
+        queue.claim()
+        clock.now += 61
+    assert queue.claim() is None
+
+    assert queue.enqueue('resume', {}, idempotency_key=key) == job_id
+    job = queue.claim()
+    assert job['id'] == job_id
+    assert job['attempts'] == 1
@@ -0,0 +1,186 @@
+"""Circuit breaking, rate limiting and retries in the request layer"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils import resilience
+from utils.resilience import (
+    CircuitBreaker, CircuitOpenError, RateLimitTimeout, ResilientClient, TokenBucket
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f'status {status_code}')
+        self.status_code = status_code
+
+
+class ScriptedCompletions:
+    """Raises or returns the scripted outcomes in order, then succeeds"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else 'ok'
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_client(completions, **kwargs):
+    kwargs.setdefault('base_delay', 0)
+    return ResilientClient(SimpleNamespace(chat=SimpleNamespace(completions=completions)), **kwargs)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(resilience, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_half_open_breaker_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_the_breaker_again(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_released_probe_goes_to_the_next_caller(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.release()
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+
+
+def test_token_bucket_times_out_when_empty():
+    bucket = TokenBucket(rate_per_second=1, capacity=1)
+
+    assert bucket.acquire(timeout=0)
+    started = time.monotonic()
+    assert not bucket.acquire(timeout=0.05)
+    assert time.monotonic() - started >= 0.05
+    assert bucket.rejected == 1
+    assert bucket.waiting == 0
+
+
+def test_token_bucket_waits_for_a_refill():
+    bucket = TokenBucket(rate_per_second=50, capacity=1)
+
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=1)
+    assert bucket.rejected == 0
+
+
+def test_retryable_errors_are_retried():
+    completions = ScriptedCompletions(StatusError(503), StatusError(429))
+    client = make_client(completions, max_retries=3)
+
+    assert client.chat.completions.create(model='m') == 'ok'
+    assert completions.calls == 3
+    assert client.stats()['retries'] == 2
+    assert client.breaker_for('m').state == 'closed'
+
+
+def test_client_errors_are_raised_without_retrying_or_opening_the_breaker():
+    completions = ScriptedCompletions(*[StatusError(400)] * 10)
+    client = make_client(completions, max_retries=3)
+
+    for _ in range(10):
+        with pytest.raises(StatusError):
+            client.chat.completions.create(model='m')
+    assert completions.calls == 10
+    assert client.breaker_for('m').state == 'closed'
+
+
+def test_open_breaker_fails_fast_without_taking_a_token():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    completions = ScriptedCompletions()
+    client = make_client(completions, requests_per_minute=60, burst=1, queue_timeout=5, breaker=breaker)
+
+    started = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        client.chat.completions.create(model='m')
+    assert time.monotonic() - started < 1
+    assert client.bucket.available() >= 0.99
+    assert completions.calls == 0
+
+
+def test_rate_limit_timeout_gives_back_the_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    completions = ScriptedCompletions()
+    client = make_client(completions, requests_per_minute=6, burst=1, queue_timeout=0.01, breaker=breaker)
+    assert client.bucket.acquire(timeout=0)
+    time.sleep(0.02)
+
+    with pytest.raises(RateLimitTimeout):
+        client.chat.completions.create(model='m')
+    assert breaker.state == 'half_open'
+
+    client.bucket = None
+    assert client.chat.completions.create(model='m') == 'ok'
+    assert breaker.state == 'closed'
+
+
+def test_each_model_has_its_own_breaker():
+    completions = ScriptedCompletions(*[StatusError(503)] * 5)
+    client = make_client(completions, max_retries=0)
+
+    for _ in range(5):
+        with pytest.raises(StatusError):
+            client.chat.completions.create(model='slow')
+    assert client.breaker_for('slow').state == 'open'
+    assert client.chat.completions.create(model='fast') == 'ok'
+    with pytest.raises(CircuitOpenError):
+        client.chat.completions.create(model='slow')
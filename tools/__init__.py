@@ -0,0 +1 @@
+"""Development tools for running the app without the real Groq API"""
@@ -0,0 +1,245 @@
+"""Local stand-in for the Groq chat completions API
+
+Serves OpenAI-compatible ``/openai/v1/chat/completions`` responses (plain
+and streamed) with configurable latency and failure rate, so the batch CLI
+and other headless paths can be exercised without an API key:
+
+    python -m tools.fake_groq_server --port 8765 --latency 0.5
+    GROQ_API_KEY=test python batch.py people.csv --base-url http://127.0.0.1:8765
+
+With --certfile and --keyfile it serves HTTPS, and --connect-delay adds
+a pause before each new connection is served, standing in for the TCP and
+TLS round trips to a distant server, so connection reuse can be measured.
+"""
+import argparse
+import json
+import random
+import ssl
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESUME_TEXT = """PROFESSIONAL SUMMARY
+Results-driven professional with a track record of delivering measurable impact.
+
+EDUCATION
+Bachelor of Science, State University (2020)
+
+WORK EXPERIENCE
+Engineer, Example Corp (2020-2024)
+- Delivered features used by thousands of customers
+- Reduced operating costs by 20%
+
+SKILLS
+Python, SQL, Communication
+
+ADDITIONAL INFORMATION
+Certified Cloud Practitioner"""
+
+# Returned when the request asks for a JSON object (structured resume mode)
+RESUME_JSON = json.dumps({
+    'professional_summary': ['Results-driven professional with a track record of delivering measurable impact.'],
+    'education': ['Bachelor of Science, State University (2020)'],
+    'work_experience': [
+        'Engineer, Example Corp (2020-2024)',
+        '• Delivered features used by thousands of customers',
+        '• Reduced operating costs by 20%',
+    ],
+    'skills': ['Python, SQL, Communication'],
+    'additional_information': ['Certified Cloud Practitioner'],
+})
+
+COVER_LETTER_TEXT = """Dear Hiring Manager,
+
+I am excited to apply for this position. My experience and skills make me a strong fit for your team.
+
+Thank you for your consideration.
+
+Sincerely,
+Applicant"""
+
+
+def completion_text(prompt, json_mode=False):
+    """Pick canned output matching the kind of prompt"""
+    if 'cover letter' in prompt.lower():
+        return COVER_LETTER_TEXT
+    return RESUME_JSON if json_mode else RESUME_TEXT
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    fail_rate = 0.0
+    requests_served = 0
+    _counter_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/openai/v1/models':
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'llama3-8b-8192', 'object': 'model'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if self.path.rstrip('/') != '/openai/v1/chat/completions':
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+        
+        with self._counter_lock:
+            type(self).requests_served += 1
+        
+        if self.fail_rate and random.random() < self.fail_rate:
+            self._send_json(429, {'error': {'message': 'rate limited', 'type': 'rate_limit'}},
+                            headers={'Retry-After': '0.1'})
+            return
+        
+        time.sleep(self.latency)
+        prompt = body['messages'][-1]['content']
+        json_mode = (body.get('response_format') or {}).get('type') == 'json_object'
+        text = completion_text(prompt, json_mode)
+        model = body.get('model', 'llama3-8b-8192')
+        usage = {
+            'prompt_tokens': len(prompt) // 4,
+            'completion_tokens': len(text) // 4,
+            'total_tokens': (len(prompt) + len(text)) // 4,
+        }
+        if body.get('stream'):
+            self._send_stream(model, text, usage)
+        else:
+            self._send_json(200, {
+                'id': f'chatcmpl-{uuid.uuid4().hex}',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': text},
+                    'finish_reason': 'stop',
+                }],
+                'usage': usage,
+            })
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model, text, usage):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        completion_id = f'chatcmpl-{uuid.uuid4().hex}'
+        words = text.split(' ')
+        for i, word in enumerate(words):
+            delta = word if i == len(words) - 1 else word + ' '
+            self._write_event({
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': delta}, 'finish_reason': None}],
+            })
+        self._write_event({
+            'id': completion_id,
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+            'x_groq': {'usage': usage},
+        })
+        self._write_chunk(b'data: [DONE]\n\n')
+        self._write_chunk(b'')
+
+    def _write_event(self, payload):
+        self._write_chunk(f'data: {json.dumps(payload)}\n\n'.encode('utf-8'))
+
+    def _write_chunk(self, data):
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    """Counts connections, and optionally delays and TLS-wraps each one on its own thread"""
+    ssl_context = None
+    connect_delay = 0.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connections_opened = 0
+        self._connections_lock = threading.Lock()
+
+    def finish_request(self, request, client_address):
+        with self._connections_lock:
+            self.connections_opened += 1
+        time.sleep(self.connect_delay)
+        if self.ssl_context is None:
+            super().finish_request(request, client_address)
+            return
+        try:
+            request = self.ssl_context.wrap_socket(request, server_side=True)
+        except (ssl.SSLError, OSError):
+            return
+        try:
+            super().finish_request(request, client_address)
+        finally:
+            request.close()
+
+
+def start_server(host='127.0.0.1', port=0, latency=0.0, fail_rate=0.0, certfile=None, keyfile=None,
+                 connect_delay=0.0):
+    """Start the fake server on a background thread and return it
+
+    The bound address is ``server.server_address``; call ``server.shutdown()``
+    when done. With certfile (and keyfile, unless the certificate file holds
+    the key) it serves HTTPS; ``server.connections_opened`` counts connections.
+    """
+    handler = type('ConfiguredFakeGroqHandler', (FakeGroqHandler,), {
+        'latency': latency,
+        'fail_rate': fail_rate,
+    })
+    server = FakeGroqServer((host, port), handler)
+    server.connect_delay = connect_delay
+    if certfile:
+        server.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server.ssl_context.load_cert_chain(certfile, keyfile)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to wait before answering')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of requests answered with 429')
+    parser.add_argument('--certfile', help='serve HTTPS with this certificate (PEM)')
+    parser.add_argument('--keyfile', help="the certificate's private key, if not in --certfile")
+    parser.add_argument('--connect-delay', type=float, default=0.0,
+                        help='seconds to wait before serving each new connection')
+    args = parser.parse_args()
+    
+    server = start_server(args.host, args.port, args.latency, args.fail_rate, args.certfile, args.keyfile,
+                          args.connect_delay)
+    scheme = 'https' if args.certfile else 'http'
+    print(f"Fake Groq API listening on {scheme}://{args.host}:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Resume & cover letter generation helpers"""
@@ -0,0 +1,265 @@
+"""Process-wide store for generated artifacts, shared by every session
+
+Values (text, bytes, or JSON-compatible objects such as user_data) are
+keyed by a hash of their content, so identical artifacts from different
+sessions are kept once and sessions only hold the short handle. Entries
+are zlib-compressed when that pays off and evicted least recently used
+beyond a global memory cap; with a spill directory, evicted entries are
+written to disk and read back on their next use instead of being lost.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+
+# Rough bookkeeping cost per entry, for the memory cap
+_ENTRY_OVERHEAD = 200
+
+# Stored encodings: text, raw bytes and JSON
+_TEXT, _BYTES, _JSON = b't', b'b', b'j'
+
+
+def encode_value(value):
+    """Return (kind, payload bytes) for a str, bytes or JSON-compatible value"""
+    if isinstance(value, str):
+        return _TEXT, value.encode('utf-8')
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _BYTES, bytes(value)
+    # Sorted keys, so equal objects hash alike
+    return _JSON, json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def decode_value(kind, payload):
+    if kind == _TEXT:
+        return payload.decode('utf-8')
+    if kind == _BYTES:
+        return payload
+    return json.loads(payload)
+
+
+class ArtifactStore:
+    """Thread-safe, memory-bounded, content-addressed artifact store
+
+    put() returns a handle (a hex digest) that get() turns back into an
+    equal value; tuples come back as lists. Payloads of at least
+    ``compress_min`` bytes are compressed unless that saves under a tenth,
+    as with already-zipped DOCX files. Beyond ``max_bytes`` in memory the
+    least recently used entries are evicted, to ``spill_dir`` when given,
+    which is itself capped at ``max_spill_bytes``.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, spill_dir=None, max_spill_bytes=1024 * 1024 * 1024,
+                 compress_min=512, compress_level=6):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.compress_min = compress_min
+        self.compress_level = compress_level
+        self._entries = OrderedDict()
+        self._spilled = OrderedDict()
+        self._spilling = {}
+        self._bytes = 0
+        self._raw_bytes = 0
+        self._spilled_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'puts': 0, 'deduplicated': 0, 'hits': 0, 'disk_hits': 0, 'misses': 0,
+                          'evictions': 0, 'spills': 0}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._index_spill_dir()
+
+    def put(self, value):
+        """Store value and return its handle; storing an equal value again costs nothing"""
+        kind, payload = encode_value(value)
+        handle = hashlib.sha256(kind + payload).hexdigest()
+        with self._lock:
+            self._counters['puts'] += 1
+            if handle in self._entries:
+                self._entries.move_to_end(handle)
+                self._counters['deduplicated'] += 1
+                return handle
+
+        # Compress outside the lock; a concurrent duplicate put is harmless
+        compressed = False
+        blob = payload
+        if len(payload) >= self.compress_min:
+            packed = zlib.compress(payload, self.compress_level)
+            if len(packed) < len(payload) * 0.9:
+                blob, compressed = packed, True
+        evicted = []
+        with self._lock:
+            if handle not in self._entries:
+                evicted = self._insert(handle, kind, compressed, blob, len(payload))
+            self._entries.move_to_end(handle)
+        self._spill(evicted)
+        return handle
+
+    def get(self, handle, default=None):
+        """Return the value stored under handle, or default if it is gone"""
+        with self._lock:
+            entry = self._entries.get(handle) or self._spilling.get(handle)
+            if entry is not None:
+                if handle in self._entries:
+                    self._entries.move_to_end(handle)
+                self._counters['hits'] += 1
+            spilled = entry is None and handle in self._spilled
+        if entry is not None:
+            kind, compressed, blob, _ = entry
+            return decode_value(kind, zlib.decompress(blob) if compressed else blob)
+        
+        # Disk reads happen outside the lock, so other sessions don't wait on them
+        read = self._read_spilled(handle) if spilled else None
+        evicted = []
+        with self._lock:
+            if read is None:
+                if spilled:
+                    self._unindex_spilled(handle)
+                self._counters['misses'] += 1
+            else:
+                self._counters['disk_hits'] += 1
+                if handle not in self._entries:
+                    evicted = self._insert(handle, *read[0])
+        if read is None:
+            # Missing or damaged, e.g. truncated: gone, like an entry evicted without a spill
+            if spilled:
+                self._remove_file(handle)
+            return default
+        self._spill(evicted)
+        (kind, _, _, _), raw = read
+        return decode_value(kind, raw)
+
+    def __contains__(self, handle):
+        with self._lock:
+            return handle in self._entries or handle in self._spilled
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return counters, entry counts and bytes held in memory (stored and uncompressed) and on disk"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            stats['memory_bytes'] = self._bytes
+            stats['raw_bytes'] = self._raw_bytes
+            stats['max_bytes'] = self.max_bytes
+            stats['spilled_entries'] = len(self._spilled)
+            stats['spilled_bytes'] = self._spilled_bytes
+        return stats
+
+    def _insert(self, handle, kind, compressed, blob, raw_size):
+        """Add an entry and evict beyond the cap; returns the evicted entries for _spill
+
+        A spilled entry read back keeps its file, so evicting it again costs no write.
+        """
+        self._entries[handle] = (kind, compressed, blob, raw_size)
+        self._bytes += len(blob) + _ENTRY_OVERHEAD
+        self._raw_bytes += raw_size
+        evicted = []
+        # The newest entry always stays, even when it alone is over the cap
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            old_handle, old_entry = self._entries.popitem(last=False)
+            self._bytes -= len(old_entry[2]) + _ENTRY_OVERHEAD
+            self._raw_bytes -= old_entry[3]
+            self._counters['evictions'] += 1
+            if self.spill_dir:
+                # Still served from memory until the file is written
+                self._spilling[old_handle] = old_entry
+                evicted.append((old_handle, old_entry))
+        return evicted
+
+    def _spill(self, evicted):
+        """Write evicted entries to the spill directory; call without holding the lock"""
+        for handle, (kind, compressed, blob, _) in evicted:
+            size = len(blob) + 2
+            with self._lock:
+                written = handle in self._spilled
+                if written:
+                    self._spilled.move_to_end(handle)
+            if not written and size <= self.max_spill_bytes:
+                written = self._write_spilled(handle, kind + (b'z' if compressed else b'-') + blob)
+            removed = []
+            with self._lock:
+                self._spilling.pop(handle, None)
+                if written and handle not in self._spilled:
+                    self._spilled[handle] = size
+                    self._spilled_bytes += size
+                    self._counters['spills'] += 1
+                while self._spilled_bytes > self.max_spill_bytes:
+                    removed.append(next(iter(self._spilled)))
+                    self._unindex_spilled(removed[-1])
+            for old_handle in removed:
+                self._remove_file(old_handle)
+
+    def _write_spilled(self, handle, data):
+        # Write then rename, so a crash never leaves a truncated file under a valid name
+        fd, temp_path = tempfile.mkstemp(dir=self.spill_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self._path(handle))
+        except OSError:
+            # Spilling is best effort; the entry is simply gone
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def _read_spilled(self, handle):
+        """Return (entry, raw payload) from a spilled file, or None if it is gone or damaged"""
+        try:
+            with open(self._path(handle), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        kind, flag, blob = data[:1], data[1:2], data[2:]
+        compressed = flag == b'z'
+        try:
+            raw = zlib.decompress(blob) if compressed else blob
+        except zlib.error:
+            return None
+        # Content addressing doubles as an integrity check
+        if hashlib.sha256(kind + raw).hexdigest() != handle:
+            return None
+        return (kind, compressed, blob, len(raw)), raw
+
+    def _unindex_spilled(self, handle):
+        self._spilled_bytes -= self._spilled.pop(handle, 0)
+
+    def _remove_file(self, handle):
+        try:
+            os.remove(self._path(handle))
+        except OSError:
+            pass
+
+    def _index_spill_dir(self):
+        # Files left by an earlier process are still valid, since names are content hashes
+        files = []
+        for name in os.listdir(self.spill_dir):
+            path = os.path.join(self.spill_dir, name)
+            if name.endswith('.tmp'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            elif len(name) == 64:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._spilled[name] = size
+            self._spilled_bytes += size
+        while self._spilled_bytes > self.max_spill_bytes:
+            handle = next(iter(self._spilled))
+            self._unindex_spilled(handle)
+            self._remove_file(handle)
+
+    def _path(self, handle):
+        return os.path.join(self.spill_dir, handle)
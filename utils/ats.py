@@ -0,0 +1,170 @@
+"""Local ATS-style keyword matching of resumes against job descriptions
+
+A job's keywords are its terms weighted by TF-IDF over the postings being
+scored (sublinear term frequency, smoothed inverse document frequency),
+normalized to sum to one. A resume's score for a job is the share of that
+weight its own terms cover, from 0 (no keyword present) to 1 (all of
+them). Whole resume × job matrices are computed in batches of dense
+blocks restricted to terms that occur on both sides, so the work is a
+series of matrix products.
+"""
+import re
+from collections import Counter
+
+import numpy as np
+
+from utils.document import parse_document
+
+# Words that say nothing about fit: English function words and posting boilerplate
+STOPWORDS = frozenset('''
+a about above after again all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each etc few for from further had has have having he
+her here hers him his how i if in into is it its itself just me more most must my no nor not now of off
+on once only or other our ours out over own per same she should so some such than that the their them
+then there these they this those through to too under until up us very via was we were what when where
+which while who whom why will with within without would you your yours
+ability able apply applicant applicants candidate candidates company day description duties employer
+equal etc excellent experience familiarity good great ideal including job join knowledge looking new
+opportunity plus position preferred qualifications related requirements required responsibilities role
+seeking skills strong team using well work working year years
+'''.split())
+
+# Single letters that are terms in their own right (programming languages)
+SHORT_TERMS = frozenset({'c', 'r'})
+
+# Letters and digits, keeping the joiners of terms like c++, c#, node.js, ci/cd and front-end
+_TERM = re.compile(r'[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*')
+
+
+def tokenize(text):
+    """Return the keyword terms of text, lowercased, without stopwords or bare numbers"""
+    return [
+        term for term in _TERM.findall(text.casefold())
+        if (len(term) > 1 or term in SHORT_TERMS) and term not in STOPWORDS and not term.isdigit()
+    ]
+
+
+def resume_text(user_data, resume_content=None, document=None):
+    """Text a resume is scored on: skills, work experience and the body of each parsed section
+
+    Section titles are left out so headers like "SKILLS" never count as keywords.
+    """
+    parts = [user_data.get('skills') or '', user_data.get('work_experience') or '']
+    if document is None and resume_content:
+        document = parse_document(resume_content)
+    if document is not None:
+        parts.extend(line for section in document.sections for line in section.lines)
+    return '\n'.join(parts)
+
+
+class AtsScorer:
+    """Keyword weights for a set of job descriptions, and resume scoring against them"""
+
+    def __init__(self, job_descriptions):
+        self.vocabulary = {}
+        counts = []
+        for text in job_descriptions:
+            terms = Counter(tokenize(text))
+            counts.append({self.vocabulary.setdefault(term, len(self.vocabulary)): tf for term, tf in terms.items()})
+        self.terms = list(self.vocabulary)
+        self.job_count = len(counts)
+
+        # Sparse rows: job i's term ids are indices[indptr[i]:indptr[i + 1]], heaviest first
+        lengths = np.fromiter((len(row) for row in counts), dtype=np.int64, count=len(counts))
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.indices = np.fromiter((t for row in counts for t in row), dtype=np.int64, count=int(self.indptr[-1]))
+        tf = np.fromiter((n for row in counts for n in row.values()), dtype=np.float64, count=len(self.indices))
+
+        document_frequency = np.bincount(self.indices, minlength=len(self.terms))
+        self.idf = np.log((1 + self.job_count) / (1 + document_frequency)) + 1
+        weights = (1 + np.log(tf)) * self.idf[self.indices]
+        rows = np.repeat(np.arange(self.job_count), lengths)
+        totals = np.bincount(rows, weights=weights, minlength=self.job_count)
+        weights /= np.where(totals > 0, totals, 1)[rows]
+
+        order = np.lexsort((-weights, rows))
+        self.indices = self.indices[order]
+        self.weights = weights[order].astype(np.float32)
+
+    def encode(self, texts):
+        """Return the resumes' known term ids as sparse rows (indptr, indices)
+
+        Terms no job mentions can't affect any score and are dropped.
+        """
+        rows = [
+            sorted({self.vocabulary[term] for term in tokenize(text) if term in self.vocabulary})
+            for text in texts
+        ]
+        lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        indices = np.fromiter((t for row in rows for t in row), dtype=np.int64, count=int(indptr[-1]))
+        return indptr, indices
+
+    def score(self, encoded, batch_size=512):
+        """Return the (resumes × jobs) float32 matrix of keyword coverage scores
+
+        encoded is the output of encode(); blocks of batch_size resumes and
+        jobs are multiplied at a time.
+        """
+        indptr, indices = encoded
+        resume_count = len(indptr) - 1
+        scores = np.zeros((resume_count, self.job_count), dtype=np.float32)
+        # Only terms on both sides add to a dot product; the rest would be zero columns
+        shared = np.intersect1d(np.unique(indices), np.unique(self.indices))
+        if not len(shared) or not resume_count:
+            return scores
+        column = np.full(len(self.terms), -1, dtype=np.int64)
+        column[shared] = np.arange(len(shared))
+
+        job_columns = column[self.indices]
+        job_rows = np.repeat(np.arange(self.job_count), np.diff(self.indptr))
+        keep = job_columns >= 0
+        resume_columns = column[indices]
+        resume_rows = np.repeat(np.arange(resume_count), np.diff(indptr))
+        for job_start in range(0, self.job_count, batch_size):
+            job_end = min(job_start + batch_size, self.job_count)
+            block = self._dense_block(job_rows, job_columns, self.weights, keep, job_start, job_end, len(shared))
+            for start in range(0, resume_count, batch_size):
+                end = min(start + batch_size, resume_count)
+                present = self._dense_block(resume_rows, resume_columns, None, resume_columns >= 0,
+                                            start, end, len(shared))
+                scores[start:end, job_start:job_end] = present @ block.T
+        return scores
+
+    def keyword_report(self, resume_terms, job, limit=10):
+        """Return (matched, missing) keywords of one job, heaviest first, up to limit each
+
+        resume_terms is a resume text or a collection of its term ids.
+        """
+        if isinstance(resume_terms, str):
+            resume_terms = {self.vocabulary[term] for term in tokenize(resume_terms) if term in self.vocabulary}
+        matched, missing = [], []
+        for term_id in self.indices[self.indptr[job]:self.indptr[job + 1]]:
+            bucket = matched if term_id in resume_terms else missing
+            if len(bucket) < limit:
+                bucket.append(self.terms[term_id])
+            if len(matched) >= limit and len(missing) >= limit:
+                break
+        return matched, missing
+
+    @staticmethod
+    def _dense_block(rows, columns, values, keep, start, end, width):
+        # Rows are sorted, so a row range is a contiguous slice of the sparse entries
+        lo, hi = np.searchsorted(rows, (start, end))
+        mask = keep[lo:hi]
+        block = np.zeros((end - start, width), dtype=np.float32)
+        block[rows[lo:hi][mask] - start, columns[lo:hi][mask]] = 1.0 if values is None else values[lo:hi][mask]
+        return block
+
+
+def score_pair(resume, job_description, limit=10):
+    """Score one resume text against one job description
+
+    Returns (score, matched keywords, missing keywords). With a single
+    posting every term is equally rare, so weights come from term
+    frequency alone.
+    """
+    scorer = AtsScorer([job_description])
+    score = float(scorer.score(scorer.encode([resume]))[0, 0])
+    matched, missing = scorer.keyword_report(resume, 0, limit)
+    return score, matched, missing
@@ -0,0 +1,78 @@
+"""API client built on a background thread so startup never waits for it
+
+The SDK import, client construction and an optional warm-up call (which
+opens the TLS connection) run off the calling thread once start() is
+called, e.g. after the first page has rendered. Attribute access starts
+setup if needed and blocks only until the client exists.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredClient:
+    """Proxy for the client returned by factory(), built in the background
+
+    ``warm_up(client)`` runs after construction; its failures are logged
+    and otherwise ignored, since real calls will retry the connection.
+    A failing factory re-raises its error on every use.
+    """
+
+    def __init__(self, factory, warm_up=None):
+        self._factory = factory
+        self._warm_up = warm_up
+        self._client = None
+        self._error = None
+        self._ready = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.setup_seconds = None
+        self.warm_up_seconds = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        """Begin setup on a background thread; later calls do nothing"""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._build, name='client-setup', daemon=True).start()
+
+    def get(self, timeout=None):
+        """Return the client, starting setup if needed and waiting for it to finish"""
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError('client setup did not finish in time')
+        if self._error is not None:
+            raise self._error
+        return self._client
+
+    def __getattr__(self, name):
+        # Only reached for attributes not set in __init__, i.e. the client's own API
+        return getattr(self.get(), name)
+
+    def _build(self):
+        started = time.perf_counter()
+        try:
+            self._client = self._factory()
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self.setup_seconds = time.perf_counter() - started
+        # Calls may start now; warming up only saves the first one a handshake
+        self._ready.set()
+
+        if self._warm_up is not None:
+            started = time.perf_counter()
+            try:
+                self._warm_up(self._client)
+            except Exception as e:
+                logger.info('client warm-up failed: %s', e)
+            else:
+                self.warm_up_seconds = time.perf_counter() - started
@@ -0,0 +1,201 @@
+"""Single-pass parser turning generated resume text into a document tree"""
+import re
+from dataclasses import dataclass
+
+# Header keywords in priority order; the first one found in a header line names the section
+SECTION_KEYWORDS = (
+    'PROFESSIONAL SUMMARY', 'SUMMARY', 'PROFILE',
+    'EDUCATION', 'ACADEMIC BACKGROUND',
+    'WORK EXPERIENCE', 'EXPERIENCE', 'EMPLOYMENT', 'PROFESSIONAL EXPERIENCE',
+    'SKILLS', 'TECHNICAL SKILLS', 'CORE COMPETENCIES',
+    'ADDITIONAL INFORMATION', 'CERTIFICATIONS', 'PROJECTS', 'ACHIEVEMENTS'
+)
+
+# Lines longer than this are body text even if they mention a keyword
+MAX_HEADER_LENGTH = 50
+
+BULLET_MARKERS = '•-*▪◦'
+
+_KEYWORD_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in SECTION_KEYWORDS))
+_BULLET_PATTERN = re.compile(r'[•\-*▪◦]|[1-9]\.')
+
+
+@dataclass(frozen=True)
+class Paragraph:
+    """Consecutive body lines joined into one paragraph"""
+    text: str
+
+
+@dataclass(frozen=True)
+class BulletList:
+    """Bullet or numbered items with their markers removed"""
+    items: tuple
+
+
+@dataclass(frozen=True)
+class Section:
+    """A titled resume section with its raw lines and parsed blocks"""
+    title: str
+    lines: tuple
+    blocks: tuple
+
+    @property
+    def content(self):
+        return '\n'.join(self.lines)
+
+
+@dataclass(frozen=True)
+class ResumeDocument:
+    """Ordered sections of a generated resume"""
+    sections: tuple
+
+    def as_dict(self):
+        """Return {section title: section text}, as parse_resume_sections does"""
+        return {section.title: section.content for section in self.sections}
+
+    def as_text(self):
+        """Return canonical resume text: each title on its own line, then its lines"""
+        return '\n\n'.join(section.title + '\n' + section.content for section in self.sections)
+
+    def as_section_lines(self):
+        """Return [[title, lines]], JSON-compatible; document_from_section_lines rebuilds the document"""
+        return [[section.title, list(section.lines)] for section in self.sections]
+
+
+def match_section_header(line):
+    """Return the section keyword a stripped line introduces, or None"""
+    if len(line) > MAX_HEADER_LENGTH:
+        return None
+    upper = line.upper()
+    if _KEYWORD_PATTERN.search(upper) is None:
+        return None
+    # Rare path: resolve overlapping keywords by priority, not position
+    for keyword in SECTION_KEYWORDS:
+        if keyword in upper:
+            return keyword
+    return None
+
+
+def parse_blocks(lines):
+    """Group lines into paragraphs and bullet lists
+
+    Blank lines end a paragraph but not a bullet list; a body line after
+    bullets closes the list.
+    """
+    blocks = []
+    paragraph = []
+    items = None
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if paragraph:
+                blocks.append(Paragraph(' '.join(paragraph)))
+                paragraph = []
+            continue
+        
+        if _BULLET_PATTERN.match(line):
+            if paragraph:
+                blocks.append(Paragraph(' '.join(paragraph)))
+                paragraph = []
+            if items is None:
+                items = []
+            items.append(line[1:].strip() if line[0] in BULLET_MARKERS else line[2:].strip())
+        else:
+            if items is not None:
+                blocks.append(BulletList(tuple(items)))
+                items = None
+            paragraph.append(line)
+    
+    if paragraph:
+        blocks.append(Paragraph(' '.join(paragraph)))
+    if items is not None:
+        blocks.append(BulletList(tuple(items)))
+    return tuple(blocks)
+
+
+def split_sections(resume_content, match_header=match_section_header):
+    """Return {section title: [lines]} for resume text, in order of first appearance
+
+    match_header(stripped line) returns the title a header line introduces, or None.
+    """
+    # Repeated titles replace earlier content but keep their first position
+    section_lines = {}
+    current_section = None
+    current_lines = []
+    
+    for line in resume_content.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        
+        keyword = match_header(line)
+        if keyword is not None:
+            if current_section:
+                section_lines[current_section] = current_lines
+            current_section = keyword
+            current_lines = []
+        elif current_section:
+            current_lines.append(line)
+    
+    # The last section is only kept when it has content
+    if current_section and current_lines:
+        section_lines[current_section] = current_lines
+    return section_lines
+
+
+def parse_document(resume_content):
+    """Parse generated resume text into a ResumeDocument in one pass"""
+    return ResumeDocument(tuple(
+        Section(title, tuple(lines), parse_blocks(lines))
+        for title, lines in split_sections(resume_content).items()
+    ))
+
+
+def reparse_document(previous, resume_content):
+    """Parse edited resume text against the document it was edited from
+
+    Returns (document, titles of new or changed sections). Only lines that
+    are exactly a title, of the previous document or a section keyword
+    (ignoring case and markdown marks), start a section; body lines that
+    merely mention a keyword, like "Education Technology Lead", stay where
+    they are. Sections whose title and lines are unchanged are the previous
+    document's own objects, so anything cached per section stays valid;
+    only the others are parsed into blocks.
+    """
+    previous_sections = {section.title: section for section in previous.sections}
+    titles = {title.upper(): title for title in (*SECTION_KEYWORDS, *previous_sections)}
+    
+    def match_title(line):
+        return titles.get(line.strip('*#: ').upper())
+    
+    sections = []
+    changed = []
+    for title, lines in split_sections(resume_content, match_title).items():
+        lines = tuple(lines)
+        section = previous_sections.get(title)
+        if section is None or section.lines != lines:
+            section = Section(title, lines, parse_blocks(lines))
+            changed.append(title)
+        sections.append(section)
+    return ResumeDocument(tuple(sections)), changed
+
+
+def document_from_section_lines(section_lines):
+    """Rebuild a ResumeDocument from ResumeDocument.as_section_lines() output"""
+    return ResumeDocument(tuple(
+        Section(title, tuple(lines), parse_blocks(lines))
+        for title, lines in section_lines
+    ))
+
+
+def replace_section(document, title, lines):
+    """Return a copy of document with the lines of one section replaced
+
+    Other sections are reused as-is, so anything cached per section stays valid.
+    """
+    lines = tuple(lines)
+    return ResumeDocument(tuple(
+        Section(title, lines, parse_blocks(lines)) if section.title == title else section
+        for section in document.sections
+    ))
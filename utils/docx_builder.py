@@ -0,0 +1,143 @@
+"""Fast .docx assembly from a template loaded once per process"""
+import functools
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+DOCUMENT_PART = 'word/document.xml'
+
+# Paragraph styles resolved to their ids once, instead of by name per paragraph
+STYLE_NAMES = ('Title', 'Heading 1', 'Heading 2', 'Heading 3', 'List Bullet', 'List Number')
+
+ALIGNMENTS = {'left': 'left', 'center': 'center', 'right': 'right', 'justify': 'both'}
+
+# Characters XML 1.0 cannot carry; python-docx would raise on them
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f￾￿]')
+_RUN_SPECIALS = re.compile(r'([\t\n\r])')
+
+
+class DocxSkeleton:
+    """The default template with margins applied, pre-serialized for cloning
+
+    Every part except the main document is kept as ready-to-zip bytes; the
+    document part is split around the body so each build only has to
+    supply its paragraphs.
+    """
+
+    def __init__(self, margin_inches=None):
+        # python-docx is only needed to build the skeleton; importing it here keeps app startup light
+        from docx import Document
+        from docx.opc.oxml import serialize_part_xml
+        from docx.shared import Inches
+        
+        doc = Document()
+        if margin_inches is not None:
+            for section in doc.sections:
+                section.top_margin = Inches(margin_inches)
+                section.bottom_margin = Inches(margin_inches)
+                section.left_margin = Inches(margin_inches)
+                section.right_margin = Inches(margin_inches)
+        self.style_ids = {name: doc.styles[name].style_id for name in STYLE_NAMES}
+        
+        document_xml = serialize_part_xml(doc.element)
+        split_at = document_xml.rindex(b'<w:sectPr')
+        self._head = document_xml[:split_at]
+        self._tail = document_xml[split_at:]
+        
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        with zipfile.ZipFile(buffer) as package:
+            self._entries = [
+                (info.filename, package.read(info))
+                for info in package.infolist()
+                if info.filename != DOCUMENT_PART
+            ]
+        self._archives = {}
+
+    def save(self, body_xml, compression=zipfile.ZIP_DEFLATED, compresslevel=None):
+        """Zip the template parts around the given body XML into a BytesIO"""
+        document_xml = self._head + body_xml.encode('utf-8') + self._tail
+        # The other parts (mostly styles, some 800 KB) were compressed once; only the body is added
+        buffer = io.BytesIO(self._static_archive(compression, compresslevel))
+        with zipfile.ZipFile(buffer, 'a', compression, compresslevel=compresslevel) as package:
+            package.writestr(DOCUMENT_PART, document_xml)
+        buffer.seek(0)
+        return buffer
+
+    def _static_archive(self, compression, compresslevel):
+        archive = self._archives.get((compression, compresslevel))
+        if archive is None:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w', compression, compresslevel=compresslevel) as package:
+                for name, data in self._entries:
+                    package.writestr(name, data)
+            # A concurrent first build for the same settings is harmless
+            archive = self._archives[(compression, compresslevel)] = buffer.getvalue()
+        return archive
+
+
+@functools.lru_cache(maxsize=None)
+def get_skeleton(margin_inches=None):
+    """Return the shared skeleton for a margin setting, building it on first use"""
+    return DocxSkeleton(margin_inches)
+
+
+def run_xml(text):
+    """Serialize text as a run, turning tabs and line breaks into w:tab/w:br"""
+    parts = ['<w:r>']
+    for piece in _RUN_SPECIALS.split(_INVALID_XML_CHARS.sub('', text)):
+        if not piece:
+            continue
+        if piece == '\t':
+            parts.append('<w:tab/>')
+        elif piece in '\n\r':
+            parts.append('<w:br/>')
+        elif piece[0].isspace() or piece[-1].isspace():
+            parts.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+        else:
+            parts.append(f'<w:t>{escape(piece)}</w:t>')
+    parts.append('</w:r>')
+    return ''.join(parts)
+
+
+class DocxBuilder:
+    """Collects paragraphs as XML and writes them into a cloned skeleton in bulk"""
+
+    def __init__(self, skeleton):
+        self.skeleton = skeleton
+        self._paragraphs = []
+
+    def paragraph(self, text='', style=None, align=None):
+        properties = ''
+        if style is not None:
+            properties += f'<w:pStyle w:val="{self.skeleton.style_ids[style]}"/>'
+        if align is not None:
+            properties += f'<w:jc w:val="{ALIGNMENTS[align]}"/>'
+        if not properties and not text:
+            self._paragraphs.append('<w:p/>')
+            return
+        self._paragraphs.append(
+            '<w:p>'
+            + (f'<w:pPr>{properties}</w:pPr>' if properties else '')
+            + (run_xml(text) if text else '')
+            + '</w:p>'
+        )
+
+    def heading(self, text, level=1, align=None):
+        self.paragraph(text, style='Title' if level == 0 else f'Heading {level}', align=align)
+
+    def bullet(self, text):
+        self.paragraph(text, style='List Bullet')
+
+    def extend_xml(self, body_xml):
+        """Append paragraphs serialized earlier by body_xml(), e.g. a cached section"""
+        self._paragraphs.append(body_xml)
+
+    def body_xml(self):
+        """Return the paragraphs collected so far as XML"""
+        return ''.join(self._paragraphs)
+
+    def save(self, compression=zipfile.ZIP_DEFLATED, compresslevel=None):
+        """Return the finished document as a BytesIO"""
+        return self.skeleton.save(self.body_xml(), compression, compresslevel)
@@ -0,0 +1,157 @@
+"""Content-addressed cache for LLM generations"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(prompt, model, temperature, max_tokens):
+    """Hash everything that determines a completion into a cache key"""
+    payload = json.dumps(
+        [prompt, model, temperature, max_tokens],
+        ensure_ascii=False,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class GenerationCache:
+    """Two-tier (memory LRU + SQLite) cache of generated text
+
+    Entries expire after ``ttl_seconds``. The memory tier holds at most
+    ``max_memory_entries`` items; the disk tier is trimmed by least recent
+    access once it exceeds ``max_disk_entries`` or ``max_disk_bytes``.
+    """
+
+    def __init__(self, path, max_memory_entries=128, max_disk_entries=5000,
+                 max_disk_bytes=50 * 1024 * 1024, ttl_seconds=7 * 24 * 3600):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS generations (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_generations_accessed ON generations (accessed_at)")
+        self._db.commit()
+
+    def get(self, key):
+        """Return the cached text for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                content, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return content
+                del self._memory[key]
+            
+            row = self._db.execute(
+                "SELECT content, created_at FROM generations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] <= self.ttl_seconds:
+                self._db.execute("UPDATE generations SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                self._remember(key, row[0], row[1])
+                self._counters['disk_hits'] += 1
+                return row[0]
+            
+            self._counters['misses'] += 1
+            return None
+
+    def __contains__(self, key):
+        """Whether key has an unexpired entry; unlike get, not counted as a lookup"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] <= self.ttl_seconds:
+                return True
+            row = self._db.execute("SELECT created_at FROM generations WHERE key = ?", (key,)).fetchone()
+        return row is not None and now - row[0] <= self.ttl_seconds
+
+    def set(self, key, content):
+        """Store generated text under key in both tiers"""
+        now = time.time()
+        size = len(content.encode('utf-8'))
+        with self._lock:
+            self._remember(key, content, now)
+            self._db.execute(
+                "INSERT OR REPLACE INTO generations (key, content, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, content, size, now, now)
+            )
+            self._evict(now)
+            self._db.commit()
+            self._counters['writes'] += 1
+
+    def clear(self):
+        """Drop every cached generation"""
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM generations")
+            self._db.commit()
+
+    def stats(self):
+        """Return hit/miss counters and current tier sizes"""
+        with self._lock:
+            count, total_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM generations"
+            ).fetchone()
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+            stats['disk_entries'] = count
+            stats['disk_bytes'] = total_bytes
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key, content, created_at):
+        self._memory[key] = (content, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now):
+        # Expired entries first, then least recently used until under both limits
+        removed = self._db.execute(
+            "DELETE FROM generations WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        count, total_bytes = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM generations"
+        ).fetchone()
+        if count <= self.max_disk_entries and total_bytes <= self.max_disk_bytes:
+            self._counters['evictions'] += removed
+            return
+        
+        victims = []
+        rows = self._db.execute("SELECT key, size FROM generations ORDER BY accessed_at ASC")
+        for key, size in rows:
+            if count <= self.max_disk_entries and total_bytes <= self.max_disk_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total_bytes -= size
+        self._db.executemany("DELETE FROM generations WHERE key = ?", victims)
+        for (key,) in victims:
+            self._memory.pop(key, None)
+        self._counters['evictions'] += removed + len(victims)
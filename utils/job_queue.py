@@ -0,0 +1,285 @@
+"""Durable SQLite job queue with leases, retries and idempotency keys
+
+A job is claimed by a worker under a lease. If the worker dies (process
+restart, crash) the lease runs out and the job is handed out again, so
+every job runs at least once; handlers must tolerate running twice.
+Enqueueing with an idempotency key that is already known returns the
+existing job instead of adding another one.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def make_idempotency_key(kind, payload):
+    """Hash a job kind and its JSON payload into an idempotency key"""
+    data = json.dumps([kind, payload], ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class JobQueue:
+    """Jobs stored in SQLite so they survive restarts of the process that queued them
+
+    Claimed jobs are leased for ``lease_seconds``; workers extend the lease
+    while they run. A failed job is retried after ``retry_delay`` seconds
+    (doubling each time) until it has been attempted ``max_attempts`` times.
+    Finished jobs are deleted ``retention_seconds`` after they finish.
+    """
+
+    def __init__(self, path, lease_seconds=60, max_attempts=3, retry_delay=5.0,
+                 retention_seconds=7 * 24 * 3600):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode, so claims can take the write lock up front with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                idempotency_key TEXT UNIQUE,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                lease_until REAL,
+                lease_token TEXT,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, available_at)")
+
+    def enqueue(self, kind, payload, idempotency_key=None):
+        """Add a job and return its id; a known idempotency key returns the existing job
+
+        A job that already failed for good is queued again under the same id.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if idempotency_key is not None:
+                    row = self._db.execute(
+                        "SELECT id, status FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                    ).fetchone()
+                    if row is not None:
+                        if row[1] == FAILED:
+                            self._db.execute(
+                                "UPDATE jobs SET status = ?, attempts = 0, available_at = ?, error = NULL, "
+                                "updated_at = ? WHERE id = ?",
+                                (QUEUED, now, now, row[0])
+                            )
+                        self._db.execute("COMMIT")
+                        return row[0]
+
+                job_id = uuid.uuid4().hex
+                self._db.execute(
+                    "INSERT INTO jobs (id, idempotency_key, kind, payload, status, available_at, "
+                    "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, idempotency_key, kind, json.dumps(payload, ensure_ascii=False),
+                     QUEUED, now, now, now)
+                )
+                self._db.execute("COMMIT")
+                return job_id
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def claim(self):
+        """Lease the oldest ready job and return it, or None when there is nothing to do
+
+        Ready means queued and due, or running with an expired lease. A job whose
+        lease ran out on its last allowed attempt is failed instead of handed out.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated_at = ? "
+                    "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                    (FAILED, 'lease expired on the last attempt', now, RUNNING, now, self.max_attempts)
+                )
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE (status = ? AND available_at <= ?) "
+                    "OR (status = ? AND lease_until < ?) ORDER BY available_at LIMIT 1",
+                    (QUEUED, now, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                token = uuid.uuid4().hex
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, "
+                    "lease_token = ?, updated_at = ? WHERE id = ?",
+                    (RUNNING, now + self.lease_seconds, token, now, row[0])
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return self.get(row[0])
+
+    def extend_lease(self, job_id, lease_token):
+        """Push a running job's lease forward; False if the job was handed to someone else"""
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_token = ?",
+                (now + self.lease_seconds, now, job_id, RUNNING, lease_token)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, lease_token, result):
+        """Store a job's result; a stale lease only writes if nobody finished the job yet"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND (lease_token = ? OR status != ?)",
+                (DONE, json.dumps(result, ensure_ascii=False), now, job_id, lease_token, DONE)
+            )
+            self._purge(now)
+
+    def fail(self, job_id, lease_token, error):
+        """Record a failed attempt: retry later, or give up after max_attempts"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND lease_token = ? AND status = ?",
+                (job_id, lease_token, RUNNING)
+            ).fetchone()
+            if row is None:
+                return
+            if row[0] >= self.max_attempts:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                    (FAILED, error, now, job_id)
+                )
+            else:
+                delay = self.retry_delay * 2 ** (row[0] - 1)
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_until = NULL, "
+                    "updated_at = ? WHERE id = ?",
+                    (QUEUED, error, now + delay, now, job_id)
+                )
+
+    def get(self, job_id):
+        """Return a job as a dict (payload and result decoded), or None if unknown"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, payload, status, attempts, result, error, lease_token, created_at, updated_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row[0],
+            'kind': row[1],
+            'payload': json.loads(row[2]),
+            'status': row[3],
+            'attempts': row[4],
+            'result': json.loads(row[5]) if row[5] is not None else None,
+            'error': row[6],
+            'lease_token': row[7],
+            'created_at': row[8],
+            'updated_at': row[9],
+        }
+
+    def stats(self):
+        """Return the number of jobs in each status"""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        stats = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        stats.update(dict(rows))
+        return stats
+
+    def _purge(self, now):
+        self._db.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (DONE, FAILED, now - self.retention_seconds)
+        )
+
+
+class JobWorkers:
+    """Background threads that claim jobs and run them through handler(kind, payload)
+
+    The handler returns a JSON-serializable result or raises to fail the
+    attempt. Leases of running jobs are renewed every third of the lease.
+    """
+
+    def __init__(self, queue, handler, count=2, poll_interval=0.5):
+        self.queue = queue
+        self.handler = handler
+        self.count = count
+        self.poll_interval = poll_interval
+        self._running = {}
+        self._running_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.count):
+            thread = threading.Thread(target=self._work, name=f'job-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._renew_leases, name='job-leases', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return self
+
+    def notify(self):
+        """Wake idle workers, e.g. right after enqueueing"""
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _work(self):
+        while not self._stopped.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            with self._running_lock:
+                self._running[job['id']] = job['lease_token']
+            try:
+                result = self.handler(job['kind'], job['payload'])
+            except Exception as e:
+                self.queue.fail(job['id'], job['lease_token'], str(e) or type(e).__name__)
+            else:
+                self.queue.complete(job['id'], job['lease_token'], result)
+            finally:
+                with self._running_lock:
+                    self._running.pop(job['id'], None)
+
+    def _renew_leases(self):
+        while not self._stopped.wait(self.queue.lease_seconds / 3):
+            with self._running_lock:
+                running = list(self._running.items())
+            for job_id, lease_token in running:
+                self.queue.extend_lease(job_id, lease_token)
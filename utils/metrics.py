@@ -0,0 +1,111 @@
+"""Per-stage timers and counters with pluggable sinks"""
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def series_name(name, tags):
+    """Name a time series by metric and tags, e.g. 'render.seconds[stage=resume_html]'"""
+    if not tags:
+        return name
+    return name + '[' + ','.join(f'{key}={tags[key]}' for key in sorted(tags)) + ']'
+
+
+class Metrics:
+    """Fans recorded measurements out to every registered sink"""
+
+    def __init__(self, sinks=None):
+        self._sinks = list(sinks or [])
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        with self._lock:
+            self._sinks.append(sink)
+
+    def remove_sink(self, sink):
+        with self._lock:
+            self._sinks.remove(sink)
+
+    def sinks(self):
+        with self._lock:
+            return list(self._sinks)
+
+    def record(self, name, value, **tags):
+        """Record one measurement; tags label the stage or document it belongs to"""
+        event = {'metric': name, 'value': value, 'tags': tags, 'ts': time.time()}
+        for sink in self.sinks():
+            sink.emit(event)
+
+    @contextmanager
+    def timer(self, name, **tags):
+        """Record the wall-clock seconds spent inside the block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, **tags)
+
+
+class JsonLogSink:
+    """Writes each measurement as one JSON object per log line"""
+
+    def __init__(self, logger_name='resume_app.metrics', path=None):
+        self.logger = logging.getLogger(logger_name)
+        self.logger.setLevel(logging.INFO)
+        if path and not any(getattr(h, 'baseFilename', None) == path for h in self.logger.handlers):
+            handler = logging.FileHandler(path, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.logger.addHandler(handler)
+
+    def emit(self, event):
+        self.logger.info(json.dumps(event, default=str))
+
+
+class RollingWindowSink:
+    """Keeps the last ``window`` values of every series for percentile summaries"""
+
+    def __init__(self, window=500):
+        self.window = window
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        key = series_name(event['metric'], event['tags'])
+        with self._lock:
+            values = self._series.get(key)
+            if values is None:
+                values = self._series[key] = deque(maxlen=self.window)
+            values.append(event['value'])
+
+    def summary(self):
+        """Return {series: {count, mean, p50, p95, p99, last}} over the window"""
+        with self._lock:
+            snapshot = {key: list(values) for key, values in self._series.items()}
+        summary = {}
+        for key, values in sorted(snapshot.items()):
+            ordered = sorted(values)
+            summary[key] = {
+                'count': len(values),
+                'mean': sum(values) / len(values),
+                'p50': percentile(ordered, 0.50),
+                'p95': percentile(ordered, 0.95),
+                'p99': percentile(ordered, 0.99),
+                'last': values[-1],
+            }
+        return summary
+
+
+# Process-wide registry; sinks are attached by whichever entry point is running
+METRICS = Metrics()
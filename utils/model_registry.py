@@ -0,0 +1,215 @@
+"""Model registry and latency-aware routing of completions between models
+
+Each task (resume, cover letter, section rewrite) has an ordered list of
+models, a temperature and a p95 latency SLO. The router keeps recent
+latencies per task and model and recent outcomes per model, and orders a
+call's candidates as follows:
+
+1. healthy models whose p95 meets the task's SLO, fastest first
+2. healthy models without enough recent samples to tell, in registry
+   order; those listed before the fastest model in step 1 go ahead of it,
+   so a preferred model is measured again once its old samples expire
+3. healthy models over the SLO, fastest first
+4. models cooling down after repeated failures, as a last resort
+
+A failed call falls through to the next candidate. Every decision and
+fallback is logged on the ``resume_app.routing`` logger.
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from utils.metrics import percentile
+
+logger = logging.getLogger('resume_app.routing')
+
+# Models the tasks may use, with their context windows (tokens)
+DEFAULT_MODELS = {
+    'llama3-8b-8192': {'context_window': 8192},
+    'llama-3.1-8b-instant': {'context_window': 131072},
+    'llama-3.3-70b-versatile': {'context_window': 131072},
+}
+
+# Per-task model preference, sampling temperature and p95 latency SLO (seconds)
+DEFAULT_TASKS = {
+    'resume': {
+        'models': ['llama3-8b-8192', 'llama-3.1-8b-instant', 'llama-3.3-70b-versatile'],
+        'temperature': 0.7,
+        'p95_slo': 20.0,
+    },
+    'cover_letter': {
+        'models': ['llama3-8b-8192', 'llama-3.1-8b-instant', 'llama-3.3-70b-versatile'],
+        'temperature': 0.7,
+        'p95_slo': 15.0,
+    },
+    'resume_section': {
+        'models': ['llama3-8b-8192', 'llama-3.1-8b-instant'],
+        'temperature': 0.7,
+        'p95_slo': 8.0,
+    },
+}
+
+
+def load_registry(path=None):
+    """Return (models, tasks): the defaults, overridden by a JSON file when given
+
+    The file may hold ``models`` and ``tasks`` objects in the same shape as
+    DEFAULT_MODELS and DEFAULT_TASKS; a task entry only needs the keys it
+    changes; ``p95_slo`` may be null for no SLO. Raises ValueError when a
+    task names an unknown model or has no temperature.
+    """
+    models = {name: dict(spec) for name, spec in DEFAULT_MODELS.items()}
+    tasks = {name: dict(policy) for name, policy in DEFAULT_TASKS.items()}
+    if path:
+        with open(path, encoding='utf-8') as f:
+            overrides = json.load(f)
+        for name, spec in overrides.get('models', {}).items():
+            models[name] = {**models.get(name, {}), **spec}
+        for name, policy in overrides.get('tasks', {}).items():
+            tasks[name] = {**tasks.get(name, {}), **policy}
+    for name, policy in tasks.items():
+        unknown = [model for model in policy.get('models', []) if model not in models]
+        if not policy.get('models') or unknown:
+            raise ValueError(f"task {name!r} needs models from the registry (unknown: {', '.join(unknown) or 'none listed'})")
+        if 'temperature' not in policy:
+            raise ValueError(f"task {name!r} has no temperature")
+    return models, tasks
+
+
+class ModelRouter:
+    """Thread-safe per-task model choice from rolling latency and error statistics
+
+    ``min_samples`` recent successes make a latency estimate; samples older
+    than ``max_age`` seconds, or beyond the last ``window``, are dropped.
+    A model cools down for ``cooldown`` seconds after ``failure_threshold``
+    failures in a row, or when over ``max_error_rate`` of its recent calls
+    failed.
+    """
+
+    def __init__(self, models, tasks, window=50, min_samples=3, max_age=600.0,
+                 failure_threshold=2, max_error_rate=0.5, cooldown=60.0, clock=time.monotonic):
+        self.models = models
+        self.tasks = tasks
+        self.window = window
+        self.min_samples = min_samples
+        self.max_age = max_age
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.clock = clock
+        self._latencies = {}
+        self._outcomes = {}
+        self._failures_in_a_row = {}
+        self._cooling_until = {}
+        self._lock = threading.Lock()
+
+    def policy(self, task):
+        """Return the task's registry entry"""
+        return self.tasks[task]
+
+    def candidates(self, task):
+        """Return [(model, reason)] in the order they should be tried"""
+        policy = self.tasks[task]
+        slo = policy.get('p95_slo')
+        now = self.clock()
+        within, unmeasured, over, cooling = [], [], [], []
+        with self._lock:
+            for position, model in enumerate(policy['models']):
+                if self._cooling_until.get(model, 0) > now:
+                    cooling.append(model)
+                    continue
+                latencies = self._recent(self._latencies.get((task, model)), now)
+                if len(latencies) < self.min_samples:
+                    unmeasured.append((position, model))
+                    continue
+                p95 = percentile(sorted(latencies), 0.95)
+                (within if slo is None or p95 <= slo else over).append((p95, position, model))
+        within.sort()
+        over.sort()
+        lead = within[0][1] if within else len(policy['models'])
+        return (
+            [(model, 'unmeasured') for position, model in unmeasured if position < lead]
+            + [(model, 'within_slo') for _, _, model in within]
+            + [(model, 'unmeasured') for position, model in unmeasured if position >= lead]
+            + [(model, 'over_slo') for _, _, model in over]
+            + [(model, 'cooling_down') for model in cooling]
+        )
+
+    def call(self, task, attempt, should_fall_back=None):
+        """Run attempt(model, temperature) on the best candidate, falling back on failure
+
+        Returns (model, result, fallbacks), where fallbacks lists the
+        models that failed first. Errors for which should_fall_back(error)
+        is false are raised at once; if every model fails, the last
+        model's error is raised.
+        """
+        order = self.candidates(task)
+        policy = self.tasks[task]
+        logger.info('route task=%s order=%s', task, ' > '.join(f'{model} ({reason})' for model, reason in order))
+        fallbacks = []
+        last_error = None
+        for model, reason in order:
+            started = self.clock()
+            try:
+                result = attempt(model, policy['temperature'])
+            except Exception as e:
+                if should_fall_back is not None and not should_fall_back(e):
+                    raise
+                self.record(task, model, self.clock() - started, ok=False)
+                fallbacks.append(model)
+                last_error = e
+                logger.warning('model %s failed for %s (%s: %s); trying the next one',
+                               model, task, type(e).__name__, e)
+                continue
+            self.record(task, model, self.clock() - started, ok=True)
+            if fallbacks:
+                logger.warning('task=%s served by %s after %s failed', task, model, ', '.join(fallbacks))
+            return model, result, fallbacks
+        raise last_error
+
+    def record(self, task, model, seconds, ok=True):
+        """Add one call's outcome; successful calls also add their latency"""
+        now = self.clock()
+        with self._lock:
+            outcomes = self._outcomes.setdefault(model, deque(maxlen=self.window))
+            outcomes.append((now, ok))
+            if ok:
+                self._latencies.setdefault((task, model), deque(maxlen=self.window)).append((now, seconds))
+                self._failures_in_a_row[model] = 0
+                return
+            failures = self._failures_in_a_row[model] = self._failures_in_a_row.get(model, 0) + 1
+            recent = self._recent(outcomes, now)
+            error_rate = recent.count(False) / len(recent)
+            if failures >= self.failure_threshold or (
+                    len(recent) >= self.min_samples and error_rate > self.max_error_rate):
+                self._cooling_until[model] = now + self.cooldown
+                logger.warning('model %s cooling down for %.0fs (%d failures in a row, %.0f%% of recent calls failed)',
+                               model, self.cooldown, failures, error_rate * 100)
+
+    def stats(self):
+        """Return {task: {model: {samples, p50, p95, slo, error_rate, state}}}"""
+        now = self.clock()
+        stats = {}
+        with self._lock:
+            for task, policy in self.tasks.items():
+                stats[task] = {}
+                for model in policy['models']:
+                    latencies = sorted(self._recent(self._latencies.get((task, model)), now))
+                    outcomes = self._recent(self._outcomes.get(model), now)
+                    cooling = self._cooling_until.get(model, 0) > now
+                    stats[task][model] = {
+                        'samples': len(latencies),
+                        'p50': percentile(latencies, 0.50),
+                        'p95': percentile(latencies, 0.95),
+                        'slo': policy.get('p95_slo'),
+                        'error_rate': outcomes.count(False) / len(outcomes) if outcomes else 0.0,
+                        'state': 'cooling down' if cooling else 'healthy',
+                    }
+        return stats
+
+    def _recent(self, samples, now):
+        if not samples:
+            return []
+        return [value for at, value in samples if now - at <= self.max_age]
@@ -0,0 +1,219 @@
+"""Near-duplicate text lookup with MinHash signatures and LSH banding
+
+Texts are reduced to their words (case, punctuation, spacing and numbers
+are ignored), split into overlapping word shingles and summarized by a MinHash
+signature, whose agreement with another signature estimates the Jaccard
+similarity of the two shingle sets. Signatures are cut into bands and
+each band is bucketed, so a lookup only compares against entries that
+share at least one band, however large the index grows.
+"""
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+# Odd 64-bit multiplier that folds a shingle's word hashes into one value
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_SHIFT = np.uint64(32)
+
+# Rough bookkeeping cost per entry and per bucket reference, for the memory cap
+_ENTRY_OVERHEAD = 600
+_BUCKET_OVERHEAD = 64
+
+_WORD = re.compile(r'[^\W\d_]+')
+
+Match = namedtuple('Match', 'value text similarity')
+
+
+def normalize_words(text):
+    """Casefolded runs of letters in text; punctuation, spacing and numbers are dropped"""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+    return _WORD.findall(text.casefold())
+
+
+def shingle_hashes(words, size=3):
+    """Return 32-bit hashes of the word shingles (repeats included; they don't change a MinHash)
+
+    Words are hashed once and each run of ``size`` word hashes is folded
+    into one value, so no shingle strings are built. Python's string hash
+    is salted per process, so hashes only compare within one process.
+    """
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    hashes = np.fromiter(map(hash, words), dtype=np.int64, count=len(words)).view(np.uint64)
+    width = min(size, len(words))
+    count = len(words) - width + 1
+    shingles = hashes[:count].copy()
+    for offset in range(1, width):
+        # Wraps modulo 2**64 by design
+        shingles = shingles * _SHINGLE_MULTIPLIER + hashes[offset:offset + count]
+    return shingles >> _SHIFT
+
+
+def choose_bands(num_perm, threshold):
+    """Pick (bands, rows) so that pairs at the threshold almost always share a band
+
+    A pair with similarity s becomes a candidate with probability
+    1 - (1 - s**rows)**bands, which rises steeply around (1/bands)**(1/rows);
+    that point is placed a little below the threshold.
+    """
+    target = threshold * 0.9
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= target:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """Bounded, thread-safe index from texts to values, queried by similarity
+
+    Entries live in a scope (e.g. everything else a prompt contains) and
+    only match texts in the same scope. ``threshold`` is the minimum
+    estimated Jaccard similarity of a match. The least recently used
+    entries are evicted beyond ``max_entries`` or an estimated
+    ``max_bytes``; texts shorter than ``min_shingles`` are not indexed,
+    since their estimates are too noisy.
+    """
+
+    def __init__(self, threshold=0.85, num_perm=128, shingle_size=3, min_shingles=8,
+                 max_entries=20000, max_bytes=64 * 1024 * 1024, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        # One multiply-shift hash per permutation: the high half of (a * h + b) mod 2**64, a odd
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 2 ** 64, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 64, size=(num_perm, 1), dtype=np.uint64)
+        self._entries = OrderedDict()
+        self._ids_by_value = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        self._next_id = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'lookups': 0, 'hits': 0, 'evictions': 0}
+
+    def signature(self, text):
+        """MinHash signature of text, or None when it has too few shingles"""
+        hashes = shingle_hashes(normalize_words(text), self.shingle_size)
+        if len(hashes) < self.min_shingles:
+            return None
+        values = self._a * hashes
+        values += self._b
+        # The shift is monotonic, so it can wait until after the minimum
+        return (values.min(axis=1) >> _SHIFT).astype(np.uint32)
+
+    def add(self, scope, text, value):
+        """Index text under scope with a value returned by matching lookups
+
+        Returns False when the text is too short to index. Adding a value
+        that is already indexed replaces its entry.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        keys = self._band_keys(scope, signature)
+        with self._lock:
+            if value in self._ids_by_value:
+                self._remove(self._ids_by_value[value])
+            entry_id = self._next_id
+            self._next_id += 1
+            size = _ENTRY_OVERHEAD + signature.nbytes + len(text) + self.bands * _BUCKET_OVERHEAD
+            self._entries[entry_id] = (scope, signature, text, value, size)
+            self._ids_by_value[value] = entry_id
+            self._bytes += size
+            for bucket, key in zip(self._buckets, keys):
+                existing = bucket.get(key)
+                # Most buckets hold one entry, so ids are stored bare until a bucket is shared
+                if existing is None:
+                    bucket[key] = entry_id
+                elif isinstance(existing, int):
+                    bucket[key] = (existing, entry_id)
+                else:
+                    bucket[key] = existing + (entry_id,)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+        return True
+
+    def query(self, scope, text, exclude=None):
+        """Return the most similar Match at or above the threshold, or None
+
+        ``exclude`` is a value to skip, e.g. the one an exact lookup
+        already covers.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        keys = self._band_keys(scope, signature)
+        with self._lock:
+            self._counters['lookups'] += 1
+            candidates = set()
+            for bucket, key in zip(self._buckets, keys):
+                ids = bucket.get(key)
+                if ids is None:
+                    continue
+                if isinstance(ids, int):
+                    candidates.add(ids)
+                else:
+                    candidates.update(ids)
+
+            best_id, best_similarity = None, self.threshold
+            for entry_id in candidates:
+                entry_scope, entry_signature, _, value, _ = self._entries[entry_id]
+                if entry_scope != scope or value == exclude:
+                    continue
+                similarity = float(np.count_nonzero(entry_signature == signature)) / self.num_perm
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+            if best_id is None:
+                return None
+            self._entries.move_to_end(best_id)
+            self._counters['hits'] += 1
+            _, _, entry_text, value, _ = self._entries[best_id]
+            return Match(value, entry_text, best_similarity)
+
+    def discard(self, value):
+        """Remove the entry holding value, if any"""
+        with self._lock:
+            entry_id = self._ids_by_value.get(value)
+            if entry_id is not None:
+                self._remove(entry_id)
+
+    def stats(self):
+        """Return entry count, estimated memory and lookup counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            stats['estimated_bytes'] = self._bytes
+        stats['hit_rate'] = stats['hits'] / stats['lookups'] if stats['lookups'] else 0.0
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_keys(self, scope, signature):
+        rows = signature.reshape(self.bands, self.rows)
+        return [hash((scope, row.tobytes())) for row in rows]
+
+    def _remove(self, entry_id):
+        scope, signature, _, value, size = self._entries.pop(entry_id)
+        self._ids_by_value.pop(value, None)
+        self._bytes -= size
+        for bucket, key in zip(self._buckets, self._band_keys(scope, signature)):
+            ids = bucket.get(key)
+            if ids == entry_id:
+                del bucket[key]
+            elif isinstance(ids, tuple):
+                remaining = tuple(i for i in ids if i != entry_id)
+                bucket[key] = remaining[0] if len(remaining) == 1 else remaining
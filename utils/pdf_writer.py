@@ -0,0 +1,289 @@
+"""Minimal pure-Python PDF writer with text wrapping and pagination
+
+Uses the standard Helvetica fonts (no embedding) with their AFM widths for
+line breaking, so a one-page document renders in a few milliseconds.
+The fonts only cover Windows-1252; other letters are transliterated where
+possible (ő → o, ł → l) and the rest are drawn as '?' and reported.
+"""
+import functools
+import io
+import unicodedata
+import zlib
+
+LETTER = (612, 792)
+
+# Helvetica / Helvetica-Bold advance widths (1/1000 em) for ASCII 32..126
+_HELVETICA_ASCII = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD_ASCII = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+_PUNCTUATION = {'•': 350, '–': 556, '—': 1000, '‘': 222, '’': 222, '“': 333, '”': 333, '…': 1000}
+
+
+def _width_table(ascii_widths):
+    table = {chr(32 + i): width for i, width in enumerate(ascii_widths)}
+    table.update(_PUNCTUATION)
+    return table
+
+
+FONTS = {
+    'F1': ('Helvetica', _width_table(_HELVETICA_ASCII)),
+    'F2': ('Helvetica-Bold', _width_table(_HELVETICA_BOLD_ASCII)),
+}
+REGULAR = 'F1'
+BOLD = 'F2'
+
+# Fallback for characters outside the tables (accented letters and the like)
+_DEFAULT_WIDTH = 556
+
+
+@functools.lru_cache(maxsize=4096)
+def _word_units(font, word):
+    # Widths in 1/1000 em; words repeat a lot across a document, so memoize
+    widths = FONTS[font][1]
+    return sum(widths.get(char, _DEFAULT_WIDTH) for char in word)
+
+
+def text_width(text, font, size):
+    """Width of text in points"""
+    return _word_units(font, text) * size / 1000
+
+
+def wrap_text(text, font, size, max_width):
+    """Greedy word wrap; words wider than a line are split by character"""
+    widths = FONTS[font][1]
+    scale = size / 1000
+    space = widths[' '] * scale
+    lines = []
+    current = []
+    current_width = 0.0
+    for word in text.split():
+        word_width = _word_units(font, word) * scale
+        if word_width > max_width:
+            if current:
+                lines.append(' '.join(current))
+                current, current_width = [], 0.0
+            piece = ''
+            piece_width = 0.0
+            for char in word:
+                char_width = widths.get(char, _DEFAULT_WIDTH) * scale
+                if piece and piece_width + char_width > max_width:
+                    lines.append(piece)
+                    piece, piece_width = '', 0.0
+                piece += char
+                piece_width += char_width
+            current, current_width = [piece], piece_width
+            continue
+        needed = word_width if not current else current_width + space + word_width
+        if current and needed > max_width:
+            lines.append(' '.join(current))
+            current, current_width = [word], word_width
+        else:
+            current.append(word)
+            current_width = needed
+    if current:
+        lines.append(' '.join(current))
+    return lines
+
+
+# Letters without a Unicode decomposition, spelled the way they usually are in ASCII
+_TRANSLITERATIONS = {
+    'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D', 'ħ': 'h', 'Ħ': 'H', 'ı': 'i', 'ŧ': 't', 'Ŧ': 'T',
+    'ŀ': 'l', 'Ŀ': 'L', 'ĸ': 'k', 'ŉ': "'n", 'ſ': 's', '−': '-', '‐': '-', '‑': '-', '′': "'", '″': '"',
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _encode_char(char):
+    # cp1252 bytes for one character, transliterated if need be; None if it has no stand-in
+    try:
+        return char.encode('cp1252')
+    except UnicodeEncodeError:
+        pass
+    fallback = _TRANSLITERATIONS.get(char)
+    if fallback is None:
+        fallback = ''.join(c for c in unicodedata.normalize('NFKD', char) if not unicodedata.combining(c))
+    try:
+        return fallback.encode('cp1252') or None
+    except UnicodeEncodeError:
+        return None
+
+
+def encode_text(text):
+    """Return (cp1252 bytes, characters drawn as '?' because the fonts can't show them)"""
+    try:
+        return text.encode('cp1252'), []
+    except UnicodeEncodeError:
+        pass
+    parts = []
+    missing = []
+    for char in text:
+        data = _encode_char(char)
+        if data is None:
+            missing.append(char)
+            data = b'?'
+        parts.append(data)
+    return b''.join(parts), missing
+
+
+def unsupported_characters(text):
+    """Return the distinct characters of text the PDF can't show, even transliterated"""
+    return sorted(set(encode_text(text)[1]))
+
+
+def _pdf_string(data):
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+class PdfLayout:
+    """Flows paragraphs, bullets and rules down pages, breaking as needed"""
+
+    def __init__(self, page_size=LETTER, margin=72):
+        self.width, self.height = page_size
+        self.margin = margin
+        self.content_width = self.width - 2 * margin
+        self.pages = []
+        self.unsupported = set()
+        self._new_page()
+
+    def _new_page(self):
+        self._ops = []
+        self.pages.append(self._ops)
+        self.y = self.height - self.margin
+
+    def _ensure_room(self, needed):
+        if self.y - needed < self.margin and self.y < self.height - self.margin:
+            self._new_page()
+
+    def space(self, points):
+        self.y -= points
+
+    def paragraph(self, text, font=REGULAR, size=10, leading=None, align='left',
+                  indent=0, color=None, keep_with_next=0):
+        """Wrap text into lines; keep_with_next reserves room for what follows"""
+        leading = leading or size * 1.4
+        lines = wrap_text(text, font, size, self.content_width - indent) or ['']
+        self._ensure_room(leading + keep_with_next)
+        for line in lines:
+            self._ensure_room(leading)
+            self.y -= leading
+            x = self.margin + indent
+            if align == 'center':
+                x = (self.width - text_width(line, font, size)) / 2
+            elif align == 'right':
+                x = self.width - self.margin - text_width(line, font, size)
+            self._text(x, self.y + (leading - size) / 2, line, font, size, color)
+
+    def bullet(self, text, size=10, indent=14):
+        leading = size * 1.4
+        lines = wrap_text(text, REGULAR, size, self.content_width - indent)
+        if not lines:
+            return
+        self._ensure_room(leading)
+        self._text(self.margin + 3, self.y - leading + (leading - size) / 2, '•', REGULAR, size, None)
+        for line in lines:
+            self._ensure_room(leading)
+            self.y -= leading
+            self._text(self.margin + indent, self.y + (leading - size) / 2, line, REGULAR, size, None)
+
+    def rule(self, thickness=1, color=(0.2, 0.29, 0.37), gap=4):
+        self.y -= gap
+        r, g, b = color
+        self._ops.append(
+            f'{r:.3f} {g:.3f} {b:.3f} RG {thickness} w {self.margin} {self.y:.2f} m '
+            f'{self.width - self.margin} {self.y:.2f} l S'.encode('ascii')
+        )
+        self.y -= gap
+
+    def _text(self, x, y, text, font, size, color):
+        fill = b'%.3f %.3f %.3f rg ' % color if color else b'0 0 0 rg '
+        data, missing = encode_text(text)
+        self.unsupported.update(missing)
+        self._ops.append(
+            fill + f'BT /{font} {size} Tf {x:.2f} {y:.2f} Td '.encode('ascii')
+            + _pdf_string(data) + b' Tj ET'
+        )
+
+    def write(self, out, compress=True):
+        """Serialize all pages to a binary file object"""
+        writer = _ObjectWriter(out)
+        font_ids = {}
+        for name, (base_font, _) in FONTS.items():
+            font_ids[name] = writer.add(
+                b'<< /Type /Font /Subtype /Type1 /BaseFont /' + base_font.encode('ascii')
+                + b' /Encoding /WinAnsiEncoding >>'
+            )
+        fonts = b' '.join(b'/%s %d 0 R' % (name.encode('ascii'), oid) for name, oid in font_ids.items())
+        
+        pages_id = writer.reserve()
+        page_ids = []
+        for ops in self.pages:
+            stream = b'\n'.join(ops)
+            if compress:
+                stream = zlib.compress(stream, 6)
+                header = b'<< /Length %d /Filter /FlateDecode >>' % len(stream)
+            else:
+                header = b'<< /Length %d >>' % len(stream)
+            content_id = writer.add(header + b'\nstream\n' + stream + b'\nendstream')
+            page_ids.append(writer.add(
+                b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] '
+                b'/Resources << /Font << %s >> >> /Contents %d 0 R >>'
+                % (pages_id, self.width, self.height, fonts, content_id)
+            ))
+        kids = b' '.join(b'%d 0 R' % oid for oid in page_ids)
+        writer.add(b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_ids)), object_id=pages_id)
+        catalog_id = writer.add(b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id)
+        writer.finish(catalog_id)
+
+    def to_buffer(self, compress=True):
+        buffer = io.BytesIO()
+        self.write(buffer, compress)
+        buffer.seek(0)
+        return buffer
+
+
+class _ObjectWriter:
+    """Streams numbered objects to out and writes the xref table at the end"""
+
+    def __init__(self, out):
+        self.out = out
+        self.offsets = {}
+        self.next_id = 1
+        self.position = 0
+        self._emit(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def reserve(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def add(self, body, object_id=None):
+        if object_id is None:
+            object_id = self.reserve()
+        self.offsets[object_id] = self.position
+        self._emit(b'%d 0 obj\n' % object_id + body + b'\nendobj\n')
+        return object_id
+
+    def finish(self, root_id):
+        xref_at = self.position
+        count = self.next_id
+        rows = [b'xref\n0 %d\n' % count, b'0000000000 65535 f \n']
+        rows.extend(b'%010d 00000 n \n' % self.offsets[i] for i in range(1, count))
+        self._emit(b''.join(rows))
+        self._emit(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (count, root_id, xref_at))
+
+    def _emit(self, data):
+        self.out.write(data)
+        self.position += len(data)
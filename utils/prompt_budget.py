@@ -0,0 +1,127 @@
+"""Token budgeting for prompts built from free-form user text
+
+Token counts are a local approximation of a BPE tokenizer (no model
+vocabulary is needed): letter runs cost one token per ``LETTERS_PER_TOKEN``
+characters, digits are grouped in threes and every other symbol is a token.
+It errs on the high side for English text, which is the safe direction
+for budgeting.
+"""
+import functools
+import math
+import re
+
+LETTERS_PER_TOKEN = 6
+
+_TOKEN_PATTERN = re.compile(r'[^\W\d_]+|\d{1,3}|[^\w\s]|_')
+
+
+@functools.lru_cache(maxsize=4096)
+def count_tokens(text):
+    """Approximate the number of tokens in text"""
+    if not text:
+        return 0
+    tokens = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        piece = match.group()
+        tokens += math.ceil(len(piece) / LETTERS_PER_TOKEN) if piece[0].isalpha() else 1
+    return tokens
+
+
+def _line_key(line):
+    return ' '.join(line.split()).casefold()
+
+
+def dedupe_lines(text, seen):
+    """Drop lines of text already in seen (ignoring case and spacing)
+
+    Lines repeated within text itself are kept, as the same bullet may
+    belong under two jobs. Returns text unchanged when nothing was dropped.
+    """
+    kept = []
+    dropped = False
+    for line in text.split('\n'):
+        key = _line_key(line)
+        if key and key in seen:
+            dropped = True
+            continue
+        kept.append(line)
+    return '\n'.join(kept) if dropped else text
+
+
+def trim_to_tokens(text, limit):
+    """Keep whole lines of text, then words of the next line, up to limit tokens"""
+    if count_tokens(text) <= limit:
+        return text
+    kept = []
+    used = 0
+    for line in text.split('\n'):
+        cost = count_tokens(line) + 1
+        if used + cost <= limit:
+            kept.append(line)
+            used += cost
+            continue
+        words = []
+        for word in line.split():
+            cost = count_tokens(word)
+            if used + cost + 1 > limit:
+                break
+            words.append(word)
+            used += cost
+        if words:
+            kept.append(' '.join(words))
+        break
+    return '\n'.join(kept).rstrip() + ' …'
+
+
+def fit_fields(values, trim_order, build, budget):
+    """Deduplicate and trim text fields until build(values) fits in budget tokens
+
+    trim_order is a sequence of (field, floor) pairs, lowest priority first.
+    A prompt within budget is left as it is. Otherwise lines a field shares
+    with a higher-priority field are dropped from the lower-priority copy
+    (repeats within one field are kept); then, while the prompt is still
+    over budget, fields are cut towards their floor in trim order. Fields
+    not listed are never changed.
+
+    Returns (prompt, values, report) where report holds the estimated
+    prompt_tokens and the names of the deduplicated and trimmed fields.
+    """
+    values = dict(values)
+    report = {'deduplicated': [], 'trimmed': []}
+
+    prompt = build(values)
+    over = count_tokens(prompt) - budget
+    if over > 0:
+        seen = set()
+        for field, _ in reversed(trim_order):
+            text = values.get(field)
+            if not text:
+                continue
+            deduped = dedupe_lines(text, seen)
+            if deduped is not text:
+                values[field] = deduped
+                report['deduplicated'].append(field)
+            seen.update(_line_key(line) for line in text.split('\n'))
+        if report['deduplicated']:
+            prompt = build(values)
+            over = count_tokens(prompt) - budget
+    for field, floor in trim_order:
+        if over <= 0:
+            break
+        text = values.get(field) or ''
+        tokens = count_tokens(text)
+        if tokens <= floor:
+            continue
+        values[field] = trim_to_tokens(text, max(floor, tokens - over))
+        report['trimmed'].append(field)
+        over -= tokens - count_tokens(values[field])
+
+    if report['trimmed']:
+        prompt = build(values)
+    report['prompt_tokens'] = count_tokens(prompt)
+    return prompt, values, report
+
+
+def estimate_max_tokens(input_tokens, base, per_input_token, minimum, maximum):
+    """Size max_tokens from the user-supplied input: base + per_input_token * input, clamped"""
+    return int(min(maximum, max(minimum, base + per_input_token * input_tokens)))
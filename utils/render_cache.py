@@ -0,0 +1,66 @@
+"""Memoization for preview and document render stages"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def make_render_key(stage, content, user_data, *extra):
+    """Hash a render stage together with the inputs it depends on"""
+    payload = json.dumps(
+        [stage, content, user_data, extra],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """Bounded LRU of rendered artifacts with a count of avoided renders
+
+    With a ``store`` (an ArtifactStore), only handles are kept here and the
+    rendered bytes live in the store, under its memory cap; an artifact the
+    store has dropped is rendered again.
+    """
+
+    def __init__(self, max_entries=256, store=None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.renders_avoided = 0
+
+    def get_or_render(self, key, render):
+        """Return the artifact stored under key, calling render() on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            result = entry if self.store is None else self.store.get(entry)
+            if result is not None:
+                with self._lock:
+                    self.renders_avoided += 1
+                return result
+        
+        # Render outside the lock; a concurrent duplicate render is harmless
+        result = render()
+        entry = result if self.store is None else self.store.put(result)
+        with self._lock:
+            self.renders += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def stats(self):
+        """Return render and avoided-render counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'renders': self.renders,
+                'renders_avoided': self.renders_avoided,
+            }
@@ -0,0 +1,291 @@
+"""Shared request layer for Groq calls: rate limiting, retries and circuit breaking"""
+import email.utils
+import random
+import threading
+import time
+
+# Status codes worth retrying; anything else is the caller's problem
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class RequestRejected(Exception):
+    """Raised when the request layer refuses to send a call"""
+
+
+class RateLimitTimeout(RequestRejected):
+    """No rate limit token became available in time"""
+
+
+class CircuitOpenError(RequestRejected):
+    """The API is failing and calls are being short-circuited"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at a steady rate
+
+    ``capacity`` bounds bursts; waiting callers are counted so the queue
+    depth can be observed.
+    """
+
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+        self.waiting = 0
+        self.rejected = 0
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to timeout seconds; False if none came"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self.waiting += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    wait = (1 - self._tokens) / self.rate
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected += 1
+                            return False
+                        wait = min(wait, remaining)
+                    self._condition.wait(wait)
+            finally:
+                self.waiting -= 1
+
+    def available(self):
+        with self._condition:
+            self._refill()
+            return self._tokens
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets one trial call through
+
+    States are 'closed' (normal), 'open' (fail fast for ``reset_timeout``
+    seconds) and 'half_open' (a single probe decides whether to close).
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def allow(self):
+        """Return True if a call may proceed right now"""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def release(self):
+        """Give back a call allow() let through that was never sent
+
+        A half-open breaker can then hand its probe to the next caller.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+
+def is_retryable(error):
+    """Return True for throttling, server errors and connection failures"""
+    import groq  # already loaded by whoever built the client that raised
+    
+    if isinstance(error, groq.APIConnectionError):
+        return True
+    status = getattr(error, 'status_code', None)
+    return status is not None and (status in RETRYABLE_STATUS_CODES or status >= 500)
+
+
+def retry_after_seconds(error):
+    """Read the server's Retry-After hint from an API error, if any"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get('retry-after-ms'):
+        try:
+            return float(headers['retry-after-ms']) / 1000
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time()) if retry_at else None
+
+
+def backoff_delay(attempt, base_delay, max_delay, retry_after=None):
+    """Full-jitter exponential backoff that never undercuts Retry-After"""
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, max_delay))
+    return delay
+
+
+class ResilientClient:
+    """Wraps a Groq client so every completion goes through the request layer
+
+    Exposes the same ``client.chat.completions.create(...)`` call. Retries
+    happen here, so the wrapped client should be built with
+    ``max_retries=0``. Each model has its own circuit breaker, so one
+    overloaded model doesn't cut off the others; pass ``breaker`` to share
+    a single one instead.
+    """
+
+    def __init__(self, client, requests_per_minute=None, burst=5, max_retries=3,
+                 timeout=60.0, base_delay=0.5, max_delay=20.0, queue_timeout=30.0,
+                 breaker=None):
+        self.client = client
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst) if requests_per_minute else None
+        self.breaker = breaker
+        self._breakers = {}
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.queue_timeout = queue_timeout
+        self.chat = _Chat(self)
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'in_flight': 0}
+
+    def create_completion(self, **kwargs):
+        """Send a chat completion with rate limiting, retries and breaker checks"""
+        kwargs.setdefault('timeout', self.timeout)
+        self._count('calls')
+        breaker = self.breaker_for(kwargs.get('model'))
+        attempt = 0
+        while True:
+            # The breaker comes first, so calls fail fast during an outage instead of queueing for a token
+            if not breaker.allow():
+                self._count('failed')
+                raise CircuitOpenError(
+                    f"{kwargs.get('model') or 'The Groq API'} is unavailable right now; please try again shortly"
+                )
+            if self.bucket is not None and not self.bucket.acquire(self.queue_timeout):
+                # An unsent probe would leave a half-open breaker waiting for its outcome for good
+                breaker.release()
+                self._count('failed')
+                raise RateLimitTimeout("Too many requests are queued; please try again shortly")
+            
+            self._count('in_flight')
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    # The service answered; a bad request says nothing about its health
+                    breaker.record_success()
+                if not retryable or attempt >= self.max_retries:
+                    self._count('failed')
+                    raise
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay, retry_after_seconds(e))
+                attempt += 1
+                self._count('retries')
+                time.sleep(delay)
+                continue
+            finally:
+                self._count('in_flight', -1)
+            
+            breaker.record_success()
+            self._count('succeeded')
+            return response
+
+    def stats(self):
+        """Snapshot of queue depth, rejections, retries and breaker state"""
+        with self._lock:
+            stats = dict(self._counters)
+            breakers = dict(self._breakers)
+        if self.breaker is not None:
+            breakers = {None: self.breaker}
+        states = {model: breaker.state for model, breaker in breakers.items()}
+        # The worst state across models, with each model's own where they differ
+        stats['circuit_state'] = next(
+            (state for state in ('open', 'half_open') if state in states.values()), 'closed'
+        )
+        stats['circuits'] = {model: state for model, state in states.items() if model is not None}
+        stats['rejected_circuit_open'] = sum(breaker.rejected for breaker in breakers.values())
+        if self.bucket is not None:
+            stats['queue_depth'] = self.bucket.waiting
+            stats['rejected_rate_limited'] = self.bucket.rejected
+            stats['tokens_available'] = round(self.bucket.available(), 2)
+        else:
+            stats['queue_depth'] = 0
+            stats['rejected_rate_limited'] = 0
+        return stats
+
+    def breaker_for(self, model):
+        """Return the circuit breaker guarding calls to model"""
+        if self.breaker is not None:
+            return self.breaker
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = self._breakers[model] = CircuitBreaker()
+            return breaker
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            self._counters[name] += delta
+
+
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, **kwargs):
+        return self._owner.create_completion(**kwargs)
+
+
+class _Chat:
+    def __init__(self, owner):
+        self.completions = _Completions(owner)
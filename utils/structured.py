@@ -0,0 +1,122 @@
+"""Structured (JSON) resume output: schema, validation and document registry
+
+The model is asked for one JSON object keyed by section; every value is a
+list of lines, with bullet lines starting with "• ". Valid sections become
+a ResumeDocument directly, so no header guessing is involved, and invalid
+ones are reported by key so only those need to be requested again.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from utils.document import ResumeDocument, Section, parse_blocks
+
+# (JSON key, section title, required) in display order
+RESUME_SCHEMA = (
+    ('professional_summary', 'PROFESSIONAL SUMMARY', True),
+    ('education', 'EDUCATION', True),
+    ('work_experience', 'WORK EXPERIENCE', True),
+    ('skills', 'SKILLS', True),
+    ('additional_information', 'ADDITIONAL INFORMATION', False),
+)
+
+SECTION_TITLES = {key: title for key, title, _ in RESUME_SCHEMA}
+
+# Longest line accepted inside a section; longer values are treated as garbage
+MAX_LINE_LENGTH = 2000
+
+
+def schema_example(keys=None):
+    """JSON skeleton shown to the model for the given (default: all) section keys"""
+    keys = keys or [key for key, _, _ in RESUME_SCHEMA]
+    return json.dumps({key: ['...', '• ...'] for key in keys}, indent=2)
+
+
+def extract_json_object(raw):
+    """Decode the outermost JSON object in raw, tolerating code fences and chatter
+
+    Returns None when no object can be decoded.
+    """
+    if not raw:
+        return None
+    start = raw.find('{')
+    end = raw.rfind('}')
+    if start == -1 or end <= start:
+        return None
+    try:
+        value = json.loads(raw[start:end + 1])
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def normalize_lines(value):
+    """Return a section value as a tuple of non-empty lines, or None if malformed"""
+    if isinstance(value, str):
+        value = value.split('\n')
+    if not isinstance(value, list):
+        return None
+    lines = []
+    for item in value:
+        if not isinstance(item, str) or len(item) > MAX_LINE_LENGTH:
+            return None
+        lines.extend(line.strip() for line in item.split('\n') if line.strip())
+    return tuple(lines)
+
+
+def validate_sections(data, keys=None):
+    """Split decoded JSON into (valid {key: lines}, invalid keys)
+
+    A required section is invalid when it is missing, malformed or empty;
+    an optional one only when it is present but malformed.
+    """
+    valid = {}
+    invalid = []
+    for key, _, required in RESUME_SCHEMA:
+        if keys is not None and key not in keys:
+            continue
+        value = data.get(key)
+        if value is None and not required:
+            continue
+        lines = normalize_lines(value)
+        if lines is None or (required and not lines):
+            invalid.append(key)
+        elif lines:
+            valid[key] = lines
+    return valid, invalid
+
+
+def build_document(sections):
+    """Build a ResumeDocument from validated {key: lines} in schema order"""
+    return ResumeDocument(tuple(
+        Section(title, sections[key], parse_blocks(sections[key]))
+        for key, title, _ in RESUME_SCHEMA
+        if key in sections
+    ))
+
+
+class DocumentRegistry:
+    """Bounded map from canonical resume text to the document it was built from
+
+    Lets renderers reuse a document built from JSON (or edited section by
+    section) instead of re-guessing headers from the text.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, text, document):
+        with self._lock:
+            self._documents[text] = document
+            self._documents.move_to_end(text)
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+
+    def get(self, text):
+        with self._lock:
+            document = self._documents.get(text)
+            if document is not None:
+                self._documents.move_to_end(text)
+            return document
@@ -0,0 +1,246 @@
+"""Precompiled, themeable HTML templates for the resume and cover letter previews"""
+import html
+import re
+
+_PLACEHOLDER = re.compile(r'\{\{(\w+)\}\}')
+
+
+class Template:
+    """A template split once into literal text and ``{{field}}`` slots
+
+    Rendering fills the slots and joins everything in a single pass.
+    """
+
+    def __init__(self, source):
+        pieces = _PLACEHOLDER.split(source)
+        self._literals = pieces[0::2]
+        self.fields = tuple(pieces[1::2])
+
+    def render(self, values):
+        out = [None] * (len(self._literals) + len(self.fields))
+        out[0::2] = self._literals
+        out[1::2] = [values[field] for field in self.fields]
+        return ''.join(out)
+
+
+def escape_fields(values):
+    """HTML-escape every string value of a dict in one pass"""
+    return {
+        key: html.escape(value) if isinstance(value, str) else value
+        for key, value in values.items()
+    }
+
+
+def escape_text(text):
+    """HTML-escape generated text placed between tags"""
+    return html.escape(text, quote=False)
+
+
+# Each design only sets variables (and the odd override) on top of the shared layout
+THEMES = {
+    'classic': {
+        'label': 'Classic',
+        'css': """
+            :root {
+                --font: 'Arial', sans-serif;
+                --text: #333;
+                --muted: #666;
+                --heading: #2c3e50;
+                --accent: #3498db;
+                --page: #f9f9f9;
+                --header-align: center;
+                --header-rule: 3px solid #2c3e50;
+                --title-rule: 2px solid #3498db;
+                --title-transform: uppercase;
+            }
+        """,
+    },
+    'modern': {
+        'label': 'Modern',
+        'css': """
+            :root {
+                --font: 'Helvetica Neue', Helvetica, sans-serif;
+                --text: #1f2933;
+                --muted: #52606d;
+                --heading: #0b7285;
+                --accent: #15aabf;
+                --page: #eef2f5;
+                --header-align: left;
+                --header-rule: 6px solid #15aabf;
+                --title-rule: none;
+                --title-transform: none;
+            }
+            .name { font-size: 36px; letter-spacing: 0; }
+            .section-title { border-left: 4px solid var(--accent); padding-left: 10px; font-size: 18px; }
+        """,
+    },
+    'minimal': {
+        'label': 'Minimal',
+        'css': """
+            :root {
+                --font: Georgia, 'Times New Roman', serif;
+                --text: #222;
+                --muted: #777;
+                --heading: #111;
+                --accent: #999;
+                --page: #ffffff;
+                --header-align: center;
+                --header-rule: 1px solid #ccc;
+                --title-rule: 1px solid #ddd;
+                --title-transform: uppercase;
+            }
+            .resume-container, .letter-container { box-shadow: none; border: 1px solid #eee; }
+            .name { font-weight: normal; letter-spacing: 3px; }
+            .section-title { font-weight: normal; letter-spacing: 2px; font-size: 14px; }
+        """,
+    },
+}
+
+DEFAULT_THEME = 'classic'
+
+_BASE_CSS = """
+            body {
+                font-family: var(--font);
+                line-height: 1.6;
+                color: var(--text);
+                max-width: 800px;
+                margin: 0 auto;
+                padding: 20px;
+                background-color: var(--page);
+            }
+            .resume-container, .letter-container {
+                background: white;
+                padding: 40px;
+                border-radius: 8px;
+                box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            }
+            .resume-container .header {
+                text-align: var(--header-align);
+                border-bottom: var(--header-rule);
+                padding-bottom: 20px;
+                margin-bottom: 30px;
+            }
+            .name {
+                font-size: 32px;
+                font-weight: bold;
+                color: var(--heading);
+                margin-bottom: 10px;
+                letter-spacing: 1px;
+            }
+            .contact-info, .sender-info {
+                font-size: 14px;
+                color: var(--muted);
+                line-height: 1.4;
+            }
+            .section {
+                margin-bottom: 25px;
+            }
+            .section-title {
+                font-size: 16px;
+                font-weight: bold;
+                color: var(--heading);
+                border-bottom: var(--title-rule);
+                padding-bottom: 5px;
+                margin-bottom: 15px;
+                text-transform: var(--title-transform);
+                letter-spacing: 0.5px;
+            }
+            .section-content {
+                font-size: 14px;
+                line-height: 1.6;
+            }
+            .section-content ul {
+                margin: 10px 0;
+                padding-left: 20px;
+            }
+            .section-content li {
+                margin-bottom: 8px;
+                text-align: justify;
+            }
+            .section-content p {
+                margin-bottom: 12px;
+                text-align: justify;
+            }
+            .letter-container .header {
+                text-align: right;
+                margin-bottom: 30px;
+            }
+            .date {
+                margin: 20px 0;
+                font-size: 14px;
+            }
+            .content {
+                white-space: pre-line;
+                text-align: justify;
+                font-size: 14px;
+                line-height: 1.6;
+            }
+            @media print {
+                body { background-color: white; }
+                .resume-container, .letter-container { box-shadow: none; }
+            }
+"""
+
+_RESUME_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <style>{{css}}</style>
+</head>
+<body>
+    <div class="resume-container">
+        <div class="header">
+            <div class="name">{{name}}</div>
+            <div class="contact-info">
+                {{email}} | {{phone}}<br>
+                {{address}}{{linkedin_line}}
+            </div>
+        </div>
+        {{sections}}
+    </div>
+</body>
+</html>
+"""
+
+_COVER_LETTER_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <style>{{css}}</style>
+</head>
+<body>
+    <div class="letter-container">
+        <div class="header">
+            <div class="sender-info">
+                {{name}}<br>
+                {{email}}<br>
+                {{phone}}<br>
+                {{address}}
+            </div>
+        </div>
+        <div class="date">{{date}}</div>
+        <div class="content">{{content}}</div>
+    </div>
+</body>
+</html>
+"""
+
+SECTION_TEMPLATE = Template(
+    '<div class="section"><div class="section-title">{{title}}</div>'
+    '<div class="section-content">{{content}}</div></div>'
+)
+
+
+def _compile_pages(page):
+    # Bake each theme's CSS in at import so choosing a theme is a dict lookup
+    return {
+        name: Template(page.replace('{{css}}', _BASE_CSS + theme['css']))
+        for name, theme in THEMES.items()
+    }
+
+
+RESUME_TEMPLATES = _compile_pages(_RESUME_PAGE)
+COVER_LETTER_TEMPLATES = _compile_pages(_COVER_LETTER_PAGE)
+
+
+def theme_labels():
+    """Return {theme name: display label} in display order"""
+    return {name: theme['label'] for name, theme in THEMES.items()}
@@ -0,0 +1,104 @@
+"""HTTP transport for the API clients: a sized, kept-alive connection pool
+
+httpx closes idle connections after five seconds by default, so a user
+who reads a preview before clicking again pays for a new TCP and TLS
+handshake. The clients built here keep connections open longer, size the
+pool for the calls that run at once, use HTTP/2 when the ``h2`` package
+is installed (several calls then share one connection), and can open
+connections ahead of time with cheap pings.
+
+httpx and the Groq SDK are imported on first use, like the rest of the
+client setup.
+"""
+import importlib.util
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available():
+    """True when the h2 package httpx needs for HTTP/2 is installed"""
+    return importlib.util.find_spec('h2') is not None
+
+
+def transport_options(max_connections=32, max_keepalive_connections=None, keepalive_expiry=120.0,
+                      http2=None, connect_timeout=5.0, timeout=60.0):
+    """Keyword arguments for an httpx client with the given pool settings
+
+    max_keepalive_connections defaults to max_connections, so a burst
+    doesn't close the connections it opened; http2=None means "if available".
+    """
+    import httpx
+
+    return {
+        'limits': httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections or max_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        'http2': http2_available() if http2 is None else http2,
+        'timeout': httpx.Timeout(timeout, connect=connect_timeout),
+    }
+
+
+def build_http_client(verify=True, **settings):
+    """Return a pooled httpx.Client for the Groq SDK (see transport_options for settings)"""
+    import groq
+
+    return groq.DefaultHttpxClient(verify=verify, **transport_options(**settings))
+
+
+def build_async_http_client(verify=True, **settings):
+    """Return a pooled httpx.AsyncClient for the async Groq SDK"""
+    import groq
+
+    return groq.DefaultAsyncHttpxClient(verify=verify, **transport_options(**settings))
+
+
+def warm_connections(ping, connections=1):
+    """Call ping() from ``connections`` threads at once, so the pool opens that many connections
+
+    Over HTTP/2 one connection carries them all. Failures are logged;
+    returns the number of pings that failed.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, connections), thread_name_prefix='warm-up') as pool:
+        futures = [pool.submit(ping) for _ in range(max(1, connections))]
+    failed = [future.exception() for future in futures if future.exception() is not None]
+    if failed:
+        logger.info('%d of %d warm-up pings failed: %s', len(failed), len(futures), failed[0])
+    return len(failed)
+
+
+class KeepWarm:
+    """Re-warms the pool every ``interval`` seconds on a daemon thread
+
+    The interval should be shorter than both the client's keep-alive
+    expiry and the server's idle timeout.
+    """
+
+    def __init__(self, ping, connections=1, interval=60.0):
+        self.ping = ping
+        self.connections = connections
+        self.interval = interval
+        self.pings = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name='keep-warm', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            warm_connections(self.ping, self.connections)
+            self.pings += 1
+            logger.debug('keep-warm pings took %.3fs', time.perf_counter() - started)